@@ -2,12 +2,34 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Embed
 from datetime import datetime, timedelta, timezone
+from functools import partial
 import asyncio
-import re
+from .utils.models import GuildDoc
+from .utils.pipeline import MessageContext
+from .utils.wordmatch import WordMatcher
+from .utils.normalize import normalize, variants
+from .utils.regexrules import RegexRules, validate_rule
+from .utils.spam import SpamDetector, CHANNEL_FLOOD, DUPLICATES, FLOOD, MENTIONS
+from .utils.contenthash import ContentHashes
+from .utils.domains import DomainTrie, normalize_domain, ALLOW, BLOCK, MAX_DOMAINS
+from .utils.nearduplicate import NearDuplicateIndex, fingerprint, LIMIT, MAX_LIMIT, SIMILARITY, WINDOW
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Punishment of spammers and slowmode set on flooded channel.
+SPAM_TIMEOUT_MINUTES = 5
+FLOOD_SLOWMODE_SECONDS = 10
+
+# Mentions counted for one @everyone/@here.
+EVERYONE_MENTION_WEIGHT = 5
+
+SPAM_REASONS = {
+    FLOOD : "sending messages too fast",
+    DUPLICATES : "repeating the same message",
+    MENTIONS : "mass mentioning"
+}
+
 
 class Automod(commands.Cog):
     """
@@ -20,9 +42,20 @@ class Automod(commands.Cog):
 
         Arguments:
             bot: Discord bot instance.
+            guild_banned_words (dict): Compiled banned words matcher (WordMatcher) by guild id.
+            guild_regex_rules (dict): Compiled custom regex rules (RegexRules) by guild id.
+            spam (SpamDetector): Sliding windows of recent messages per user and channel.
+            guild_near_duplicates (dict): Fingerprints of recent messages (NearDuplicateIndex) by guild id.
+            guild_domains (dict): Blocked and allowed link domains (DomainTrie) by guild id.
+            contents (ContentHashes): Hashes of checked message contents, unchanged edits are skipped.
         """
         self.bot = bot
         self.guild_banned_words = {}
+        self.guild_regex_rules = {}
+        self.spam = SpamDetector()
+        self.guild_near_duplicates = {}
+        self.guild_domains = {}
+        self.contents = ContentHashes()
 
     async def safe_add_role(self, member: discord.Member, role: discord.Role) -> None:
         """
@@ -52,29 +85,76 @@ class Automod(commands.Cog):
         
         await member.remove_roles(role)
 
-    async def get_banned_words(self, discord_Obj) -> set:
+    def get_banned_words(self, guild_id : int, guild_data : GuildDoc) -> WordMatcher:
         """
-        Retrieves a list of banned words for a guild.
+        Returns compiled banned words matcher of a guild, building it on first use.
+        Words are normalized the same way as checked messages, also ones stored before normalization
+        (add_bad_word pulls every stored spelling of a removed word).
 
         Arguments:
-            discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            guild_id (int): Id of the guild.
+            guild_data (GuildDoc): Guild data from database.
 
         Returns:
-            set: A set of banned words in the guild.
+            WordMatcher: Matcher of guild banned words.
         """
+        matcher = self.guild_banned_words.get(guild_id)
+        if matcher is None:
+            matcher = WordMatcher(normalize(word) for word in guild_data.automod.banned_words)
+            self.guild_banned_words[guild_id] = matcher
+        return matcher
 
-        if discord_Obj in self.guild_banned_words:
-            return self.guild_banned_words[discord_Obj]
+    def get_regex_rules(self, guild_id : int, guild_data : GuildDoc) -> RegexRules:
+        """
+        Returns compiled custom regex rules of a guild, building them on first use.
 
-        guild_data = await self.get_guild(discord_Obj)
+        Arguments:
+            guild_id (int): Id of the guild.
+            guild_data (GuildDoc): Guild data from database.
 
-        if guild_data is None:
-            return set()
+        Returns:
+            RegexRules: Combined matcher of guild rules.
+        """
+        rules = self.guild_regex_rules.get(guild_id)
+        if rules is None:
+            rules = RegexRules(guild_data.automod.regex_rules)
+            self.guild_regex_rules[guild_id] = rules
+        return rules
 
-        words_set = set(guild_data.get("automod", {}).get("banned_words", []))
+    def get_domains(self, guild_id : int, guild_data : GuildDoc) -> DomainTrie:
+        """
+        Returns trie of blocked and allowed link domains of a guild, building it on first use.
 
-        self.guild_banned_words[discord_Obj] = words_set
-        return words_set
+        Arguments:
+            guild_id (int): Id of the guild.
+            guild_data (GuildDoc): Guild data from database.
+
+        Returns:
+            DomainTrie: Domain rules of the guild.
+        """
+        domains = self.guild_domains.get(guild_id)
+        if domains is None:
+            domains = DomainTrie(guild_data.automod.blocked_domains, guild_data.automod.allowed_domains)
+            self.guild_domains[guild_id] = domains
+        return domains
+
+    def get_near_duplicates(self, guild_id : int, guild_data : GuildDoc) -> NearDuplicateIndex:
+        """
+        Returns index of recent message fingerprints of a guild, creating it on first use.
+        Window follows current guild settings.
+
+        Arguments:
+            guild_id (int): Id of the guild.
+            guild_data (GuildDoc): Guild data from database.
+
+        Returns:
+            NearDuplicateIndex: Index of guild messages.
+        """
+        index = self.guild_near_duplicates.get(guild_id)
+        if index is None:
+            index = self.guild_near_duplicates[guild_id] = NearDuplicateIndex()
+        index.window = guild_data.automod.near_duplicates.window
+        return index
 
     async def categorize_messages(self, interaction : discord.Interaction, amount : int) -> tuple:
         """
@@ -134,15 +214,15 @@ class Automod(commands.Cog):
         """
         return self.bot.get_cog("Database")
 
-    async def get_guild(self, discord_Obj) -> dict:
+    async def get_guild(self, discord_Obj) -> GuildDoc:
         """
         Retrives guild data from database.
 
         Arguments:
-            discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            discord_Obj: Discord Object (Guild, Interaction, Member, Role or Channel).
 
         Returns:
-            dict: Guild data dict or None is something went wrong.
+            GuildDoc: Guild data or None is something went wrong.
         """
         database_cog = await self.get_database_cog()
         if not database_cog:
@@ -153,17 +233,28 @@ class Automod(commands.Cog):
             return None
         return guild_data
 
-    async def is_jail_enabled(self, guild_data : dict) -> bool:
+    async def update_guild(self, guild_id : int, update : dict) -> None:
+        """
+        Updates guild document through Database cog, so cached guild config stays in sync.
+
+        Arguments:
+            guild_id (int): Id of the discord guild.
+            update (dict): Update in MongoDB syntax.
+        """
+        database_cog = await self.get_database_cog()
+        await database_cog.update_guild(guild_id, update)
+
+    async def is_jail_enabled(self, guild_data : GuildDoc) -> bool:
         """
         Checks if jail is enabled in database.
 
         Arguments:
-            guild_data (dict): Guild data from database.
+            guild_data (GuildDoc): Guild data from database.
 
         Returns:
             bool: If jail is enabled return True, otherwise returns False.
         """
-        return guild_data.get("automod", {}).get("jail", {}).get("enabled", False)
+        return guild_data.automod.jail.enabled
 
     async def jail_disable(self, discord_Obj):
         """
@@ -181,53 +272,211 @@ class Automod(commands.Cog):
             return None
         await database_cog.disable_jail(discord_Obj)
 
-    async def get_jail_role(self, guild_data : dict, discord_Obj) -> discord.Role:
+    async def get_jail_role(self, guild_data : GuildDoc, discord_Obj) -> discord.Role:
         """
         Retrives jail role for a guild.
 
         Arguments:
-            guild_data (dict): Guild data from database.
+            guild_data (GuildDoc): Guild data from database.
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
 
         Returns:
             discord.Role: Jail role or None if role id is missing.
         """
-        role_id = guild_data.get("automod", {}).get("jail", {}).get("jail_role")
+        role_id = guild_data.automod.jail.jail_role
         if not role_id:
             return 
         return discord_Obj.guild.get_role(role_id) 
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+    async def moderate_message(self, ctx : MessageContext) -> None:
         """
-        Listen for any message send, then checks if its a guild banned word.
+        First stage of message pipeline, checks message rate of author and channel and copy-pasted messages,
+        then content of the message (see check_content).
+        Deleted message stops the pipeline, so it doesn't earn any xp.
 
         Arguments:
-            message (discord.Message): Message sent in guild channel.
+            ctx (MessageContext): Context of the message sent in guild channel.
         """
-
-        if message.author.bot:
+        if ctx.guild.automod.anti_spam and await self.check_spam(ctx):
             return
 
-        if not message.guild:
+        if ctx.guild.automod.near_duplicates.enabled and await self.check_near_duplicates(ctx):
             return
-        
-        guild_data = await self.get_guild(message)
 
-        is_enabled = guild_data.get("automod", {}).get("anti_bad_words")
+        self.contents.remember(ctx.message.id, ctx.message.content)
+        await self.check_content(ctx)
 
-        if not is_enabled:
+    async def check_content(self, ctx : MessageContext) -> bool:
+        """
+        Checks if message links to blocked domain, matches custom regex rule or contains guild banned word.
+        Rules apply whenever guild has some, banned words only with anti_bad_words enabled.
+        Message is normalized first for banned words (leetspeak, confusables, zero-width characters, repeated letters),
+        regex rules see original text. Used for sent and edited messages.
+
+        Arguments:
+            ctx (MessageContext): Context of the message.
+
+        Returns:
+            bool: True if message was removed.
+        """
+        message = ctx.message
+        if ctx.guild.automod.blocked_domains:
+            host = self.get_domains(message.guild.id, ctx.guild).blocked(message.content)
+            if host is not None:
+                await self.remove_message(ctx, f"Your message was removed {message.author.mention}, links to `{host}` are not allowed on ***{message.guild.name}***")
+                return True
+
+        if ctx.guild.automod.regex_rules:
+            rules = self.get_regex_rules(message.guild.id, ctx.guild)
+            if rules and rules.match(message.content) is not None:
+                await self.remove_message(ctx, f"Your message was removed {message.author.mention}, it matches a rule of ***{message.guild.name}***")
+                return True
+
+        if not ctx.guild.automod.anti_bad_words:
+            return False
+
+        banned_words = self.get_banned_words(message.guild.id, ctx.guild)
+        if banned_words and any(banned_words.find(content) is not None for content in variants(message.content)):
+            await self.remove_message(ctx, f"Please don't swear {message.author.mention}, a word from your sentence is prohibited on ***{message.guild.name}***")
+            return True
+        return False
+
+    async def check_spam(self, ctx : MessageContext) -> bool:
+        """
+        Records message in spam detector and punishes author if they exceeded a limit:
+        mass mentions send them to jail (or timeout if jail is not set), flood and repeated messages time them out.
+        Flooded channel gets slowmode.
+
+        Arguments:
+            ctx (MessageContext): Context of the message.
+
+        Returns:
+            bool: True if message was removed.
+        """
+        message = ctx.message
+        mentions = len(message.mentions) + len(message.role_mentions) + (EVERYONE_MENTION_WEIGHT if message.mention_everyone else 0)
+        violation = self.spam.record(message.guild.id, message.channel.id, message.author.id, message.content, mentions)
+        if violation is None:
+            return False
+
+        if violation == CHANNEL_FLOOD:
+            if message.channel.permissions_for(message.guild.me).manage_channels and not message.channel.slowmode_delay:
+                await message.channel.edit(slowmode_delay=FLOOD_SLOWMODE_SECONDS, reason="Automod: channel flood")
+            return False
+
+        self.spam.forget(message.guild.id, message.author.id)
+
+        async def punish() -> None:
+            if violation == MENTIONS and await self.send_to_jail(message.author, ctx.guild):
+                return
+            await self.timeout_member(message.author, SPAM_TIMEOUT_MINUTES)
+
+        await self.remove_message(ctx, f"Your message was removed {message.author.mention}, you are {SPAM_REASONS[violation]} on ***{message.guild.name}***", punish)
+        return True
+
+    async def check_near_duplicates(self, ctx : MessageContext) -> bool:
+        """
+        Compares MinHash fingerprint of the message with recent messages of the guild (from anyone, in any channel).
+        Message with at least limit - 1 near duplicates in the window is removed and its author timed out,
+        so slightly edited copy-paste spam is caught too.
+
+        Arguments:
+            ctx (MessageContext): Context of the message.
+
+        Returns:
+            bool: True if message was removed.
+        """
+        message = ctx.message
+        sketch = fingerprint(message.content)
+        if sketch is None:
+            return False
+
+        config = ctx.guild.automod.near_duplicates
+        index = self.get_near_duplicates(message.guild.id, ctx.guild)
+        duplicates = index.count(sketch, config.similarity / 100)
+        index.add(sketch)
+        if duplicates + 1 < min(config.limit, MAX_LIMIT):
+            return False
+
+        await self.remove_message(ctx, f"Your message was removed {message.author.mention}, the same message was sent too many times on ***{message.guild.name}***",
+                                  partial(self.timeout_member, message.author, SPAM_TIMEOUT_MINUTES))
+        return True
+
+    async def send_to_jail(self, member : discord.Member, guild_data : GuildDoc) -> bool:
+        """
+        Gives member jail role.
+
+        Arguments:
+            member (discord.Member): Member who will be send to jail.
+            guild_data (GuildDoc): Guild data from database.
+
+        Returns:
+            bool: False if jail is not set up in guild.
+        """
+        if not await self.is_jail_enabled(guild_data):
+            return False
+
+        jail_role = await self.get_jail_role(guild_data, member)
+        if jail_role is None:
+            return False
+
+        await self.safe_add_role(member, jail_role)
+        return True
+
+    async def timeout_member(self, member : discord.Member, minutes : int) -> None:
+        """
+        Times out member.
+
+        Arguments:
+            member (discord.Member): Member who will be timed out.
+            minutes (int): Timeout duration in minutes.
+        """
+        await member.timeout(datetime.now(timezone.utc) + timedelta(minutes=minutes))
+
+    async def remove_message(self, ctx : MessageContext, reason : str, punishment = None) -> None:
+        """
+        Deletes message, stops message pipeline, punishes author and then tells them why.
+        Author with closed DMs is still punished.
+
+        Arguments:
+            ctx (MessageContext): Context of the removed message.
+            reason (str): Message sent to the author.
+            punishment: Coroutine function applying punishment (e.g. timeout), None for no punishment.
+        """
+        ctx.stop()
+        await ctx.message.delete()
+        if punishment is not None:
+            await punishment()
+        try:
+            await ctx.message.author.send(reason)
+        except discord.HTTPException as e:
+            logger.info(f"Couldn't tell {ctx.message.author.id} why their message was removed: {e}")
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload : discord.RawMessageUpdateEvent) -> None:
+        """
+        Listen for edited messages (cached or not) and checks their new content the same way as sent messages,
+        so banned words can't be edited in. Edits which didn't change text are skipped.
+
+        Arguments:
+            payload (discord.RawMessageUpdateEvent): Edit event with the message after edit.
+        """
+        message = payload.message
+        if payload.guild_id is None or message.author.bot:
             return
 
-        banned_words = await self.get_banned_words(message)
-        if not banned_words:
+        previous = payload.cached_message.content if payload.cached_message is not None else None
+        if not self.contents.changed(message.id, message.content, previous):
             return
 
-        words = re.findall(r'\b\w+\b', message.content.lower())
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
 
-        if any(word in banned_words for word in words):
-            await message.delete()
-            await message.author.send(f"Please don't swear {message.author.mention}, a word from your sentence is prohibited on ***{message.guild.name}***")
+        guild_data = await self.get_guild(guild)
+        if guild_data is None:
+            return
+        await self.check_content(MessageContext(message, None, guild_data))
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role : discord.Role) -> None:
@@ -242,7 +491,7 @@ class Automod(commands.Cog):
         if guild_data is None:
             return
 
-        if guild_data and guild_data["automod"]["jail"]["jail_role"] == role.id:
+        if guild_data and guild_data.automod.jail.jail_role == role.id:
             await self.jail_disable(role)
 
     @commands.Cog.listener() 
@@ -258,9 +507,22 @@ class Automod(commands.Cog):
         if guild_data is None:
             return
 
-        if guild_data and (guild_data["automod"]["jail"]["jail_text"] == channel.id or guild_data["automod"]["jail"]["jail_vc"] == channel.id):
+        if guild_data and (guild_data.automod.jail.jail_text == channel.id or guild_data.automod.jail.jail_vc == channel.id):
             await self.jail_disable(channel)
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild : discord.Guild) -> None:
+        """
+        Listen for bot leaving the guild, then drops its compiled banned words.
+
+        Arguments:
+            guild (discord.Guild): Guild data.
+        """
+        self.guild_banned_words.pop(guild.id, None)
+        self.guild_regex_rules.pop(guild.id, None)
+        self.guild_near_duplicates.pop(guild.id, None)
+        self.guild_domains.pop(guild.id, None)
+
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel : discord.abc.GuildChannel) -> None:
         """
@@ -353,7 +615,7 @@ class Automod(commands.Cog):
 
                 database_cog = await self.get_database_cog()
                 if database_cog:
-                    await self.bot.database["guilds"].update_one({"_id" : str(interaction.guild_id)}, {"$set" : {"automod.jail.enabled" : True, "automod.jail.jail_role" : jail_role.id, "automod.jail.jail_category" : jail_category.id, "automod.jail.jail_text" : jail_text.id, "automod.jail.jail_vc" : jail_vc.id}})
+                    await self.update_guild(interaction.guild_id, {"$set" : {"automod.jail.enabled" : True, "automod.jail.jail_role" : jail_role.id, "automod.jail.jail_category" : jail_category.id, "automod.jail.jail_text" : jail_text.id, "automod.jail.jail_vc" : jail_vc.id}})
 
                     await interaction.followup.send("Jail has been created", ephemeral=True)
         else:
@@ -393,7 +655,7 @@ class Automod(commands.Cog):
 
             await interaction.response.send_message(embed=embed)
         else:
-            await self.safe_add_role(member, jail_role)
+            await self.send_to_jail(member, guild_data)
 
             embed = Embed(title="**⛓️ JAIL TIME**", description=f"**{member.mention} HAS BEEN SENT TO JAIL!**", color=discord.Color.dark_blue())
             
@@ -441,7 +703,7 @@ class Automod(commands.Cog):
 
             await interaction.response.send_message(embed=embed)
         else:
-            await member.timeout(datetime.now(timezone.utc) + timedelta(minutes=time))
+            await self.timeout_member(member, time)
 
             embed = Embed(title="**🔇 MUTE INCOMING**", description=f"**{member.mention} HAS BEEN MUTED FOR {time} MINUTES!**", color=discord.Color.dark_grey())
 
@@ -462,30 +724,164 @@ class Automod(commands.Cog):
             await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
             return
 
+        word = normalize(bad_word).strip()
+        if not word:
+            await interaction.response.send_message("This word has no letters left after normalization!", ephemeral=True)
+            return
+
         await interaction.response.defer(ephemeral=True, thinking=True)
 
         guild_data = await self.get_guild(interaction)
         if guild_data is None:
             return
 
-        banned_words = set(guild_data.get("automod", {}).get("banned_words", []))
+        banned_words = self.get_banned_words(interaction.guild_id, guild_data)
 
-        if bad_word.lower() in banned_words:
-            await self.bot.database["guilds"].update_one(
-                {"_id": str(interaction.guild_id)},
-                {"$pull": {"automod.banned_words": bad_word.lower()}}
-            )
+        if word in banned_words:
+            stored = [stored_word for stored_word in guild_data.automod.banned_words if normalize(stored_word) == word]
+            await self.update_guild(interaction.guild_id, {"$pullAll": {"automod.banned_words": stored}})
+            banned_words.remove(word)
             action = "removed"
         else:
-            await self.bot.database["guilds"].update_one(
-                {"_id": str(interaction.guild_id)},
-                {"$addToSet": {"automod.banned_words": bad_word.lower()}}
-            )
+            await self.update_guild(interaction.guild_id, {"$addToSet": {"automod.banned_words": word}})
+            banned_words.add(word)
             action = "added"
-        if interaction.guild_id in self.guild_banned_words:
-            self.guild_banned_words.pop(interaction.guild_id)
         await interaction.followup.send(f"{bad_word} has been {action}")
         
+    @app_commands.command(name="add_regex_rule", description="Adds or removes regex rule checked on every message in guild")
+    @app_commands.describe(pattern="Regular expression, messages matching it will be removed")
+    async def add_regex_rule(self, interaction : discord.Interaction, pattern : str) -> None:
+        """
+        Add or remove a custom regex rule of the guild. New rules are validated first,
+        patterns that could freeze the bot (catastrophic backtracking) are rejected.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+            pattern (str): Regular expression.
+        """
+        if not (interaction.user.guild_permissions.manage_messages or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        guild_data = await self.get_guild(interaction)
+        if guild_data is None:
+            return
+
+        rules = guild_data.automod.regex_rules
+        if pattern in rules:
+            await self.update_guild(interaction.guild_id, {"$pull": {"automod.regex_rules": pattern}})
+            action = "removed"
+        else:
+            try:
+                validate_rule(pattern, rules)
+            except ValueError as e:
+                await interaction.followup.send(f"Rule rejected: {e}")
+                return
+            await self.update_guild(interaction.guild_id, {"$addToSet": {"automod.regex_rules": pattern}})
+            action = "added"
+
+        self.guild_regex_rules.pop(interaction.guild_id, None)
+        await interaction.followup.send(f"`{pattern}` has been {action}")
+
+    @app_commands.command(name="block_domain", description="Adds or removes domain from blocked links (subdomains included, * blocks all links)")
+    @app_commands.describe(domain="Domain like evil.com or discord.gg, * for every domain")
+    async def block_domain(self, interaction : discord.Interaction, domain : str) -> None:
+        """
+        Add or remove a domain from the guild's link blocklist.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+            domain (str): Domain or link.
+        """
+        await self.toggle_domain(interaction, domain, "blocked_domains")
+
+    @app_commands.command(name="allow_domain", description="Adds or removes domain from allowed links, overrides blocked parent domain")
+    @app_commands.describe(domain="Domain like youtube.com, subdomains are allowed too")
+    async def allow_domain(self, interaction : discord.Interaction, domain : str) -> None:
+        """
+        Add or remove a domain from the guild's link allowlist.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+            domain (str): Domain or link.
+        """
+        await self.toggle_domain(interaction, domain, "allowed_domains")
+
+    async def toggle_domain(self, interaction : discord.Interaction, domain : str, field : str) -> None:
+        """
+        Adds domain to the guild list or removes it if it's already there.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+            domain (str): Domain or link entered by admin.
+            field (str): "blocked_domains" or "allowed_domains".
+        """
+        if not (interaction.user.guild_permissions.manage_messages or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
+            return
+
+        domain = normalize_domain(domain)
+        if domain is None:
+            await interaction.response.send_message("That's not a valid domain!", ephemeral=True)
+            return
+
+        guild_data = await self.get_guild(interaction)
+        if guild_data is None:
+            return
+
+        trie = self.get_domains(interaction.guild_id, guild_data)
+        rule = ALLOW if field == "allowed_domains" else BLOCK
+        allowed = domain in guild_data.automod.allowed_domains
+        blocked = domain in guild_data.automod.blocked_domains
+
+        domains = getattr(guild_data.automod, field)
+        if domain in domains:
+            await self.update_guild(interaction.guild_id, {"$pull": {f"automod.{field}": domain}})
+            trie.remove(domain)
+            if rule is ALLOW and blocked:
+                trie.add(domain, BLOCK)
+            elif rule is BLOCK and allowed:
+                trie.add(domain, ALLOW)
+            action = "removed from"
+        elif len(domains) >= MAX_DOMAINS:
+            await interaction.response.send_message(f"Guild can have at most {MAX_DOMAINS} domains on the list", ephemeral=True)
+            return
+        else:
+            await self.update_guild(interaction.guild_id, {"$addToSet": {f"automod.{field}": domain}})
+            if rule is ALLOW or not allowed:
+                trie.add(domain, rule)
+            action = "added to"
+
+        await interaction.response.send_message(f"`{domain}` has been {action} {field.replace('_', ' ')}", ephemeral=True)
+
+    @app_commands.command(name="regex_rules", description="Shows regex rules of this guild with their timings")
+    async def regex_rules(self, interaction : discord.Interaction) -> None:
+        """
+        Shows custom regex rules with hits and match timings.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+        """
+        if not (interaction.user.guild_permissions.manage_messages or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
+            return
+
+        guild_data = await self.get_guild(interaction)
+        if guild_data is None:
+            return
+
+        timings = self.get_regex_rules(interaction.guild_id, guild_data).timings()
+
+        embed = Embed(title="Regex rules", description=f"Scanned {timings['scans']} messages, {timings['avg_scan_us']:.1f}µs per message", color=discord.Color.orange())
+        if timings["disabled"]:
+            embed.description += "\n**Rules are disabled for being too slow, remove the slow one!**"
+        for pattern, stats in timings["rules"].items():
+            embed.add_field(name=f"`{pattern}`", value=f"Hits: {stats['hits']}\nAvg: {stats['avg_us']:.1f}µs\nMax: {stats['max_us']:.1f}µs", inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="check_messages_for_bad_words", description="Enable/disable checking every message for potential bad words")
     async def check_bool_bad_words(self, interaction : discord.Interaction) -> None:
         """
@@ -500,14 +896,73 @@ class Automod(commands.Cog):
         
         guild_data = await self.get_guild(interaction)
 
-        is_enabled = guild_data.get("automod", {}).get("anti_bad_words")
+        is_enabled = guild_data.automod.anti_bad_words
 
         if not is_enabled:
-            await self.bot.database["guilds"].update_one({"_id" : str(interaction.guild_id)}, {"$set" : {"automod.anti_bad_words" : True}})
+            await self.update_guild(interaction.guild_id, {"$set" : {"automod.anti_bad_words" : True}})
             await interaction.response.send_message("Scanning for bad words in this guild!", ephemeral=True)
         else:
-            await self.bot.database["guilds"].update_one({"_id" : str(interaction.guild_id)}, {"$set" : {"automod.anti_bad_words" : False}})
+            await self.update_guild(interaction.guild_id, {"$set" : {"automod.anti_bad_words" : False}})
             await interaction.response.send_message("Scanning turned off.", ephemeral=True)
 
+    @app_commands.command(name="check_messages_for_spam", description="Enable/disable spam and flood detection")
+    async def check_bool_spam(self, interaction : discord.Interaction) -> None:
+        """
+        Toggles spam and flood detection in guild.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+        """
+        if not (interaction.user.guild_permissions.manage_messages or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
+            return
+
+        guild_data = await self.get_guild(interaction)
+
+        if not guild_data.automod.anti_spam:
+            await self.update_guild(interaction.guild_id, {"$set" : {"automod.anti_spam" : True}})
+            await interaction.response.send_message("Watching for spam in this guild!", ephemeral=True)
+        else:
+            await self.update_guild(interaction.guild_id, {"$set" : {"automod.anti_spam" : False}})
+            await interaction.response.send_message("Spam detection turned off.", ephemeral=True)
+
+    @app_commands.command(name="near_duplicate_detection", description="Configure detection of copy-pasted spam")
+    @app_commands.describe(
+        enabled="Remove messages repeated across the guild",
+        limit=f"How many similar messages are allowed in the window (2-{MAX_LIMIT})",
+        similarity="How similar messages must be to count as the same (30-100%)",
+        window="How long messages are remembered (10-600 seconds)"
+    )
+    async def near_duplicate_detection(self, interaction : discord.Interaction, enabled : bool, limit : int = LIMIT, similarity : int = SIMILARITY, window : int = WINDOW) -> None:
+        """
+        Sets near-duplicate spam detection of guild.
+
+        Arguments:
+            interaction (discord.Interaction): Context interaction.
+            enabled (bool): If detection is on.
+            limit (int): Similar messages in window that make a message spam.
+            similarity (int): Minimum similarity of messages in percent.
+            window (int): Seconds a message is remembered.
+        """
+        if not (interaction.user.guild_permissions.manage_messages or interaction.user.guild_permissions.administrator):
+            await interaction.response.send_message("U dont have permissions to do that!", ephemeral=True)
+            return
+
+        if not (2 <= limit <= MAX_LIMIT and 30 <= similarity <= 100 and 10 <= window <= 600):
+            await interaction.response.send_message(f"Limit must be 2-{MAX_LIMIT}, similarity 30-100% and window 10-600 seconds", ephemeral=True)
+            return
+
+        await self.update_guild(interaction.guild_id, {"$set" : {"automod.near_duplicates" : {
+            "enabled" : enabled,
+            "limit" : limit,
+            "similarity" : similarity,
+            "window" : window
+        }}})
+        if not enabled:
+            self.guild_near_duplicates.pop(interaction.guild_id, None)
+            await interaction.response.send_message("Near-duplicate detection turned off.", ephemeral=True)
+            return
+        await interaction.response.send_message(f"Removing messages sent {limit} times within {window} seconds!", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Automod(bot))
\ No newline at end of file
@@ -1,9 +1,364 @@
-from discord.ext import commands
+from discord.ext import commands, tasks
 import discord
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+from os import getenv
+from time import monotonic
+from .utils.models import UserDoc, GuildDoc
+from .utils.storage import apply_update
+from .utils.cooldowns import CooldownEngine, utcnow
+from .utils.monitoring import caller_context
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+# Indexes the cogs need besides _id, created on startup by Database.ensure_indexes.
+# Every query filters users by _id only, so nothing is declared yet. An index is added here
+# together with the query that needs it, each one costs a write on every coins and xp $inc.
+INDEXES = {
+    "users" : []
+}
+
+# Index options compared when checking existing indexes for drift.
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def new_member_document() -> dict:
+    """
+    Returns default fields of a new member document (without _id).
+
+    Returns:
+        dict: Default member document.
+    """
+    return {
+        "coins" : 0,
+        "xp" :  0,
+        "level" : 1,
+        "cooldowns" : {
+            "last_daily_reward" : None,
+            "last_crime" : None,
+            "last_steal" : None
+        },
+        "level_up_notification" : True,
+        "inventory" : {},
+        "active_pet" : None
+    }
+
+def new_guild_document(guild : discord.Guild) -> dict:
+    """
+    Returns default fields of a new guild document (without _id).
+
+    Arguments:
+        guild (discord.Guild): The guild document is created for.
+
+    Returns:
+        dict: Default guild document.
+    """
+    return {
+        "name": guild.name,
+        "prefix": "?",
+        "welcome" : {
+            "enabled" : False,
+            "channel_id" : 0,
+            "message" : None,
+            "description" : None
+        },
+        "leave" : {
+            "enabled" : False,
+            "channel_id" : 0,
+            "message" : None,
+            "description" : None
+        },
+        "automod": {
+            "banned_words" : [],
+            "anti_bad_words" : False,
+            "jail" : {
+                "enabled" : False,
+                "jail_role" : None,
+                "jail_category" : None,
+                "jail_text" : None,
+                "jail_vc" : None
+            },
+            "regex_rules" : [],
+            "anti_spam" : False,
+            "near_duplicates" : {
+                "enabled" : False,
+                "limit" : 3,
+                "similarity" : 60,
+                "window" : 60
+            },
+            "blocked_domains" : [],
+            "allowed_domains" : []
+        },
+        "item_shop" : {
+            "piece of paper" : 100
+        }
+    }
+
+def apply_to_model(model, update : dict):
+    """
+    Applies MongoDB update to immutable document model by rebuilding it.
+
+    Arguments:
+        model: UserDoc or GuildDoc.
+        update (dict): Update in MongoDB syntax.
+
+    Returns:
+        New model of the same type with update applied.
+    """
+    document = model.to_document()
+    apply_update(document, update)
+    return type(model).from_document(document)
+
+
+class MemberCache:
+    """
+    Bounded in-process cache for decoded member documents (UserDoc) with LRU eviction and TTL.
+    Updates are written through, so the cache never has to be dropped after a write.
+
+    Attributes:
+        max_size (int): Maximum number of cached documents.
+        ttl (float): Seconds after which a cached document is read again from database.
+        hits (int): Lookups served from cache.
+        misses (int): Lookups that had to go to database.
+        evictions (int): Documents dropped because cache was full.
+    """
+    def __init__(self, max_size : int = 10000, ttl : float = 300):
+        """
+        Initializes empty cache.
+
+        Arguments:
+            max_size (int): Maximum number of cached documents.
+            ttl (float): Time to live of a document in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, member_id : str) -> UserDoc:
+        """
+        Returns cached document and marks it as recently used.
+
+        Arguments:
+            member_id (str): Id of the member.
+
+        Returns:
+            UserDoc: Cached document or None if it's missing or expired.
+        """
+        entry = self._entries.get(member_id)
+        if entry is None or entry[0] < monotonic():
+            if entry is not None:
+                del self._entries[member_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(member_id)
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, member_id : str) -> UserDoc:
+        """
+        Returns cached document without counting the lookup or changing its recency.
+
+        Arguments:
+            member_id (str): Id of the member.
+
+        Returns:
+            UserDoc: Cached document or None if it's missing or expired.
+        """
+        entry = self._entries.get(member_id)
+        if entry is None or entry[0] < monotonic():
+            return None
+        return entry[1]
+
+    def put(self, member_id : str, document : UserDoc) -> None:
+        """
+        Stores document in cache, evicting least recently used one if cache is full.
+
+        Arguments:
+            member_id (str): Id of the member.
+            document (UserDoc): Decoded member document.
+        """
+        self._entries[member_id] = (monotonic() + self.ttl, document)
+        self._entries.move_to_end(member_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def apply(self, member_id : str, update : dict) -> None:
+        """
+        Writes update through to cached document if member is cached.
+
+        Arguments:
+            member_id (str): Id of the member.
+            update (dict): Update in MongoDB syntax.
+        """
+        entry = self._entries.get(member_id)
+        if entry is not None:
+            self._entries[member_id] = (entry[0], apply_to_model(entry[1], update))
+
+    def invalidate(self, member_id : str) -> None:
+        """
+        Drops member document from cache.
+
+        Arguments:
+            member_id (str): Id of the member.
+        """
+        self._entries.pop(member_id, None)
+
+    def stats(self) -> dict:
+        """
+        Returns cache counters, used to size the cache against message rate.
+
+        Returns:
+            dict: Size, hits, misses, evictions and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size" : len(self._entries),
+            "max_size" : self.max_size,
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "evictions" : self.evictions,
+            "hit_ratio" : self.hits / lookups if lookups else 0.0
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent lookups of the same key into one database query.
+    First caller (leader) starts the query, callers arriving while it's in flight await the same result.
+    Results must be immutable (UserDoc, GuildDoc), because every caller gets the same object.
+
+    Attributes:
+        leaders (int): Lookups that actually went to database.
+        shared (int): Lookups that were suppressed and got result of a query already in flight.
+    """
+    def __init__(self):
+        """
+        Initializes without any lookups in flight.
+        """
+        self.leaders = 0
+        self.shared = 0
+        self._in_flight = {}
+
+    def in_flight(self, key) -> bool:
+        """
+        Checks if lookup of the key is running right now.
+
+        Arguments:
+            key: Lookup key.
+        """
+        return key in self._in_flight
+
+    async def run(self, key, fetch):
+        """
+        Returns result of fetch(), sharing it with every concurrent call under the same key.
+        Query runs as its own task, so cancelling one caller doesn't cancel it for the others.
+        The task keeps the cog of the leader as current_cog, so its commands are attributed to that cog.
+
+        Arguments:
+            key: Lookup key, e.g. ("users", member_id, fields).
+            fetch: Coroutine function doing the lookup.
+
+        Returns:
+            Result of fetch.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.leaders += 1
+            task = asyncio.get_running_loop().create_task(fetch(), context=caller_context())
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task : asyncio.Task) -> None:
+        """
+        Removes finished lookup, so the next miss queries database again.
+        """
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        """
+        Returns duplicate suppression counters.
+
+        Returns:
+            dict: Database queries, shared lookups, lookups in flight and ratio of suppressed lookups.
+        """
+        lookups = self.leaders + self.shared
+        return {
+            "queries" : self.leaders,
+            "shared" : self.shared,
+            "in_flight" : len(self._in_flight),
+            "suppressed_ratio" : self.shared / lookups if lookups else 0.0
+        }
+
+
+class BatchStats:
+    """
+    Throughput counters of bulk member upserts.
+
+    Attributes:
+        batches (int): Executed bulk writes.
+        members (int): Members sent to database.
+        inserted (int): Members that didn't have a document yet.
+        failures (int): Members whose upsert failed.
+        seconds (float): Time spent in bulk writes.
+    """
+    def __init__(self):
+        """
+        Initializes empty counters.
+        """
+        self.batches = 0
+        self.members = 0
+        self.inserted = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    def record(self, members : int, inserted : int, failures : int, seconds : float) -> None:
+        """
+        Adds one executed bulk write.
+
+        Arguments:
+            members (int): Members in the batch.
+            inserted (int): Newly created documents.
+            failures (int): Failed upserts.
+            seconds (float): Duration of the write.
+        """
+        self.batches += 1
+        self.members += members
+        self.inserted += inserted
+        self.failures += failures
+        self.seconds += seconds
+
+    def stats(self) -> dict:
+        """
+        Returns counters with throughput.
+
+        Returns:
+            dict: Counters, average batch size and members written per second.
+        """
+        return {
+            "batches" : self.batches,
+            "members" : self.members,
+            "inserted" : self.inserted,
+            "failures" : self.failures,
+            "avg_batch" : self.members / self.batches if self.batches else 0.0,
+            "members_per_second" : self.members / self.seconds if self.seconds else 0.0
+        }
+
+
 class Database(commands.Cog):
     """
     Cog responsible for any action in database including retrieving, 
@@ -15,83 +370,259 @@ class Database(commands.Cog):
 
         Arguments:
             bot: Discord bot instance.
+            member_cache (MemberCache): Cache of member documents.
+            guild_cache (dict): Guild configs (GuildDoc) by guild id, filled once per guild and patched on every update.
+            lookups (SingleFlight): Shares in-flight member and guild queries between concurrent listeners.
+            cooldowns (CooldownEngine): Expiries of command cooldowns, checked without database access.
+            xp_write_behind (bool): If True, xp gains are buffered in memory and flushed in bulk.
+            xp_flush_size (int): Number of buffered members that triggers a flush.
+            xp_max_unflushed (int): Maximum buffered xp (summed over members) that can be lost on crash.
+            pending_xp (dict): Buffered xp gains by member id.
+            backfill_chunk (int): Members upserted by one bulk write when backfilling a guild.
+            join_flush_size (int): Buffered joins that trigger a flush.
+            pending_joins (set): Ids of joined members waiting for their document.
+            backfill_stats (BatchStats): Throughput of guild backfills.
+            join_stats (BatchStats): Throughput of buffered join upserts.
         """
         self.bot = bot
+        self.member_cache = MemberCache(int(getenv("MEMBER_CACHE_SIZE", 10000)), float(getenv("MEMBER_CACHE_TTL", 300)))
+        self.guild_cache = {}
+        self.lookups = SingleFlight()
+        self.cooldowns = CooldownEngine()
+
+        self.xp_write_behind = getenv("XP_WRITE_BEHIND", "false").lower() == "true"
+        self.xp_flush_size = int(getenv("XP_FLUSH_SIZE", 500))
+        self.xp_max_unflushed = int(getenv("XP_MAX_UNFLUSHED", 5000))
+        self.pending_xp = {}
+        self.pending_xp_total = 0
+        self.xp_flusher.change_interval(seconds=float(getenv("XP_FLUSH_INTERVAL", 10)))
+
+        self.backfill_chunk = int(getenv("MEMBER_BACKFILL_CHUNK", 1000))
+        self.join_flush_size = int(getenv("JOIN_FLUSH_SIZE", 100))
+        self.pending_joins = set()
+        self.backfill_stats = BatchStats()
+        self.join_stats = BatchStats()
+        self.join_flusher.change_interval(seconds=float(getenv("JOIN_FLUSH_INTERVAL", 2)))
+        self.metrics_logger.change_interval(seconds=float(getenv("MONGO_METRICS_INTERVAL", 300)))
+
+    async def cog_load(self) -> None:
+        """
+        Starts periodic xp flushing if write-behind mode is enabled, join flushing and periodic database metrics logging.
+        """
+        if self.xp_write_behind:
+            self.xp_flusher.start()
+        self.join_flusher.start()
+        self.metrics_logger.start()
+
+    async def cog_unload(self) -> None:
+        """
+        Stops periodic tasks and writes everything still buffered (called on bot shutdown).
+        """
+        self.xp_flusher.cancel()
+        self.join_flusher.cancel()
+        self.metrics_logger.cancel()
+        await self.flush_xp()
+        await self.flush_joins()
+
+    async def ensure_indexes(self) -> None:
+        """
+        Creates indexes declared in INDEXES if they are missing and logs how long each build took.
+        Existing indexes that differ from declaration (or are not declared at all) are only logged
+        as drift, never dropped automatically.
+        """
+        started = monotonic()
+        for collection, indexes in INDEXES.items():
+            existing = await self.bot.database[collection].index_information()
+
+            for index in indexes:
+                spec = index.document
+                name = spec["name"]
+                current = existing.get(name)
+
+                if current is not None:
+                    key_drift = list(current["key"]) != list(spec["key"].items())
+                    option_drift = [option for option in INDEX_OPTIONS if current.get(option) != spec.get(option)]
+                    if key_drift or option_drift:
+                        logger.warning(f"Index drift on {collection}.{name}: declared {dict(spec)}, found {dict(current)}")
+                    continue
+
+                build_started = monotonic()
+                await self.bot.database[collection].create_indexes([index])
+                logger.info(f"Built index {collection}.{name} in {monotonic() - build_started:.2f}s")
+
+            undeclared = set(existing) - {"_id_"} - {index.document["name"] for index in indexes}
+            for name in undeclared:
+                logger.warning(f"Index {collection}.{name} exists in database but is not declared in INDEXES")
+
+        logger.info(f"Index bootstrap finished in {monotonic() - started:.2f}s")
+
+    @tasks.loop(seconds=10)
+    async def xp_flusher(self) -> None:
+        """
+        Periodically flushes buffered xp gains.
+        """
+        await self.flush_xp()
+
+    @tasks.loop(seconds=2)
+    async def join_flusher(self) -> None:
+        """
+        Periodically creates documents of members who joined since the last flush.
+        """
+        await self.flush_joins()
+
+    @tasks.loop(seconds=300)
+    async def metrics_logger(self) -> None:
+        """
+        Periodically dumps database command metrics, member cache, lookup coalescing and animation counters to the log.
+        """
+        if getattr(self.bot, "command_metrics", None):
+            self.bot.command_metrics.log_summary()
+        logger.info(f"member cache: {self.cache_stats()}")
+        logger.info(f"lookup coalescing: {self.lookups.stats()}")
+        logger.info(f"cooldowns: {self.cooldowns.stats()}")
+        logger.info(f"member joins: {self.join_stats.stats()}, guild backfills: {self.backfill_stats.stats()}")
+        if getattr(self.bot, "animations", None):
+            logger.info(f"animations: {self.bot.animations.stats()}")
 
     @commands.Cog.listener()
     async def on_member_join(self, member : discord.Member) -> None:
         """
-        Listen for member joining the guild and creates document for them in database if it doesn't already exists.
+        Listen for member joining the guild and queues creation of their document.
+        Joins are written in batches by join_flusher, so a raid doesn't turn into thousands of single upserts.
 
         Arguments:
             member (discord.Member): Member who just joined the guild.
         """
-        member_in_database = await self.bot.database["users"].find_one({"_id" : str(member.id)})
-        if member_in_database is None:
-            await self.add_member_to_database(member)
+        if member.bot:
+            return
+        self.pending_joins.add(str(member.id))
+        if len(self.pending_joins) >= self.join_flush_size:
+            await self.flush_joins()
 
-    async def find_or_create_guild(self, discord_Obj) -> dict:
+    async def find_or_create_guild(self, discord_Obj) -> GuildDoc:
         """
         Retrieve guild data from database. If guild document dont exist, creates it.
 
         Arguments:
-            discord_Obj: Discord object (Interaction, Channel, Member, Message)
+            discord_Obj: Discord object (Guild, Interaction, Channel, Member, Message)
 
         Returns:
-            dict: Guild data document from database or None if error occured.
+            GuildDoc: Guild data from database or None if error occured.
         """
 
         guild_id = None
-        if isinstance(discord_Obj, discord.Interaction):
+        if isinstance(discord_Obj, discord.Guild):
+            guild = discord_Obj
+            guild_id = str(guild.id)
+        elif isinstance(discord_Obj, discord.Interaction):
+            guild = discord_Obj.guild
             guild_id = str(discord_Obj.guild_id)
         elif isinstance(discord_Obj, (discord.abc.GuildChannel, discord.Role, discord.Member, discord.Message)):
-            guild_id = str(discord_Obj.guild.id)
+            guild = discord_Obj.guild
+            guild_id = str(guild.id)
         else:
             return None
-        guild_data = await self.bot.database["guilds"].find_one({"_id": guild_id})
-        if guild_data is None:
-            await self.add_guild_to_database(discord_Obj.guild)
-            guild_data = await self.bot.database["guilds"].find_one({"_id": guild_id})
+
+        guild_data = self.guild_cache.get(guild_id)
+        if guild_data is not None:
+            return guild_data
+
+        return await self.lookups.run(("guilds", guild_id, None), partial(self.fetch_guild, guild_id, guild))
+
+    async def fetch_guild(self, guild_id : str, guild : discord.Guild) -> GuildDoc:
+        """
+        Reads (or creates) guild document and caches it. Called through SingleFlight.
+
+        Arguments:
+            guild_id (str): Id of the discord guild.
+            guild (discord.Guild): Guild used for default values of a new document.
+
+        Returns:
+            GuildDoc: Guild data or None if error occured.
+        """
+        document = await self.upsert_document("guilds", guild_id, new_guild_document(guild))
+        if document is None:
+            return None
+        guild_data = GuildDoc.from_document(document)
+        self.guild_cache[guild_id] = guild_data
         return guild_data
 
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """
+        Warms up guild config cache after (re)connecting, so first messages in every guild don't hit database.
+        """
+        await self.prefetch_guilds()
+
+    async def prefetch_guilds(self) -> None:
+        """
+        Loads configs of all guilds the bot is in with one $in query and creates missing
+        guild documents with one unordered bulk write. Loaded configs replace cached ones.
+        """
+        started = monotonic()
+        guilds = {str(guild.id) : guild for guild in self.bot.guilds}
+        if not guilds:
+            return
+
+        try:
+            documents = await self.bot.database["guilds"].find({"_id" : {"$in" : list(guilds)}}).to_list(None)
+        except PyMongoError as e:
+            logger.exception(f"Guild config prefetch failed: {e}")
+            return
+
+        for document in documents:
+            self.guild_cache[document["_id"]] = GuildDoc.from_document(document)
+
+        found = {document["_id"] for document in documents}
+        missing = [guild_id for guild_id in guilds if guild_id not in found]
+        created = {guild_id : new_guild_document(guilds[guild_id]) for guild_id in missing}
+        if created:
+            requests = [UpdateOne({"_id" : guild_id}, {"$setOnInsert" : defaults}, upsert=True) for guild_id, defaults in created.items()]
+            try:
+                await self.bot.database["guilds"].bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    created.pop(missing[error["index"]], None)
+                logger.error(f"Failed to create {len(missing) - len(created)} guild documents: {e}")
+            except PyMongoError as e:
+                logger.exception(f"Failed to create {len(missing)} guild documents: {e}")
+                created = {}
+
+            for guild_id, defaults in created.items():
+                self.guild_cache[guild_id] = GuildDoc.from_document({"_id" : guild_id, **defaults})
+
+        logger.info(f"Prefetched {len(documents)} guild configs and created {len(created)} missing ones in {monotonic() - started:.2f}s")
+
+    async def update_guild(self, guild_id : int, update : dict) -> None:
+        """
+        Updates guild document and patches cached guild config with the same update.
+
+        Arguments:
+            guild_id (int): Id of the discord guild.
+            update (dict): Update in MongoDB syntax, e.g. {"$set" : {"welcome.enabled" : True}}.
+        """
+        await self.bot.database["guilds"].update_one({"_id" : str(guild_id)}, update)
+        guild_data = self.guild_cache.get(str(guild_id))
+        if guild_data is not None:
+            self.guild_cache[str(guild_id)] = apply_to_model(guild_data, update)
+
+    def invalidate_guild(self, guild_id : int) -> None:
+        """
+        Drops guild config from cache, next read will load it from database.
+
+        Arguments:
+            guild_id (int): Id of the discord guild.
+        """
+        self.guild_cache.pop(str(guild_id), None)
+
     async def add_guild_to_database(self, guild : discord.Guild) -> None:
         """
-        Create document for guild in database.
+        Create document for guild in database, if it doesn't exist yet.
 
         Arguments:
             guild (discord.guild): The guild to add.
         """
-        await self.bot.database["guilds"].insert_one({
-                "_id": str(guild.id),
-                "name": guild.name,
-                "prefix": "?",
-                "welcome" : {
-                    "enabled" : False,
-                    "channel_id" : 0,
-                    "message" : None,
-                    "description" : None
-                },
-                "leave" : {
-                    "enabled" : False,
-                    "channel_id" : 0,
-                    "message" : None,
-                    "description" : None
-                },
-                "automod": {
-                    "banned_words" : [],
-                    "anti_bad_words" : False,
-                    "jail" : {
-                        "enabled" : False,
-                        "jail_role" : None,
-                        "jail_category" : None,
-                        "jail_text" : None,
-                        "jail_vc" : None
-                    }
-                },
-                "item_shop" : {
-                    "piece of paper" : 100
-                }
-            })
+        await self.bot.database["guilds"].update_one({"_id" : str(guild.id)}, {"$setOnInsert" : new_guild_document(guild)}, upsert=True)
 
     async def disable_jail(self, discord_Obj) -> None:
         """
@@ -101,69 +632,428 @@ class Database(commands.Cog):
             discord_Obj: Discord object (Interaction, Channel, Member, Message)
         """
 
-        await self.bot.database["guilds"].update_one({"_id" : str(discord_Obj.guild.id)}, {"$set" : {"automod.jail.enabled" : False}})
+        await self.update_guild(discord_Obj.guild.id, {"$set" : {"automod.jail.enabled" : False}})
 
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild : discord.Guild) -> None:
         """
-        Listen for bot joining the guild, then creates documents for guild in database if it doesn't exist.
+        Listen for bot joining the guild, then creates documents for guild and all of its members in database if they don't exist.
 
         Arguments:
             guild (discord.Guild): Guild data.
         """
-        guild_in_database = await self.bot.database["guilds"].find_one({"_id" : str(guild.id)})
+        await self.add_guild_to_database(guild)
+        await self.backfill_members(guild)
 
-        if guild_in_database is None:
-            await self.add_guild_to_database(guild)
+    async def backfill_members(self, guild : discord.Guild) -> None:
+        """
+        Creates missing documents of all guild members with chunked unordered bulk upserts.
 
-    async def find_or_create__member(self, discord_Obj) -> dict:
+        Arguments:
+            guild (discord.Guild): Guild to backfill.
         """
-        Finds or creates members in database.
+        if not guild.chunked:
+            await guild.chunk()
+
+        member_ids = [str(member.id) for member in guild.members if not member.bot]
+        started = monotonic()
+        failed = []
+        for start in range(0, len(member_ids), self.backfill_chunk):
+            failed += await self.upsert_members(member_ids[start:start + self.backfill_chunk], self.backfill_stats)
+
+        logger.info(f"Backfilled {len(member_ids) - len(failed)}/{len(member_ids)} members of guild {guild.id} in {monotonic() - started:.2f}s")
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild : discord.Guild) -> None:
+        """
+        Listen for bot leaving the guild, then drops its cached config.
 
         Arguments:
-            discord_Obj: Discord object (Interaction, Channel, Member, Message).
+            guild (discord.Guild): Guild data.
+        """
+        self.invalidate_guild(guild.id)
+
+    def get_member_id(self, discord_Obj) -> str:
+        """
+        Extracts member id from discord object.
+
+        Arguments:
+            discord_Obj: Discord object (Interaction, Member).
 
         Returns:
-            dict: Member data document from database or None if error occured.
+            str: Member id or None if object is not supported.
         """
-        member_id = None
         if isinstance(discord_Obj, discord.Interaction):
-            member_id = str(discord_Obj.user.id)
+            return str(discord_Obj.user.id)
         elif isinstance(discord_Obj, discord.Member):
-            member_id = str(discord_Obj.id)
-        else:
+            return str(discord_Obj.id)
+        return None
+
+    async def get_member(self, discord_Obj, fields : tuple = None) -> UserDoc:
+        """
+        Finds or creates member, optionally reading only the given fields.
+
+        Arguments:
+            discord_Obj: Discord object (Interaction, Member).
+            fields (tuple): Fields to read, e.g. ("coins", "active_pet"). None reads whole document.
+
+        Returns:
+            UserDoc: Member data or None if error occured.
+        """
+        member_id = self.get_member_id(discord_Obj)
+        if member_id is None:
             return None
+        return await self.load_member(member_id, fields)
 
-        user_data = await self.bot.database["users"].find_one({"_id" : member_id})
-        if user_data is None:
-            await self.add_member_to_database(member_id)
-            user_data = await self.bot.database["users"].find_one({"_id" : member_id})
+    async def find_or_create__member(self, discord_Obj) -> UserDoc:
+        """
+        Finds or creates members in database.
+
+        Arguments:
+            discord_Obj: Discord object (Interaction, Channel, Member, Message).
+
+        Returns:
+            UserDoc: Member data from database or None if error occured.
+        """
+        return await self.get_member(discord_Obj)
+
+    async def load_member(self, member_id : str, fields : tuple = None) -> UserDoc:
+        """
+        Finds or creates member by id.
+        Cached document is returned as is (it's immutable). On cache miss only requested fields are
+        read from database and the rest of UserDoc keeps default values, such partial document is not cached.
+        Concurrent misses for the same member share one query, a partial read joins a full read already in flight.
+
+        Arguments:
+            member_id (str): Id of the discord member.
+            fields (tuple): Fields to read, None reads whole document.
+
+        Returns:
+            UserDoc: Member data or None if error occured.
+        """
+        user_data = self.member_cache.get(member_id)
+        if user_data is not None:
+            return user_data
+
+        if fields is not None and self.lookups.in_flight(("users", member_id, None)):
+            fields = None
+        return await self.lookups.run(("users", member_id, fields), partial(self.fetch_member, member_id, fields))
+
+    async def fetch_member(self, member_id : str, fields : tuple = None) -> UserDoc:
+        """
+        Reads (or creates) member document and caches it if it was read whole. Called through SingleFlight.
+
+        Arguments:
+            member_id (str): Id of the discord member.
+            fields (tuple): Fields to read, None reads whole document.
+
+        Returns:
+            UserDoc: Member data or None if error occured.
+        """
+        document = await self.upsert_document("users", member_id, new_member_document(), fields)
+        if document is None:
+            return None
+        user_data = self.decode_member(document)
+        if fields is None:
+            self.member_cache.put(member_id, user_data)
         return user_data
 
-    async def add_member_to_database(self, member_id : int) -> None:
+    def decode_member(self, document : dict) -> UserDoc:
         """
-        Add member to database.
+        Decodes member document, adding xp that is still buffered in write-behind mode.
+
+        Arguments:
+            document (dict): Member document from database.
+
+        Returns:
+            UserDoc: Decoded member.
+        """
+        pending = self.pending_xp.get(document["_id"])
+        if pending and "xp" in document:
+            document["xp"] += pending
+        return UserDoc.from_document(document)
+
+    async def update_member(self, member_id : int, update : dict) -> None:
+        """
+        Updates member document and writes the same update through to the member cache.
 
         Arguments:
             member_id (int): Id of the discord member.
+            update (dict): Update in MongoDB syntax, e.g. {"$inc" : {"coins" : 10}}.
         """
-        await self.bot.database["users"].update_one({
-            "_id" : str(member_id),
-            "coins" : 0,
-            "xp" :  0,
-            "level" : 1,
-            "cooldowns" : {
-                "last_daily_reward" : None,
-                "last_crime" : None,
-                "last_steal" : None
-            },
-            "level_up_notification" : True,
-            "inventory" : {},
-            "active_pet" : None
-        },
-        upsert = True
+        await self.bot.database["users"].update_one({"_id" : str(member_id)}, update)
+        if "xp" in update.get("$set", {}):
+            self.pending_xp_total -= self.pending_xp.pop(str(member_id), 0)
+        self.member_cache.apply(str(member_id), update)
+
+    async def debit(self, member_id : int, amount : int, payout : int = 0) -> int:
+        """
+        Takes amount from member coins only if they have enough and adds payout in the same write.
+        Balance check and update are one conditional find_one_and_update, so concurrent bets
+        can't overdraw the balance. Bet with known outcome settles in this single round trip.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            amount (int): Coins to take, member must have at least this much.
+            payout (int): Coins to add, e.g. win of the bet.
+
+        Returns:
+            int: New balance or None if member doesn't have enough coins.
+        """
+        query = {"_id" : str(member_id)}
+        if amount > 0:
+            query["coins"] = {"$gte" : amount}
+        document = await self.bot.database["users"].find_one_and_update(
+            query,
+            {"$inc" : {"coins" : payout - amount}},
+            projection=("coins",),
+            return_document=ReturnDocument.AFTER
         )
+        if document is None:
+            return None
+        self.member_cache.apply(str(member_id), {"$set" : {"coins" : document["coins"]}})
+        return document["coins"]
+
+    async def credit(self, member_id : int, amount : int) -> int:
+        """
+        Adds coins to member and returns new balance, in one round trip.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            amount (int): Coins to add.
+
+        Returns:
+            int: New balance or None if member doesn't exist.
+        """
+        return await self.debit(member_id, 0, amount)
+
+    async def transfer(self, from_id : int, to_id : int, amount : int, update : dict = None) -> bool:
+        """
+        Moves coins between two members, guarded by sender balance. Both members must already have documents
+        (e.g. read through load_member), nothing is upserted here.
+        Sender leg is a conditional $inc filtered on coins >= amount, both legs go in one ordered bulk_write.
+        When deployment supports transactions the write runs in one and is aborted unless both legs matched.
+        Otherwise a leg that matched alone is undone: receiver's $inc if receiver exists (then sender lacked coins),
+        sender's debit if it doesn't. Extra $set of the receiver isn't undone, callers release it themselves.
+
+        Arguments:
+            from_id (int): Id of the discord member coins are taken from.
+            to_id (int): Id of the discord member receiving coins.
+            amount (int): Coins to move.
+            update (dict): Extra update of the receiver written in the same leg, e.g. cooldown $set.
+
+        Returns:
+            bool: True if coins were moved, False if sender doesn't have enough coins or receiver is missing.
+        """
+        from_id, to_id = str(from_id), str(to_id)
+        cached = self.member_cache.peek(from_id)
+        if cached is not None and cached.coins < amount:
+            return False
+
+        update = update or {}
+        to_update = {**update, "$inc" : {**update.get("$inc", {}), "coins" : amount}}
+        from_update = {"$inc" : {"coins" : -amount}}
+        requests = [UpdateOne({"_id" : from_id, "coins" : {"$gte" : amount}}, from_update), UpdateOne({"_id" : to_id}, to_update)]
+        storage = self.bot.database
+        users = storage["users"]
+
+        if await storage.transactions():
+            async def write(session) -> int:
+                result = await users.bulk_write(requests, session=session)
+                if result.matched_count < len(requests):
+                    await session.abort_transaction()
+                return result.matched_count
+
+            async with storage.start_session() as session:
+                matched = await session.with_transaction(write)
+        else:
+            matched = (await users.bulk_write(requests)).matched_count
+            if matched == 1:
+                revert = {"$inc" : {field : -value for field, value in to_update["$inc"].items()}}
+                if (await users.update_one({"_id" : to_id}, revert)).matched_count == 0:
+                    await users.update_one({"_id" : from_id}, {"$inc" : {"coins" : amount}})
+                    logger.error(f"Transfer of {amount} coins to missing member {to_id} was refunded to {from_id}")
+
+        if matched < len(requests):
+            return False
+        self.member_cache.apply(from_id, from_update)
+        self.member_cache.apply(to_id, to_update)
+        return True
+
+    async def claim_cooldown(self, member_id : int, field : str, duration : timedelta, now : datetime = None) -> timedelta:
+        """
+        Claims command cooldown of member. Cooldowns already in memory are checked without database access,
+        unknown ones are read once (only the cooldown field). Caller writes the claim ("cooldowns.<field>" set to now)
+        together with its other changes through update_member.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field, e.g. "last_crime".
+            duration (timedelta): Length of the cooldown.
+            now (datetime): Aware time of the claim, utcnow() by default.
+
+        Returns:
+            timedelta: Time left if member is still on cooldown, None if cooldown was claimed.
+        """
+        member_id = str(member_id)
+        if (member_id, field) not in self.cooldowns:
+            member_data = await self.load_member(member_id, (f"cooldowns.{field}",))
+            last_used = getattr(member_data.cooldowns, field) if member_data is not None else None
+            self.cooldowns.hydrate(member_id, field, last_used, duration)
+        return self.cooldowns.claim(member_id, field, duration, utcnow() if now is None else now)
+
+    def release_cooldown(self, member_id : int, field : str) -> None:
+        """
+        Forgets claimed cooldown that wasn't saved (command failed before its write),
+        so memory doesn't disagree with database. Next claim reads it from database again.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field.
+        """
+        self.cooldowns.release(str(member_id), field)
+
+    async def add_xp(self, member_id : int, amount : int) -> None:
+        """
+        Adds xp to member. In write-behind mode gain is only summed in memory (cached document
+        is updated right away, so level checks see the total) and written later in bulk.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            amount (int): Xp to add.
+        """
+        if not self.xp_write_behind:
+            await self.update_member(member_id, {"$inc" : {"xp" : amount}})
+            return
+
+        member_id = str(member_id)
+        self.pending_xp[member_id] = self.pending_xp.get(member_id, 0) + amount
+        self.pending_xp_total += amount
+        self.member_cache.apply(member_id, {"$inc" : {"xp" : amount}})
+
+        if len(self.pending_xp) >= self.xp_flush_size or self.pending_xp_total >= self.xp_max_unflushed:
+            await self.flush_xp()
+
+    async def flush_xp(self) -> None:
+        """
+        Writes all buffered xp gains as one unordered bulk_write.
+        If the write fails, gains are put back into the buffer.
+        """
+        if not self.pending_xp:
+            return
+
+        pending, self.pending_xp = self.pending_xp, {}
+        self.pending_xp_total = 0
+
+        items = list(pending.items())
+        requests = [UpdateOne({"_id" : member_id}, {"$inc" : {"xp" : amount}}) for member_id, amount in items]
+        try:
+            await self.bot.database["users"].bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            failed = [items[error["index"]] for error in e.details.get("writeErrors", [])]
+            logger.error(f"Failed to flush xp of {len(failed)} members: {e}")
+            self.requeue_xp(failed)
+        except PyMongoError as e:
+            logger.exception(f"Failed to flush xp of {len(items)} members: {e}")
+            self.requeue_xp(items)
+
+    def requeue_xp(self, items : list) -> None:
+        """
+        Puts xp gains that failed to flush back into the buffer.
+
+        Arguments:
+            items (list): List of (member_id, xp) tuples.
+        """
+        for member_id, amount in items:
+            self.pending_xp[member_id] = self.pending_xp.get(member_id, 0) + amount
+            self.pending_xp_total += amount
+
+    async def flush_joins(self) -> None:
+        """
+        Creates documents of buffered joined members with one unordered bulk write.
+        Members whose upsert failed are put back into the buffer.
+        """
+        if not self.pending_joins:
+            return
+
+        member_ids, self.pending_joins = list(self.pending_joins), set()
+        failed = await self.upsert_members(member_ids, self.join_stats)
+        self.pending_joins.update(failed)
+
+    async def upsert_members(self, member_ids : list, stats : BatchStats) -> list:
+        """
+        Creates missing member documents with one unordered bulk write of $setOnInsert upserts,
+        existing documents are left untouched.
+
+        Arguments:
+            member_ids (list): Ids of members.
+            stats (BatchStats): Counters to record the write in.
+
+        Returns:
+            list: Ids of members whose upsert failed.
+        """
+        defaults = new_member_document()
+        requests = [UpdateOne({"_id" : member_id}, {"$setOnInsert" : defaults}, upsert=True) for member_id in member_ids]
+        started = monotonic()
+        try:
+            result = await self.bot.database["users"].bulk_write(requests, ordered=False)
+            failed, inserted = [], result.upserted_count
+        except BulkWriteError as e:
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            failed, inserted = [member_ids[error["index"]] for error in errors], e.details.get("nUpserted", 0)
+            if failed:
+                logger.error(f"Failed to create documents of {len(failed)} members: {e}")
+        except PyMongoError as e:
+            logger.exception(f"Failed to create documents of {len(member_ids)} members: {e}")
+            failed, inserted = member_ids, 0
+
+        stats.record(len(member_ids), inserted, len(failed), monotonic() - started)
+        return failed
+
+    def cache_stats(self) -> dict:
+        """
+        Returns member cache counters.
+
+        Returns:
+            dict: Member cache statistics.
+        """
+        return self.member_cache.stats()
+
+    async def add_member_to_database(self, member_id : int) -> None:
+        """
+        Add member to database, if document doesn't exist yet.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+        """
+        await self.bot.database["users"].update_one({"_id" : str(member_id)}, {"$setOnInsert" : new_member_document()}, upsert=True)
+
+    async def upsert_document(self, collection : str, document_id : str, defaults : dict, fields : tuple = None) -> dict:
+        """
+        Returns document with given id, inserting defaults first if it doesn't exist.
+        Done as one atomic find_one_and_update, so a miss costs a single round trip
+        and concurrent calls for the same new id can't create it twice.
+
+        Arguments:
+            collection (str): Name of the collection ("users" or "guilds").
+            document_id (str): Id of the document.
+            defaults (dict): Fields set only when document is inserted.
+            fields (tuple): Fields to return, None returns whole document.
+
+        Returns:
+            dict: Document after the upsert.
+        """
+        try:
+            return await self.bot.database[collection].find_one_and_update(
+                {"_id" : document_id},
+                {"$setOnInsert" : defaults},
+                projection=fields,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return await self.bot.database[collection].find_one({"_id" : document_id}, projection=fields)
 
 async def setup(bot):
     await bot.add_cog(Database(bot))
\ No newline at end of file
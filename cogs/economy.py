@@ -2,11 +2,20 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Embed
 from random import randint
-from datetime import datetime, timedelta
+from datetime import timedelta
+from .utils.models import UserDoc
+from .utils.pipeline import MessageContext
+from .utils.cooldowns import split_remaining, utcnow
+from pymongo.errors import PyMongoError
 import logging
 
 logger = logging.getLogger(__name__)
 
+DAILY_REWARD = 100
+DAILY_COOLDOWN = timedelta(hours=24)
+# Xp needed for the next level is XP_PER_LEVEL times current level.
+XP_PER_LEVEL = 8
+
 class Economy(commands.Cog):
     """
     Cog responsible for Economy structure, features: checking balance and inventory and handling daily rewards.
@@ -29,50 +38,84 @@ class Economy(commands.Cog):
         """
         return self.bot.get_cog("Database")
     
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj, fields : tuple = None) -> UserDoc:
         """
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            fields (tuple): Fields to read, None reads whole document.
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         """
         database_cog = await self.get_database_cog()
-        member_data = await database_cog.find_or_create__member(discord_Obj)
+        member_data = await database_cog.get_member(discord_Obj, fields)
         if member_data is None:
             return None
         return member_data
 
-    @commands.Cog.listener()
-    async def on_message(self, message : discord.Message) -> None:
+    async def update_member(self, member_id : int, update : dict) -> None:
         """
-        Listens for any message send, then gives author 1-5 xp.
-        If user active pet is doggo then user recives bounus xp.
+        Updates member document through Database cog, so cached member data stays in sync.
 
         Arguments:
-            message (discord.Message): Message that was send in channel.
+            member_id (int): Id of the discord member.
+            update (dict): Update in MongoDB syntax.
         """
+        database_cog = await self.get_database_cog()
+        await database_cog.update_member(member_id, update)
 
-        if message.author.bot:
-            return
-        
-        member_data = await self.get_member(message.author)
-        if member_data.get("active_pet", 0) == "doggo":
+    async def claim_cooldown(self, member_id : int, field : str, duration : timedelta, now) -> timedelta:
+        """
+        Claims command cooldown through Database cog, answered from memory if member is on cooldown.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field, e.g. "last_daily_reward".
+            duration (timedelta): Length of the cooldown.
+            now (datetime): Aware time of the claim.
+
+        Returns:
+            timedelta: Time left if member is still on cooldown, None if cooldown was claimed.
+        """
+        database_cog = await self.get_database_cog()
+        return await database_cog.claim_cooldown(member_id, field, duration, now)
+
+    async def release_cooldown(self, member_id : int, field : str) -> None:
+        """
+        Releases claimed cooldown that wasn't saved, because command failed before its write.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field, e.g. "last_daily_reward".
+        """
+        database_cog = await self.get_database_cog()
+        database_cog.release_cooldown(member_id, field)
+
+    async def award_message_xp(self, ctx : MessageContext) -> None:
+        """
+        Message pipeline stage, gives author 1-5 xp.
+        If user active pet is doggo then user recives bounus xp.
+
+        Arguments:
+            ctx (MessageContext): Context of the message that was send in channel.
+        """
+        member_data = ctx.member
+        if member_data.active_pet == "doggo":
             added_xp = randint(3,8)
         else:
             added_xp = randint(1,5)
-        await self.bot.database["users"].update_one({"_id" : str(message.author.id)}, {"$inc" : {"xp" : added_xp}})
-        member_data = await self.get_member(message.author)
-        xp = member_data.get("xp")
-        level = member_data.get("level")
-        if xp >= 8 * level:
-            await self.bot.database["users"].update_one({"_id" : str(message.author.id)}, {"$inc" : {"level" : 1}, "$set" : {"xp" : 0}})
-            
-            embed = Embed(title="**🔊 LEVEL UP **", description=f"**{message.author.mention} JUST LEVELED UP TO LEVEL {level+1}\nCONGRATULATIONS!**", color=discord.Color.random())
-            await message.channel.send(embed=embed)
-    
+
+        level = member_data.level
+        if member_data.xp + added_xp >= XP_PER_LEVEL * level:
+            ctx.set("xp", 0)
+            ctx.inc("level", 1)
+
+            embed = Embed(title="**🔊 LEVEL UP **", description=f"**{ctx.message.author.mention} JUST LEVELED UP TO LEVEL {level+1}\nCONGRATULATIONS!**", color=discord.Color.random())
+            ctx.announce(embed)
+        else:
+            ctx.inc("xp", added_xp)
 
     @app_commands.command(name="balance", description="Check your balance!")
     async def check_bal(self, interaction : discord.Interaction) -> None:
@@ -82,11 +125,11 @@ class Economy(commands.Cog):
         Arguments:
             interaction (discord.Interaction): Context interaction.
         """
-        member_data = await self.get_member(interaction)
+        member_data = await self.get_member(interaction, ("coins",))
         if member_data is None:
             return
 
-        balance = member_data.get("coins", 0)
+        balance = member_data.coins
 
         embed = Embed(title="**🪙 NATIONAL BANK**", description=f"**Your balance: ${balance}**", color=discord.Color.gold())
 
@@ -100,19 +143,23 @@ class Economy(commands.Cog):
         Arguments:
             interaction (discord.Interaction): Context interaction.
         """
-        member_data = await self.get_member(interaction)
-        last_daily = member_data.get("cooldowns", {}).get("last_daily_reward")
+        now = utcnow()
+        remaining = await self.claim_cooldown(interaction.user.id, "last_daily_reward", DAILY_COOLDOWN, now)
 
-        if last_daily is None or datetime.now() - last_daily >= timedelta(hours=24):
-            await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$set" : {"cooldowns.last_daily_reward" : datetime.now()}, "$inc": {"coins": 100}})
+        if remaining is None:
+            try:
+                await self.update_member(interaction.user.id, {"$set" : {"cooldowns.last_daily_reward" : now}, "$inc": {"coins": DAILY_REWARD}})
+            except PyMongoError:
+                await self.release_cooldown(interaction.user.id, "last_daily_reward")
+                raise
 
             embed = Embed(title="**📅 DAILY REWARD**", description="**U claimed your daily! Come back in 24h**", color=discord.Color.green())
         
             await interaction.response.send_message(embed=embed, ephemeral=True)
             
-        elif datetime.now() - last_daily < timedelta(hours=24):
+        else:
 
-            hours, minutes = await self.time_left(last_daily)
+            hours, minutes = split_remaining(remaining)
 
             embed = Embed(title="**📅 DAILY REWARD**", description=f"**U can claim next daily reward in {hours} hours and {minutes} minutes**", color=discord.Color.green())
 
@@ -128,7 +175,7 @@ class Economy(commands.Cog):
         """
         member_data = await self.get_member(interaction)
 
-        inventory = member_data.get("inventory", {})
+        inventory = member_data.inventory
 
         embed = discord.Embed(
             title=f"{interaction.user.name} inventory!",
@@ -138,30 +185,14 @@ class Economy(commands.Cog):
 
         for name, item in inventory.items():
             embed.add_field(
-                name=f"{item['emote']} **{name.capitalize()}**",
-                value=f"*{item['desc']}*\nRarity: {item['rare_emote']}\nLevel: {item['level']}\nxp: {item['xp']}",
+                name=f"{item.emote} **{name.capitalize()}**",
+                value=f"*{item.desc}*\nRarity: {item.rare_emote}\nLevel: {item.level}\nxp: {item.xp}",
                 inline=True
             )
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
-    async def time_left(self, last_smth : datetime) -> tuple:
-        '''
-        Handling countdowns.
-
-        Arguments:
-            last_smth (datetime): Last command usage.
-            hours (int): How many hours cooldown is.
-
-        Returns:
-                hours, minutes (tuple): Time left on cooldown.
-        '''
-        remaining = timedelta(hours=24) - (datetime.now() - last_smth)
-        hours, remainder = divmod(remaining.seconds, 3600)
-        minutes = remainder // 60
-        return hours, minutes 
-
 
 async def setup(bot):
     await bot.add_cog(Economy(bot))
\ No newline at end of file
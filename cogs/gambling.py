@@ -2,9 +2,13 @@ import discord
 from discord import Embed, Colour
 from discord.ext import commands
 from discord import app_commands
-from random import randint, choice
-from asyncio import sleep
-from datetime import datetime, timedelta
+from random import randint
+from datetime import timedelta
+from .utils.models import UserDoc
+from .utils import payouts
+from .utils.cooldowns import split_remaining, utcnow
+from pymongo.errors import PyMongoError
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,21 +36,106 @@ class Gambling(commands.Cog):
         '''
         return self.bot.get_cog("Database")
     
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj, fields : tuple = None) -> UserDoc:
         '''
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            fields (tuple): Fields to read, None reads whole document.
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         '''
         database_cog = await self.get_database_cog()
-        member_data = await database_cog.find_or_create__member(discord_Obj)
+        member_data = await database_cog.get_member(discord_Obj, fields)
         if member_data is None:
             return None
         return member_data
+
+    async def update_member(self, member_id : int, update : dict) -> None:
+        '''
+        Updates member document through Database cog, so cached member data stays in sync.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            update (dict): Update in MongoDB syntax.
+        '''
+        database_cog = await self.get_database_cog()
+        await database_cog.update_member(member_id, update)
+
+    async def debit(self, member_id : int, amount : int, payout : int = 0) -> int:
+        '''
+        Takes bet from member if they have enough coins and adds payout, in one atomic write.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            amount (int): Bet.
+            payout (int): Win added in the same write.
+
+        Returns:
+            int: New balance or None if member doesn't have enough coins.
+        '''
+        database_cog = await self.get_database_cog()
+        return await database_cog.debit(member_id, amount, payout)
+
+    async def credit(self, member_id : int, amount : int) -> int:
+        '''
+        Adds coins to member.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            amount (int): Coins to add.
+
+        Returns:
+            int: New balance.
+        '''
+        database_cog = await self.get_database_cog()
+        return await database_cog.credit(member_id, amount)
+
+    async def transfer(self, from_id : int, to_id : int, amount : int, update : dict = None) -> bool:
+        '''
+        Moves coins between members through Database cog, both legs in one bulk_write (in a transaction when available).
+        Both members must already have documents, e.g. read through get_member.
+
+        Arguments:
+            from_id (int): Id of the discord member coins are taken from.
+            to_id (int): Id of the discord member receiving coins.
+            amount (int): Coins to move.
+            update (dict): Extra update of the receiver.
+
+        Returns:
+            bool: True if coins were moved, False if sender doesn't have enough coins.
+        '''
+        database_cog = await self.get_database_cog()
+        return await database_cog.transfer(from_id, to_id, amount, update)
+
+    async def claim_cooldown(self, member_id : int, field : str, duration : timedelta, now) -> timedelta:
+        '''
+        Claims command cooldown through Database cog, answered from memory if member is on cooldown.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field, e.g. "last_crime".
+            duration (timedelta): Length of the cooldown.
+            now (datetime): Aware time of the claim.
+
+        Returns:
+            timedelta: Time left if member is still on cooldown, None if cooldown was claimed.
+        '''
+        database_cog = await self.get_database_cog()
+        return await database_cog.claim_cooldown(member_id, field, duration, now)
+
+    async def release_cooldown(self, member_id : int, field : str) -> None:
+        '''
+        Releases claimed cooldown that wasn't saved, because command failed before its write.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            field (str): Cooldown field, e.g. "last_crime".
+        '''
+        database_cog = await self.get_database_cog()
+        database_cog.release_cooldown(member_id, field)
     
     @app_commands.command(name = "slots", description="Gamble your money on slots")
     @app_commands.describe(amount = "Amount of money u want to gamble")
@@ -58,22 +147,16 @@ class Gambling(commands.Cog):
             interaction (discord.Interaction): The interaction context.
             amount (int): Amount of money users used to gamble.
         '''
-        member_data = await self.get_member(interaction)
-        money = member_data.get("coins", 0)
-        active_pet = member_data.get("active_pet")
-
-        if money < amount:
-            await interaction.response.send_message("U dont have enought money!", ephemeral=True)
-            return
-        
-        if amount <= 0 or amount >= 1000000:
+        if not payouts.MIN_BET <= amount <= payouts.MAX_BET:
             await interaction.response.send_message("Please select 1-1000000 coins!", ephemeral=True)
             return
 
+        member_data = await self.get_member(interaction, ("active_pet",))
+        active_pet = member_data.active_pet
 
-        await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$inc" : {"coins" : -amount}})
-
-        colors = ["🟩","🟦", "🟪", "🟨", "🟥", "⬜"]
+        if await self.debit(interaction.user.id, amount) is None:
+            await interaction.response.send_message("U dont have enought money!", ephemeral=True)
+            return
 
         embed = discord.Embed(
             title="🎰🎰🎰",
@@ -81,30 +164,27 @@ class Gambling(commands.Cog):
             color=discord.Color.red()
         )
 
-        slot1, slot2, slot3 = choice(colors), choice(colors), choice(colors)
-
         embed.add_field(
                 name="",
-                value=f"{slot1}|{slot2}|{slot3}"
+                value="|".join(payouts.spin_slots())
         )
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        await sleep(0.3)
-
-        for _ in range(8):
-            slot1, slot2, slot3 = choice(colors), choice(colors), choice(colors)
-            embed.set_field_at(
-                index=0,
-                name="",
-                value=f"{slot1}|{slot2}|{slot3}"
-            )
+        async def show(slots : tuple) -> None:
+            embed.set_field_at(index=0, name="", value="|".join(slots))
             await interaction.edit_original_response(embed=embed)
-            await sleep(0.3)
 
-        if slot1 == slot2 == slot3:
-            win_amount = await self.rat_pet_activity(active_pet, amount*7)
-            await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$inc": {"coins": int(win_amount)}})
+        frames = [payouts.spin_slots() for _ in range(self.bot.animations.frame_budget + 1)]
+        try:
+            await self.bot.animations.animate("slots", frames, show, 0.3)
+        except discord.HTTPException as e:
+            logger.warning(f"Slots result couldn't be shown to {interaction.user.id}: {e}")
+        win_amount = payouts.slots_win(frames[-1], amount)
+
+        if win_amount:
+            win_amount = await self.rat_pet_activity(active_pet, win_amount)
+            await self.credit(interaction.user.id, int(win_amount))
             embed_result = discord.Embed(
                 title="🎉 JACKPOT! 🎉",
                 description=f"All slots match! You won **{int(win_amount)} coins**!",
@@ -120,7 +200,7 @@ class Gambling(commands.Cog):
         await interaction.followup.send(embed=embed_result, ephemeral=True)
                    
 
-    @app_commands.command(name="scratches", description="Scratch your way to glory! 12$")
+    @app_commands.command(name="scratches", description=f"Scratch your way to glory! {payouts.SCRATCH_PRICE}$")
     async def scratches(self, interaction: discord.Interaction) -> None:
         '''
         Simulates gambling game: "scratches".
@@ -128,30 +208,19 @@ class Gambling(commands.Cog):
         Arguments:
             interaction (discord.Interaction): The interaction context.
         '''
-        member_data = await self.get_member(interaction)
-        money = member_data.get("coins", 0)
-        active_pet = member_data.get("active_pet")
+        member_data = await self.get_member(interaction, ("active_pet",))
+        active_pet = member_data.active_pet
 
-        if money < 12:
+        win = payouts.scratch_win(randint(1, payouts.SCRATCH_ROLL))
+        if win != 0:
+            win = await self.rat_pet_activity(active_pet, win)
+
+        if await self.debit(interaction.user.id, payouts.SCRATCH_PRICE, int(win)) is None:
             embed = Embed(title="Insufficient funds", description="You don't have enough money to play!", color=Colour.red())
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-
-        await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$inc": {"coins": -12}})
-
-        roll = randint(1, 100)
-        win = 0
-        if 1 <= roll <= 5:
-            win = randint(150, 250)
-        elif 6 <= roll <= 15:
-            win = randint(60, 120)
-        elif 16 <= roll <= 30:
-            win = randint(20, 50)
-
         if win != 0:
-            win = await self.rat_pet_activity(active_pet, win)
-            await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$inc": {"coins": int(win)}})
             embed = Embed(
                 title="🎉 You won!",
                 description=f"You just won **{int(win)} coins**!",
@@ -160,7 +229,7 @@ class Gambling(commands.Cog):
         else:
             embed = Embed(
                 title="💸 You lost",
-                description="Better luck next time! You lost your 12 coins.",
+                description=f"Better luck next time! You lost your {payouts.SCRATCH_PRICE} coins.",
                 color=Colour.red()
             )
 
@@ -180,45 +249,31 @@ class Gambling(commands.Cog):
             color (str): Roulette pocket color.
             number (int): Roulette pocket number.
         '''
-        member_data = await self.get_member(interaction)
-        active_pet = member_data.get("active_pet")
-
-        if member_data.get("coins", 0) < amount:
-            embed = Embed(title="Insufficient funds", description="You don't have enough money to gamble!", color=Colour.red())
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-
-        if amount <= 0 or amount >= 1000000:
+        if not payouts.MIN_BET <= amount <= payouts.MAX_BET:
             await interaction.response.send_message("Please select 1-1000000 coins!", ephemeral=True)
             return
 
         if number is not None:
-            if number < 0 or number > 36:
+            if number < 0 or number >= payouts.ROULETTE_POCKETS:
                 await interaction.response.send_message("Please select number from 1-36", ephemeral=True)
                 return
 
-        await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$inc": {"coins": -amount}})
+        member_data = await self.get_member(interaction, ("active_pet",))
+        active_pet = member_data.active_pet
 
-        result = randint(0, 36)
+        result = randint(0, payouts.ROULETTE_POCKETS - 1)
+        result_color = payouts.roulette_color(result)
+        win = payouts.roulette_win(amount, result, color.value, number)
 
-        if result == 0:
-            result_color = "green"
-        elif result % 2 == 0:
-            result_color = "black"
-        else:
-            result_color = "red"
+        if win > 0:
+            win = await self.rat_pet_activity(active_pet, win)
 
-        win = 0
-        if result_color == color.value and result == number:
-            win = amount * 70
-        elif result == number:
-            win = amount * 35
-        elif result_color == color:
-            win = amount * 2
+        if await self.debit(interaction.user.id, amount, int(win)) is None:
+            embed = Embed(title="Insufficient funds", description="You don't have enough money to gamble!", color=Colour.red())
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
 
         if win > 0:
-            win = await self.rat_pet_activity(active_pet, win)
-            await self.bot.database["users"].update_one({"_id": str(interaction.user.id)}, {"$inc": {"coins": int(win)}})
             embed = Embed(
                 title="🎉 You won!",
                 description=f"The roulette landed on **{result} ({result_color})**\nYou won **{int(win)} coins**!",
@@ -242,52 +297,55 @@ class Gambling(commands.Cog):
         Arguments:
             interaction (discord.Interaction): The interaction context.
         '''
-        member_data = await self.get_member(interaction)
-        active_pet = member_data.get("active_pet")
-        if not member_data:
+        now = utcnow()
+        remaining = await self.claim_cooldown(interaction.user.id, "last_crime", timedelta(hours=payouts.CRIME_COOLDOWN), now)
+
+        if remaining is not None:
+            hours, minutes = split_remaining(remaining)
+
+            embed = Embed(
+                title="⏰ MORE TIME",
+                description=f"U need to wait {hours} hours and {minutes} to commit a crime again!",
+                color=Colour.orange()
+            )
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
             return
-        
-        last_crime = member_data.get("cooldowns", {}).get("last_crime")
 
-        if last_crime is None or datetime.now() - last_crime >= timedelta(hours=3):
-            chance = randint(1,10)
-            if chance <= 6:
-                money_from_crime = randint(50, 150)
+        try:
+            member_data = await self.get_member(interaction, ("active_pet",))
+            if not member_data:
+                await self.release_cooldown(interaction.user.id, "last_crime")
+                return
+            active_pet = member_data.active_pet
+
+            chance = randint(1, payouts.CHANCE_ROLL)
+            if payouts.crime_succeeded(chance):
+                money_from_crime = randint(*payouts.CRIME_REWARD)
                 money_from_crime = await self.squid_pet_activity(active_pet, money_from_crime)
-                await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set" : {"cooldowns.last_crime" : datetime.now()}, "$inc" : {
+                await self.update_member(interaction.user.id, {"$set" : {"cooldowns.last_crime" : now}, "$inc" : {
                     "coins" : int(money_from_crime)}})
-                
+
                 embed = Embed(
                     title="💸 You commited a crime!",
                     description=f"U have a {money_from_crime} more illegal coins!",
                     color=Colour.green()
                 )
-
-                await interaction.response.send_message(embed=embed, ephemeral=True)
             else:
-                bail = randint(75, 125)
-                await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set" : {"cooldowns.last_crime" : datetime.now()}, "$inc" : {
+                bail = randint(*payouts.BAIL)
+                await self.update_member(interaction.user.id, {"$set" : {"cooldowns.last_crime" : now}, "$inc" : {
                     "coins" : -bail}})
-                
+
                 embed = Embed(
                     title="⛓️ You got caught...",
                     description=f"U have to pay {bail} for bail",
                     color=Colour.red()
                 )
+        except PyMongoError:
+            await self.release_cooldown(interaction.user.id, "last_crime")
+            raise
 
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-
-        elif datetime.now() - last_crime < timedelta(hours=3):
-
-            hours, minutes = await self.time_left(last_crime, 3)
-
-            embed = Embed(
-                title="⏰ MORE TIME",
-                description=f"U need to wait {hours} hours and {minutes} to commit a crime again!",
-                color=Colour.orange()
-            )
-
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name = "steal", description = "rob someone")
     @app_commands.describe(member = "discord member")
@@ -299,16 +357,6 @@ class Gambling(commands.Cog):
             interaction (discord.Interaction): The interaction context.
             member (discord.Member): Member user trying to steal from.
         '''
-        robber = await self.get_member(interaction)
-        getting_robbed = await self.get_member(member)
-        active_robber_pet = robber.get("active_pet")
-
-        if not robber:
-            return
-        
-        if not getting_robbed:
-            return
-        
         if interaction.user.id == member.id:
             await interaction.response.send_message("You cant rob yourself!", ephemeral=True)
             return
@@ -317,67 +365,73 @@ class Gambling(commands.Cog):
             await interaction.response.send_message("You cant rob me!", ephemeral=True)
             return
 
-        getting_robbed_money = getting_robbed.get("coins", 0)
-        last_steal = robber.get("cooldowns", {}).get("last_steal")
+        now = utcnow()
+        remaining = await self.claim_cooldown(interaction.user.id, "last_steal", timedelta(hours=payouts.STEAL_COOLDOWN), now)
+
+        if remaining is not None:
+            hours, minutes = split_remaining(remaining)
+
+            embed = Embed(
+                title="⏰ MORE TIME",
+                description=f"U need to wait {hours} hours and {minutes} to steal from someone again!",
+                color=Colour.orange()
+            )
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        try:
+            robber, getting_robbed = await asyncio.gather(
+                self.get_member(interaction, ("active_pet",)),
+                self.get_member(member, ("coins",))
+            )
+
+            if not robber or not getting_robbed:
+                await self.release_cooldown(interaction.user.id, "last_steal")
+                return
+
+            active_robber_pet = robber.active_pet
+            getting_robbed_money = getting_robbed.coins
 
-        if last_steal is None or datetime.now() - last_steal >= timedelta(hours=6):
-            chance = randint(1,10)
-            if chance >= 8:
-                how_much = randint(1,5)
-                how_much /= 10
-                stolen = int(getting_robbed_money * how_much)
+            chance = randint(1, payouts.CHANCE_ROLL)
+            if payouts.steal_succeeded(chance):
+                stolen = payouts.stolen_coins(getting_robbed_money, randint(*payouts.STEAL_TENTHS))
                 stolen = await self.squid_pet_activity(active_robber_pet, stolen)
-                await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set" : {"cooldowns.last_steal" : datetime.now()}, "$inc" : {"coins" : int(stolen)}})
-                await self.bot.database["users"].update_one({"_id" : str(member.id)}, {"$inc" : {"coins" : int(-stolen)}})
+                if not await self.transfer(member.id, interaction.user.id, int(stolen), {"$set" : {"cooldowns.last_steal" : now}}):
+                    await self.release_cooldown(interaction.user.id, "last_steal")
+
+                    embed = Embed(
+                        title="💨 Too late...",
+                        description=f"{member.mention} doesn't have that many coins anymore!",
+                        color=Colour.orange()
+                    )
+
+                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                    return
 
                 embed = Embed(
                     title="🥷 Succesful robbery!",
                     description=f"{interaction.user.mention} just robbed {int(stolen)} from {member.mention}!",
                     color=Colour.green()
                 )
-
-                await interaction.response.send_message(embed=embed)
+                ephemeral = False
             else:
-                bail = randint(75, 125)
-                await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set" : {"cooldowns.last_steal" : datetime.now()}, "$inc" : {
+                bail = randint(*payouts.BAIL)
+                await self.update_member(interaction.user.id, {"$set" : {"cooldowns.last_steal" : now}, "$inc" : {
                     "coins" : -bail}})
-                
+
                 embed = Embed(
                     title="⛓️ You got caught...",
                     description=f"U have to pay {bail} for bail",
                     color=Colour.red()
                 )
+                ephemeral = True
+        except PyMongoError:
+            await self.release_cooldown(interaction.user.id, "last_steal")
+            raise
 
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        elif datetime.now() - last_steal < timedelta(hours=6):
-
-            hours, minutes = await self.time_left(last_steal, 6)
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
 
-            embed = Embed(
-                title="⏰ MORE TIME",
-                description=f"U need to wait {hours} hours and {minutes} to steal from someone again!",
-                color=Colour.orange()
-            )
-
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-
-    async def time_left(self, last_smth : datetime, hours : int) -> tuple:
-            '''
-            Handling countdowns.
-
-            Arguments:
-                last_smth (datetime): Last command usage.
-                hours (int): How many hours cooldown is.
-
-            Returns:
-                hours, minutes (tuple): Time left on cooldown.
-            '''
-            remaining = timedelta(hours=hours) - (datetime.now() - last_smth)
-            hours, remainder = divmod(remaining.seconds, 3600)
-            minutes = remainder // 60
-            return hours, minutes
-    
     async def rat_pet_activity(self, pet : str, win : int) -> float:
         '''
         Apply a pet bonus.
@@ -389,9 +443,7 @@ class Gambling(commands.Cog):
         Returns:
             win (float): money multiplied by 1.25.
         '''
-        if pet == "rat":
-            return win * 1.25
-        return win
+        return payouts.rat_bonus(pet, win)
     
     async def squid_pet_activity(self, pet : str, win : int) -> float:
         '''
@@ -402,11 +454,9 @@ class Gambling(commands.Cog):
             win (int): Amount of money to multiply.
 
         Returns:
-            win (float): Money multiplied by 1.25.
+            win (float): Money multiplied by 1.3.
         '''
-        if pet == "squid":
-            return win * 1.3
-        return win
+        return payouts.squid_bonus(pet, win)
 
 async def setup(bot):
     await bot.add_cog(Gambling(bot))
\ No newline at end of file
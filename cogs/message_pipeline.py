@@ -0,0 +1,109 @@
+import discord
+from discord.ext import commands
+from .utils.pipeline import MessageContext
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stages run for every guild message, in order: (cog name, method name).
+# Each stage is a coroutine taking MessageContext, it can stop the pipeline with ctx.stop().
+STAGES = (
+    ("Automod", "moderate_message"),
+    ("Economy", "award_message_xp"),
+    ("Pets", "pet_effects")
+)
+
+
+class MessagePipeline(commands.Cog):
+    """
+    Cog responsible for processing guild messages. Loads author and guild data once,
+    runs automod, xp and pet stages in order and writes author changes in one update.
+    """
+    def __init__(self, bot):
+        """
+        Initializes the MessagePipeline cog.
+
+        Arguments:
+            bot: Discord bot instance.
+        """
+        self.bot = bot
+
+    async def get_database_cog(self):
+        """
+        Returns the Database cog instance.
+
+        Returns:
+            Database cog or None if cog is not loaded.
+        """
+        return self.bot.get_cog("Database")
+
+    @commands.Cog.listener()
+    async def on_message(self, message : discord.Message) -> None:
+        """
+        Listens for any message sent in guild and runs it through all stages.
+
+        Arguments:
+            message (discord.Message): Message sent in guild channel.
+        """
+        if message.author.bot or not message.guild:
+            return
+
+        database_cog = await self.get_database_cog()
+        if not database_cog:
+            return
+
+        member_data, guild_data = await asyncio.gather(database_cog.get_member(message.author), database_cog.find_or_create_guild(message))
+        if member_data is None or guild_data is None:
+            return
+
+        ctx = MessageContext(message, member_data, guild_data)
+        await self.run_stages(ctx)
+        await self.commit(database_cog, ctx)
+
+    async def run_stages(self, ctx : MessageContext) -> None:
+        """
+        Runs stages of loaded cogs until one of them stops the pipeline.
+        Error in one stage is logged and doesn't stop the others.
+
+        Arguments:
+            ctx (MessageContext): Context of the message.
+        """
+        for cog_name, method in STAGES:
+            cog = self.bot.get_cog(cog_name)
+            if cog is None:
+                continue
+            try:
+                await getattr(cog, method)(ctx)
+            except Exception:
+                logger.exception(f"Message stage {cog_name}.{method} failed")
+            if ctx.stopped:
+                return
+
+    async def commit(self, database_cog, ctx : MessageContext) -> None:
+        """
+        Writes merged author update and sends queued announcements.
+        Xp gain goes through Database.add_xp, so it can be buffered in write-behind mode,
+        the rest of the update (e.g. coins from pets) is written by Database.update_member.
+
+        Arguments:
+            database_cog: Database cog instance.
+            ctx (MessageContext): Context of the message.
+        """
+        update = dict(ctx.update)
+        increments = dict(update.pop("$inc", {}))
+        xp = increments.pop("xp", None)
+        if increments:
+            update["$inc"] = increments
+
+        if update:
+            await database_cog.update_member(ctx.message.author.id, update)
+        if xp is not None:
+            await database_cog.add_xp(ctx.message.author.id, xp)
+
+        for embed in ctx.announcements:
+            await ctx.message.channel.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(MessagePipeline(bot))
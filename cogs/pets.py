@@ -5,6 +5,8 @@ from random import randint, choice
 import aiohttp
 from os import getenv
 from dotenv import load_dotenv
+from .utils.models import PetState, UserDoc
+from .utils.pipeline import MessageContext
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,23 +36,35 @@ class Pets(commands.Cog):
         '''
         return self.bot.get_cog("Database")
     
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj, fields : tuple = None) -> UserDoc:
         '''
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            fields (tuple): Fields to read, None reads whole document.
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         '''
         database_cog = await self.get_database_cog()
-        member_data = await database_cog.find_or_create__member(discord_Obj)
+        member_data = await database_cog.get_member(discord_Obj, fields)
         if member_data is None:
             return None
         return member_data
 
-    async def unicorn(self, message : discord.Message) -> None:
+    async def update_member(self, member_id : int, update : dict) -> None:
+        '''
+        Updates member document through Database cog, so cached member data stays in sync.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            update (dict): Update in MongoDB syntax.
+        '''
+        database_cog = await self.get_database_cog()
+        await database_cog.update_member(member_id, update)
+
+    async def unicorn(self, ctx : MessageContext) -> None:
         '''
         Sends spongebob gif after a message with unicorn equipped.
 
@@ -60,8 +74,9 @@ class Pets(commands.Cog):
         Klipy.com <- Link to gif provider website.
         
         Arguments:
-            message (discord.Message): Message for following up with gif.
+            ctx (MessageContext): Context of the message for following up with gif.
         '''
+        message = ctx.message
         chance = randint(1,10)
         if chance >= 9:
             query = "spongebob"
@@ -82,65 +97,52 @@ class Pets(commands.Cog):
                     embed.set_image(url=gif_url)
                     await message.channel.send(embed=embed)
         
-        await self.add_pet_xp(randint(1,5), message)
+        self.add_pet_xp(randint(1,5), ctx)
 
-    async def parrot(self, message : discord.Message) -> None:
+    async def parrot(self, ctx : MessageContext) -> None:
         '''
         Repeats everything the user wrote.
 
         Arguments:
-            message (discord.Message): Message to repeat.
+            ctx (MessageContext): Context of the message to repeat.
         '''
-        to_repeat = message.content
+        to_repeat = ctx.message.content
         embed = discord.Embed(
             title="🦜 Parrot says:",
             description=f"***{to_repeat}***",
             color=discord.Colour.blue()
         )
-        await message.channel.send(embed=embed)
-        await self.add_pet_xp(randint(1,5), message)
+        await ctx.message.channel.send(embed=embed)
+        self.add_pet_xp(randint(1,5), ctx)
 
-    async def pet_selector(self, pet : str, message : discord.Message) -> None:
+    async def pet_effects(self, ctx : MessageContext) -> None:
         '''
-        Selector for pet bonuses.
+        Message pipeline stage, selector for pet bonuses of authors active pet.
 
         Arguments:
-            pet (str): Current active pet.
-            message (discord.Message): Message needed for data processing.
+            ctx (MessageContext): Context of the message needed for data processing.
         '''
+        pet = ctx.member.active_pet
         if pet == "kitty":
-            await self.add_pet_xp(randint(1,10), message)
+            self.add_pet_xp(randint(1,10), ctx)
         elif pet == "unicorn":
-            await self.unicorn(message)
+            await self.unicorn(ctx)
         elif pet == "parrot":
-            await self.parrot(message)
+            await self.parrot(ctx)
         elif pet is None:
             return
         else:
-            await self.add_pet_xp(randint(1,5), message)
-
-    async def get_current_pet(self, message : discord.Message) -> str:
-        '''
-        Retrives users active pet.
-
-        Arguments:
-            message (discord.Message): Message for data processing.
-
-        Returns:
-            active_pet (str): Users active pet.
-        '''
-        member_data = await self.get_member(message.author)
-        return member_data.get("active_pet", None)
+            self.add_pet_xp(randint(1,5), ctx)
 
-    async def add_pet_xp(self, xp : int, message : discord.Message) -> None:
+    def add_pet_xp(self, xp : int, ctx : MessageContext) -> None:
         '''
-        Gives pet xp.
+        Gives pet xp, change is merged into the message update.
 
         Arguments:
             xp (int): How much xp to add.
-            message (discord.Message): Message for data processing.
+            ctx (MessageContext): Context of the message for data processing.
         '''
-        current_pet = await self.get_current_pet(message)
+        current_pet = ctx.member.active_pet
         if not current_pet:
             return
 
@@ -148,44 +150,22 @@ class Pets(commands.Cog):
         if current_pet == "dragon":
             defence, attack = 8, 12
 
-        await self.bot.database["users"].update_one(
-            {"_id" : str(message.author.id)}, 
-            {"$inc" : {f"inventory.{current_pet}.xp" : int(xp)}}
-        )
+        pet = ctx.member.inventory.get(current_pet, PetState())
+        level = pet.level
 
-        member_data = await self.get_member(message.author)
-        current_xp = member_data.get("inventory", {}).get(current_pet, {}).get("xp", 0)
-        level = member_data.get("inventory", {}).get(current_pet, {}).get("level", 0)
-
-        if current_xp >= (20 * level):
-            await self.bot.database["users"].update_one(
-                {"_id" : str(message.author.id)},
-                {"$set" : {f"inventory.{current_pet}.xp" : 0},
-                "$inc" : {f"inventory.{current_pet}.level" : 1,
-                        f"inventory.{current_pet}.def" : defence,
-                        f"inventory.{current_pet}.atk" : attack}}
-            )
+        if pet.xp + xp >= (20 * level):
+            ctx.set(f"inventory.{current_pet}.xp", 0)
+            ctx.inc(f"inventory.{current_pet}.level", 1)
+            ctx.inc(f"inventory.{current_pet}.def", defence)
+            ctx.inc(f"inventory.{current_pet}.atk", attack)
             embed = discord.Embed(
                 title="🎉 Level Up!",
                 description=f"Your **{current_pet}** leveled up to **{level+1}**!",
                 color=discord.Colour.green()
             )
-            await message.channel.send(embed=embed)
-
-    @commands.Cog.listener()
-    async def on_message(self, message : discord.Message) -> None:
-        '''
-        Listen for messages, pet xp related.
-
-        Arguments:
-            message (discord.Message): Message for data processing.
-        '''
-        if message.author.bot or not message.guild:
-            return
-
-        member_data = await self.get_member(message.author)
-        active_pet = member_data.get("active_pet", 0)
-        await self.pet_selector(active_pet, message)
+            ctx.announce(embed)
+        else:
+            ctx.inc(f"inventory.{current_pet}.xp", int(xp))
 
     @app_commands.command(name="change_pet", description="Choose pet to level and fight for you!")
     @app_commands.describe(pet_name="Name of the pet you chose!")
@@ -198,7 +178,7 @@ class Pets(commands.Cog):
             pet_name (str): Name of the selected pet.
         '''
         member_data = await self.get_member(interaction)
-        pets = member_data.get("inventory", {})
+        pets = member_data.inventory
 
         if pet_name not in pets:
             embed = discord.Embed(
@@ -209,10 +189,7 @@ class Pets(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        await self.bot.database["users"].update_one(
-            {"_id" : str(interaction.user.id)},
-            {"$set" : {"active_pet" : pet_name}}
-        )
+        await self.update_member(interaction.user.id, {"$set" : {"active_pet" : pet_name}})
 
         embed = discord.Embed(
             title="✅ Active Pet Changed",
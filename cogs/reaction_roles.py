@@ -2,6 +2,7 @@ import discord
 from discord import Embed
 from discord.ext import commands
 from discord import app_commands
+from .utils.models import UserDoc
 from .views import RoleSetupView
 
 class Reaction_roles(commands.Cog):
@@ -26,15 +27,15 @@ class Reaction_roles(commands.Cog):
         '''
         return self.bot.get_cog("Database")
     
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj) -> UserDoc:
         '''
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         '''
         database_cog = await self.get_database_cog()
         member_data = await database_cog.find_or_create__member(discord_Obj)
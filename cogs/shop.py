@@ -5,6 +5,7 @@ import json
 from functools import partial
 from asyncio import sleep
 from random import choice, randint
+from .utils.models import UserDoc
 import logging
 
 logger = logging.getLogger(__name__)
@@ -86,21 +87,33 @@ class ItemShop(discord.ui.Select):
         """
         return self.bot.get_cog("Database")
     
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj, fields : tuple = None) -> UserDoc:
         """
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
+            fields (tuple): Fields to read, None reads whole document.
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         """
         database_cog = await self.get_database_cog()
-        member_data = await database_cog.find_or_create__member(discord_Obj)
+        member_data = await database_cog.get_member(discord_Obj, fields)
         if member_data is None:
             return None
         return member_data
+
+    async def update_member(self, member_id : int, update : dict) -> None:
+        """
+        Updates member document through Database cog, so cached member data stays in sync.
+
+        Arguments:
+            member_id (int): Id of the discord member.
+            update (dict): Update in MongoDB syntax.
+        """
+        database_cog = await self.get_database_cog()
+        await database_cog.update_member(member_id, update)
     
     async def get_jail_role(self, interaction : discord.Interaction) -> discord.Role:
         """
@@ -113,12 +126,13 @@ class ItemShop(discord.ui.Select):
             jail_role (discord.Role): Jail role.
         """
 
-        guild_data = await self.bot.database["guilds"].find_one({"_id" : str(interaction.guild_id)})
+        database_cog = await self.get_database_cog()
+        guild_data = await database_cog.find_or_create_guild(interaction)
 
         if guild_data is None:
             return
 
-        role_id = guild_data.get("automod", {}).get("jail", {}).get("jail_role", 0)
+        role_id = guild_data.automod.jail.jail_role
 
         jail_role = interaction.guild.get_role(role_id)
 
@@ -132,7 +146,7 @@ class ItemShop(discord.ui.Select):
             interaction (discord.Interaction): Context interaction.
         """
 
-        await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$inc" : {"coins" : item['cost'] * -1}})
+        await self.update_member(interaction.user.id, {"$inc" : {"coins" : item['cost'] * -1}})
 
     async def add_item_to_user_inv(self, interaction : discord.Interaction, item_key, item_data) -> None:
         """
@@ -141,7 +155,7 @@ class ItemShop(discord.ui.Select):
         Arguments:
             interaction (discord.Interaction): Context interaction.
         """
-        await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set": {f"inventory.{item_key}" : item_data}})
+        await self.update_member(interaction.user.id, {"$set": {f"inventory.{item_key}" : item_data}})
 
 
     async def pet_activate(self, interaction : discord.Interaction, bought_pet : str) -> None:
@@ -151,11 +165,11 @@ class ItemShop(discord.ui.Select):
         Arguments:
             interaction (discord.Interaction): Context interaction.
         """
-        member_data = await self.get_member(interaction)
-        if member_data.get("active_pet"):
+        member_data = await self.get_member(interaction, ("active_pet",))
+        if member_data.active_pet:
             return
         
-        await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$set" : {"active_pet" : bought_pet}})
+        await self.update_member(interaction.user.id, {"$set" : {"active_pet" : bought_pet}})
 
     async def tier_picker(self, interaction : discord.Interaction) -> str:
         """
@@ -170,8 +184,8 @@ class ItemShop(discord.ui.Select):
         """
         x = randint(1, 1000)
 
-        member_data = await self.get_member(interaction)
-        if member_data.get("current_pet", 0) == "ghost":
+        member_data = await self.get_member(interaction, ("active_pet",))
+        if member_data.active_pet == "ghost":
             if x <= 500:
                 return "common"
             elif x > 500 and x <= 750:
@@ -253,8 +267,8 @@ class ItemShop(discord.ui.Select):
         if member_data is None:
             return
 
-        member_coins = member_data.get("coins", 0)
-        member_inv = member_data.get("inventory", {})
+        member_coins = member_data.coins
+        member_inv = member_data.inventory
         color = await self.color_picker(chosen_item['rarity'])
 
         if member_coins < chosen_item['cost']:
@@ -319,7 +333,7 @@ class ItemShop(discord.ui.Select):
             message = f"{interaction.user.name} just dropped {picked[key]['emote']} **{key.capitalize()}**"
         else:
             how_much = randint(45, 125)
-            await self.bot.database["users"].update_one({"_id" : str(interaction.user.id)}, {"$inc" : {"coins" : how_much}})
+            await self.update_member(interaction.user.id, {"$inc" : {"coins" : how_much}})
             message = f"{interaction.user.name} dropped {how_much} coins because he/she has {picked[key]['emote']} **{key.capitalize()}**"
 
         new_embed = await create_embed(message, f"*Congratulations!*", discord.Color.red())
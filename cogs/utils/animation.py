@@ -0,0 +1,174 @@
+from time import monotonic
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Edits per second shared by all animations and size of a burst, well under Discord global limit (50/s),
+# so commands and other requests keep their share.
+EDIT_RATE = 20.0
+EDIT_BURST = 20
+
+# Most intermediate frames of one animation, e.g. one interaction webhook allows about 5 edits per 2 seconds.
+FRAME_BUDGET = 6
+
+
+class TokenBucket:
+    """
+    Token bucket limiting edits of all animations.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (int): Most stored tokens.
+        tokens (float): Tokens available now.
+        updated (float): Time tokens were last refilled.
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate : float, capacity : int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = monotonic()
+
+    def refill(self, now : float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, reserve : int = 0) -> bool:
+        """
+        Takes a token if more than reserve tokens are left.
+
+        Arguments:
+            reserve (int): Tokens kept for more important edits.
+
+        Returns:
+            bool: True if token was taken.
+        """
+        self.refill(monotonic())
+        if self.tokens < reserve + 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self) -> float:
+        """
+        Returns seconds until next token is available.
+        """
+        self.refill(monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RouteStats:
+    """
+    Counters of animations of one route (e.g. "slots").
+
+    Attributes:
+        active (int): Running animations (queue depth).
+        waiting (int): Final frames waiting for a token.
+        sent (int): Delivered frames.
+        dropped (int): Skipped intermediate frames.
+    """
+    __slots__ = ("active", "waiting", "sent", "dropped")
+
+    def __init__(self):
+        self.active = 0
+        self.waiting = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def to_dict(self) -> dict:
+        """
+        Returns counters as plain dict.
+        """
+        return {"active" : self.active, "waiting" : self.waiting, "sent" : self.sent, "dropped" : self.dropped}
+
+
+class AnimationScheduler:
+    """
+    Paces message edits of animations (slots spins etc.) shared by the whole bot.
+    Every animation gets a budget of intermediate frames, a frame is dropped when the budget is spent,
+    the shared token bucket is empty (tokens are kept for waiting final frames) or the previous edit
+    took so long its time slot already passed (route is rate limited). Final frame is always delivered.
+
+    Attributes:
+        bucket (TokenBucket): Edits shared by all animations.
+        frame_budget (int): Most intermediate frames per animation.
+        routes (dict): RouteStats by route name.
+    """
+    def __init__(self, rate : float = EDIT_RATE, burst : int = EDIT_BURST, frame_budget : int = FRAME_BUDGET):
+        """
+        Initializes scheduler with full bucket.
+
+        Arguments:
+            rate (float): Edits per second of all animations.
+            burst (int): Edits that can be sent at once.
+            frame_budget (int): Most intermediate frames per animation.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.frame_budget = frame_budget
+        self.routes = {}
+
+    def _waiting(self) -> int:
+        return sum(route.waiting for route in self.routes.values())
+
+    async def animate(self, route : str, frames : list, render, interval : float) -> None:
+        """
+        Plays frames one per interval, the last one is the final frame.
+
+        Arguments:
+            route (str): Name of the animation, used for stats.
+            frames (list): Frames passed to render, at least one.
+            render: Coroutine function sending one frame, e.g. editing interaction response.
+            interval (float): Seconds between frames.
+
+        Raises:
+            discord.HTTPException: If final frame couldn't be sent.
+        """
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats()
+        stats.active += 1
+        try:
+            budget = self.frame_budget
+            deadline = monotonic()
+            for frame in frames[:-1]:
+                deadline += interval
+                delay = deadline - monotonic()
+                if delay < 0 or budget <= 0:
+                    stats.dropped += 1
+                    continue
+                await asyncio.sleep(delay)
+                if not self.bucket.take(reserve=self._waiting()):
+                    stats.dropped += 1
+                    continue
+                try:
+                    await render(frame)
+                except Exception as e:
+                    logger.warning(f"Animation {route} frame failed, skipping to final frame: {e}")
+                    budget = 0
+                    continue
+                stats.sent += 1
+                budget -= 1
+
+            await asyncio.sleep(max(0.0, deadline + interval - monotonic()))
+            stats.waiting += 1
+            try:
+                while not self.bucket.take():
+                    await asyncio.sleep(self.bucket.wait_time())
+            finally:
+                stats.waiting -= 1
+            await render(frames[-1])
+            stats.sent += 1
+        finally:
+            stats.active -= 1
+
+    def stats(self) -> dict:
+        """
+        Returns per-route counters and available edits.
+
+        Returns:
+            dict: {"routes" : {route : stats dict}, "tokens" : float}.
+        """
+        self.bucket.refill(monotonic())
+        return {"routes" : {route : stats.to_dict() for route, stats in self.routes.items()}, "tokens" : self.bucket.tokens}
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+# Most remembered messages, older ones are evicted first.
+MAX_ENTRIES = 20000
+
+
+class ContentHashes:
+    """
+    Hashes of recently moderated message contents by message id, kept in LRU order.
+    Lets edit handling skip edits that didn't change text (embed unfurls, pins, flags),
+    so they don't run automod again.
+
+    Attributes:
+        hashes (OrderedDict): Content hash by message id.
+        checked (int): Edits with changed or unknown content.
+        skipped (int): Edits with unchanged content.
+    """
+    __slots__ = ("hashes", "max_entries", "checked", "skipped")
+
+    def __init__(self, max_entries : int = MAX_ENTRIES):
+        """
+        Initializes empty store.
+
+        Arguments:
+            max_entries (int): Most remembered messages.
+        """
+        self.hashes = OrderedDict()
+        self.max_entries = max_entries
+        self.checked = 0
+        self.skipped = 0
+
+    def remember(self, message_id : int, content : str) -> None:
+        """
+        Stores hash of moderated content.
+
+        Arguments:
+            message_id (int): Id of the message.
+            content (str): Its content.
+        """
+        self.hashes[message_id] = hash(content)
+        self.hashes.move_to_end(message_id)
+        if len(self.hashes) > self.max_entries:
+            self.hashes.popitem(last=False)
+
+    def changed(self, message_id : int, content : str, previous : str = None) -> bool:
+        """
+        Checks if edited content differs from the last moderated one and remembers it.
+        Unknown messages (sent before restart or evicted) count as changed.
+
+        Arguments:
+            message_id (int): Id of the edited message.
+            content (str): Content after edit.
+            previous (str): Content before edit from discord.py message cache, if it was there.
+
+        Returns:
+            bool: True if content has to be checked.
+        """
+        known = self.hashes.get(message_id)
+        if known is None and previous is not None:
+            known = hash(previous)
+        self.remember(message_id, content)
+        if known == hash(content):
+            self.skipped += 1
+            return False
+        self.checked += 1
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns remembered messages and edit counters.
+
+        Returns:
+            dict: Remembered messages, checked and skipped edits.
+        """
+        return {"messages" : len(self.hashes), "checked" : self.checked, "skipped" : self.skipped}
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+# Most remembered (member, cooldown) pairs, least recently used are evicted and read again from database.
+MAX_ENTRIES = 100000
+
+# Expiry of cooldowns that were never used.
+READY = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def utcnow() -> datetime:
+    """
+    Returns current time as timezone-aware UTC datetime.
+    """
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value : datetime) -> datetime:
+    """
+    Makes datetime read from database timezone-aware. Naive values (MongoDB returns them without tz_aware
+    client, old documents stored datetime.now()) are treated as UTC.
+
+    Arguments:
+        value (datetime): Datetime or None.
+
+    Returns:
+        datetime: Aware datetime or None.
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def split_remaining(remaining : timedelta) -> tuple:
+    """
+    Splits time left on cooldown into whole hours and minutes.
+
+    Arguments:
+        remaining (timedelta): Time left.
+
+    Returns:
+        tuple: (hours, minutes).
+    """
+    seconds = max(0, int(remaining.total_seconds()))
+    return seconds // 3600, seconds % 3600 // 60
+
+
+class CooldownEngine:
+    """
+    In-memory expiry map of command cooldowns by (member id, cooldown field).
+    Entries are hydrated from member documents on first use and updated when a cooldown is claimed,
+    so repeated attempts of a member on cooldown are answered without database access.
+    Claim checks and reserves the cooldown without awaiting, so two concurrent claims can't both pass.
+
+    Attributes:
+        expiries (OrderedDict): Aware expiry datetime by (member id, field), in LRU order.
+        denied (int): Attempts answered from memory while on cooldown.
+        claimed (int): Claimed cooldowns.
+        hydrated (int): Entries read from database.
+        released (int): Claims dropped because their write didn't happen.
+    """
+    __slots__ = ("expiries", "max_entries", "denied", "claimed", "hydrated", "released")
+
+    def __init__(self, max_entries : int = MAX_ENTRIES):
+        """
+        Initializes empty map.
+
+        Arguments:
+            max_entries (int): Most remembered entries.
+        """
+        self.expiries = OrderedDict()
+        self.max_entries = max_entries
+        self.denied = 0
+        self.claimed = 0
+        self.hydrated = 0
+        self.released = 0
+
+    def __contains__(self, key : tuple) -> bool:
+        return key in self.expiries
+
+    def _store(self, key : tuple, expiry : datetime) -> None:
+        self.expiries[key] = expiry
+        self.expiries.move_to_end(key)
+        while len(self.expiries) > self.max_entries:
+            self.expiries.popitem(last=False)
+
+    def hydrate(self, member_id : str, field : str, last_used : datetime, duration : timedelta) -> None:
+        """
+        Stores cooldown read from member document, unless it was claimed meanwhile.
+
+        Arguments:
+            member_id (str): Id of the member.
+            field (str): Cooldown field, e.g. "last_crime".
+            last_used (datetime): Stored last usage or None.
+            duration (timedelta): Length of the cooldown.
+        """
+        key = (member_id, field)
+        if key in self.expiries:
+            return
+        last_used = as_utc(last_used)
+        self._store(key, READY if last_used is None else last_used + duration)
+        self.hydrated += 1
+
+    def claim(self, member_id : str, field : str, duration : timedelta, now : datetime = None) -> timedelta:
+        """
+        Claims cooldown if it expired. Entry must be hydrated first.
+
+        Arguments:
+            member_id (str): Id of the member.
+            field (str): Cooldown field.
+            duration (timedelta): Length of the cooldown.
+            now (datetime): Aware current time, utcnow() by default.
+
+        Returns:
+            timedelta: Time left if member is still on cooldown, None if cooldown was claimed.
+        """
+        now = utcnow() if now is None else now
+        key = (member_id, field)
+        expiry = self.expiries.get(key, READY)
+        if expiry > now:
+            self.expiries.move_to_end(key)
+            self.denied += 1
+            return expiry - now
+        self._store(key, now + duration)
+        self.claimed += 1
+        return None
+
+    def release(self, member_id : str, field : str) -> None:
+        """
+        Drops entry of a claim that wasn't saved, next claim hydrates it again.
+
+        Arguments:
+            member_id (str): Id of the member.
+            field (str): Cooldown field.
+        """
+        if self.expiries.pop((member_id, field), None) is not None:
+            self.released += 1
+
+    def stats(self) -> dict:
+        """
+        Returns remembered entries and counters.
+
+        Returns:
+            dict: Entries, denied, claimed and released attempts, hydrations.
+        """
+        return {"entries" : len(self.expiries), "denied" : self.denied, "claimed" : self.claimed, "hydrated" : self.hydrated, "released" : self.released}
@@ -0,0 +1,154 @@
+import re
+
+# Most domains on each list of a guild.
+MAX_DOMAINS = 100
+
+# Entry matching every domain, e.g. block "*" and allow only a few sites.
+ANY = "*"
+
+BLOCK = False
+ALLOW = True
+
+# Host after scheme (skipping user info), or bare invite link. Run only on text with a link marker.
+LINK = re.compile(r"(?i)[a-z][a-z0-9+.-]*://(?:[^\s/@]*@)?([^\s/?#:\\]+)|\b(discord\.gg)\b")
+LINK_MARKERS = ("://", "discord.gg")
+
+DOMAIN = re.compile(r"(?:[a-z0-9_-]+\.)*[a-z0-9_-]+")
+
+
+def normalize_domain(domain : str) -> str:
+    """
+    Lowercases domain and strips scheme, path and trailing dots, e.g. "https://Evil.com/x" -> "evil.com".
+
+    Arguments:
+        domain (str): Domain or link entered by admin.
+
+    Returns:
+        str: Domain, ANY or None if it isn't a valid domain.
+    """
+    domain = domain.strip().lower()
+    if domain == ANY:
+        return ANY
+    domain = domain.split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0].strip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if not domain or len(domain) > 253 or DOMAIN.fullmatch(domain) is None:
+        return None
+    return domain
+
+
+def extract_hosts(text : str) -> list:
+    """
+    Finds hosts of links in text. Messages without "://" or "discord.gg" (in any case) are skipped
+    without running the regex.
+
+    Arguments:
+        text (str): Message content.
+
+    Returns:
+        list: Lowercase hosts.
+    """
+    lowered = text.lower()
+    if not any(marker in lowered for marker in LINK_MARKERS):
+        return []
+    return [(scheme_host or invite).lower().strip(".") for scheme_host, invite in LINK.findall(text)]
+
+
+class DomainTrie:
+    """
+    Domain rules of one guild in a trie of reversed labels ("a.evil.com" -> com, evil, a),
+    so a host is checked in O(number of its labels) no matter how many rules there are.
+    Rule of a domain covers its subdomains and the most specific rule wins,
+    so "evil.com" can be blocked while "safe.evil.com" is allowed.
+
+    Attributes:
+        root (dict): Child nodes by label, rule of a node is stored under None key.
+    """
+    __slots__ = ("root",)
+
+    def __init__(self, blocked = (), allowed = ()):
+        """
+        Builds trie from guild lists, allowlist wins if a domain is on both.
+
+        Arguments:
+            blocked: Iterable of blocked domains.
+            allowed: Iterable of allowed domains.
+        """
+        self.root = {}
+        for domain in blocked:
+            self.add(domain, BLOCK)
+        for domain in allowed:
+            self.add(domain, ALLOW)
+
+    def __bool__(self) -> bool:
+        return bool(self.root)
+
+    def _labels(self, domain : str) -> list:
+        return [] if domain == ANY else domain.split(".")[::-1]
+
+    def add(self, domain : str, allowed : bool) -> None:
+        """
+        Adds rule of domain and its subdomains.
+
+        Arguments:
+            domain (str): Normalized domain or ANY.
+            allowed (bool): ALLOW or BLOCK.
+        """
+        node = self.root
+        for label in self._labels(domain):
+            node = node.setdefault(label, {})
+        node[None] = allowed
+
+    def remove(self, domain : str) -> None:
+        """
+        Removes rule of domain, prunes nodes left without rules.
+
+        Arguments:
+            domain (str): Normalized domain or ANY.
+        """
+        path = [self.root]
+        labels = self._labels(domain)
+        for label in labels:
+            node = path[-1].get(label)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].pop(None, None)
+        for depth in range(len(labels), 0, -1):
+            if path[depth]:
+                return
+            del path[depth - 1][labels[depth - 1]]
+
+    def lookup(self, host : str) -> bool:
+        """
+        Finds rule of host from its most specific matching domain.
+
+        Arguments:
+            host (str): Lowercase host.
+
+        Returns:
+            bool: ALLOW, BLOCK or None if no rule matches.
+        """
+        node = self.root
+        rule = node.get(None)
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            rule = node.get(None, rule)
+        return rule
+
+    def blocked(self, text : str) -> str:
+        """
+        Checks links in text.
+
+        Arguments:
+            text (str): Message content.
+
+        Returns:
+            str: First blocked host or None.
+        """
+        for host in extract_hosts(text):
+            if self.lookup(host) is BLOCK:
+                return host
+        return None
@@ -0,0 +1,371 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass(slots=True, frozen=True)
+class PetState:
+    """
+    Pet stored in member inventory.
+
+    Attributes:
+        emote (str): Emote of the pet.
+        cost (int): Shop price.
+        rarity (str): Rarity tier (common, rare, epic, legendary).
+        ability (str): Name of pet ability.
+        desc (str): Description shown in inventory.
+        rare_emote (str): Emote of rarity tier.
+        level (int): Pet level.
+        xp (int): Pet xp gathered on current level.
+        defence (int): Defence used in pet fights (stored as "def").
+        atk (int): Attack used in pet fights.
+    """
+    emote: str = ""
+    cost: int = 0
+    rarity: str = ""
+    ability: str = ""
+    desc: str = ""
+    rare_emote: str = ""
+    level: int = 0
+    xp: int = 0
+    defence: int = 0
+    atk: int = 0
+
+    @classmethod
+    def from_document(cls, document : dict) -> "PetState":
+        """
+        Decodes pet from inventory entry.
+        """
+        return cls(
+            emote=document.get("emote", ""),
+            cost=document.get("cost", 0),
+            rarity=document.get("rarity", ""),
+            ability=document.get("ability", ""),
+            desc=document.get("desc", ""),
+            rare_emote=document.get("rare_emote", ""),
+            level=document.get("level", 0),
+            xp=document.get("xp", 0),
+            defence=document.get("def", 0),
+            atk=document.get("atk", 0)
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes pet back to inventory entry.
+        """
+        return {
+            "emote" : self.emote,
+            "cost" : self.cost,
+            "rarity" : self.rarity,
+            "ability" : self.ability,
+            "desc" : self.desc,
+            "rare_emote" : self.rare_emote,
+            "level" : self.level,
+            "xp" : self.xp,
+            "def" : self.defence,
+            "atk" : self.atk
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class Cooldowns:
+    """
+    Last usage of commands with cooldown, None if never used.
+    """
+    last_daily_reward: datetime = None
+    last_crime: datetime = None
+    last_steal: datetime = None
+
+    @classmethod
+    def from_document(cls, document : dict) -> "Cooldowns":
+        """
+        Decodes cooldowns from database document.
+        """
+        return cls(
+            last_daily_reward=document.get("last_daily_reward"),
+            last_crime=document.get("last_crime"),
+            last_steal=document.get("last_steal")
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes cooldowns back to database document.
+        """
+        return {
+            "last_daily_reward" : self.last_daily_reward,
+            "last_crime" : self.last_crime,
+            "last_steal" : self.last_steal
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class UserDoc:
+    """
+    Member document from "users" collection, decoded once by Database cog.
+    Instances are immutable, so cached ones can be shared between cogs.
+
+    Attributes:
+        id (str): Discord id of the member.
+        coins (int): Balance.
+        xp (int): Xp gathered on current level.
+        level (int): Member level.
+        cooldowns (Cooldowns): Last usage of commands with cooldown.
+        level_up_notification (bool): If level up message should be sent.
+        inventory (dict): Owned pets by name.
+        active_pet (str): Name of active pet or None.
+    """
+    id: str = None
+    coins: int = 0
+    xp: int = 0
+    level: int = 1
+    cooldowns: Cooldowns = field(default_factory=Cooldowns)
+    level_up_notification: bool = True
+    inventory: dict = field(default_factory=dict)
+    active_pet: str = None
+
+    @property
+    def pet(self) -> PetState:
+        """
+        Returns state of active pet or None if no pet is active.
+        """
+        return self.inventory.get(self.active_pet)
+
+    @classmethod
+    def from_document(cls, document : dict) -> "UserDoc":
+        """
+        Decodes member from database document.
+        """
+        return cls(
+            id=document.get("_id"),
+            coins=document.get("coins", 0),
+            xp=document.get("xp", 0),
+            level=document.get("level", 1),
+            cooldowns=Cooldowns.from_document(document.get("cooldowns") or {}),
+            level_up_notification=document.get("level_up_notification", True),
+            inventory={name : PetState.from_document(pet) for name, pet in (document.get("inventory") or {}).items()},
+            active_pet=document.get("active_pet")
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes member back to database document.
+        """
+        return {
+            "_id" : self.id,
+            "coins" : self.coins,
+            "xp" : self.xp,
+            "level" : self.level,
+            "cooldowns" : self.cooldowns.to_document(),
+            "level_up_notification" : self.level_up_notification,
+            "inventory" : {name : pet.to_document() for name, pet in self.inventory.items()},
+            "active_pet" : self.active_pet
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class MessageConfig:
+    """
+    Welcome or leave message settings of a guild.
+    """
+    enabled: bool = False
+    channel_id: int = 0
+    message: str = None
+    description: str = None
+
+    @classmethod
+    def from_document(cls, document : dict) -> "MessageConfig":
+        """
+        Decodes message settings from database document.
+        """
+        return cls(
+            enabled=document.get("enabled", False),
+            channel_id=document.get("channel_id", 0),
+            message=document.get("message"),
+            description=document.get("description")
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes message settings back to database document.
+        """
+        return {
+            "enabled" : self.enabled,
+            "channel_id" : self.channel_id,
+            "message" : self.message,
+            "description" : self.description
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class JailConfig:
+    """
+    Jail settings of a guild, ids are None until jail is set up.
+    """
+    enabled: bool = False
+    jail_role: int = None
+    jail_category: int = None
+    jail_text: int = None
+    jail_vc: int = None
+
+    @classmethod
+    def from_document(cls, document : dict) -> "JailConfig":
+        """
+        Decodes jail settings from database document.
+        """
+        return cls(
+            enabled=document.get("enabled", False),
+            jail_role=document.get("jail_role"),
+            jail_category=document.get("jail_category"),
+            jail_text=document.get("jail_text"),
+            jail_vc=document.get("jail_vc")
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes jail settings back to database document.
+        """
+        return {
+            "enabled" : self.enabled,
+            "jail_role" : self.jail_role,
+            "jail_category" : self.jail_category,
+            "jail_text" : self.jail_text,
+            "jail_vc" : self.jail_vc
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class NearDuplicateConfig:
+    """
+    Near-duplicate (copy-paste) spam settings of a guild.
+
+    Attributes:
+        enabled (bool): If messages are checked.
+        limit (int): Near duplicates in window that make a message spam (counting the message).
+        similarity (int): Minimum similarity of messages in percent.
+        window (int): Seconds a message is remembered.
+    """
+    enabled: bool = False
+    limit: int = 3
+    similarity: int = 60
+    window: int = 60
+
+    @classmethod
+    def from_document(cls, document : dict) -> "NearDuplicateConfig":
+        """
+        Decodes near-duplicate settings from database document.
+        """
+        return cls(
+            enabled=document.get("enabled", False),
+            limit=document.get("limit", 3),
+            similarity=document.get("similarity", 60),
+            window=document.get("window", 60)
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes near-duplicate settings back to database document.
+        """
+        return {
+            "enabled" : self.enabled,
+            "limit" : self.limit,
+            "similarity" : self.similarity,
+            "window" : self.window
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class AutomodConfig:
+    """
+    Automoderation settings of a guild.
+    """
+    banned_words: tuple = ()
+    anti_bad_words: bool = False
+    jail: JailConfig = field(default_factory=JailConfig)
+    regex_rules: tuple = ()
+    anti_spam: bool = False
+    near_duplicates: NearDuplicateConfig = field(default_factory=NearDuplicateConfig)
+    blocked_domains: tuple = ()
+    allowed_domains: tuple = ()
+
+    @classmethod
+    def from_document(cls, document : dict) -> "AutomodConfig":
+        """
+        Decodes automod settings from database document.
+        """
+        return cls(
+            banned_words=tuple(document.get("banned_words", ())),
+            anti_bad_words=document.get("anti_bad_words", False),
+            jail=JailConfig.from_document(document.get("jail") or {}),
+            regex_rules=tuple(document.get("regex_rules", ())),
+            anti_spam=document.get("anti_spam", False),
+            near_duplicates=NearDuplicateConfig.from_document(document.get("near_duplicates") or {}),
+            blocked_domains=tuple(document.get("blocked_domains", ())),
+            allowed_domains=tuple(document.get("allowed_domains", ()))
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes automod settings back to database document.
+        """
+        return {
+            "banned_words" : list(self.banned_words),
+            "anti_bad_words" : self.anti_bad_words,
+            "jail" : self.jail.to_document(),
+            "regex_rules" : list(self.regex_rules),
+            "anti_spam" : self.anti_spam,
+            "near_duplicates" : self.near_duplicates.to_document(),
+            "blocked_domains" : list(self.blocked_domains),
+            "allowed_domains" : list(self.allowed_domains)
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class GuildDoc:
+    """
+    Guild document from "guilds" collection, decoded once by Database cog.
+    Instances are immutable, so cached ones can be shared between cogs.
+
+    Attributes:
+        id (str): Discord id of the guild.
+        name (str): Name of the guild.
+        prefix (str): Command prefix.
+        welcome (MessageConfig): Welcome message settings.
+        leave (MessageConfig): Leave message settings.
+        automod (AutomodConfig): Automoderation settings.
+        item_shop (dict): Guild shop items.
+    """
+    id: str = None
+    name: str = ""
+    prefix: str = "?"
+    welcome: MessageConfig = field(default_factory=MessageConfig)
+    leave: MessageConfig = field(default_factory=MessageConfig)
+    automod: AutomodConfig = field(default_factory=AutomodConfig)
+    item_shop: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_document(cls, document : dict) -> "GuildDoc":
+        """
+        Decodes guild from database document.
+        """
+        return cls(
+            id=document.get("_id"),
+            name=document.get("name", ""),
+            prefix=document.get("prefix", "?"),
+            welcome=MessageConfig.from_document(document.get("welcome") or {}),
+            leave=MessageConfig.from_document(document.get("leave") or {}),
+            automod=AutomodConfig.from_document(document.get("automod") or {}),
+            item_shop=dict(document.get("item_shop") or {})
+        )
+
+    def to_document(self) -> dict:
+        """
+        Encodes guild back to database document.
+        """
+        return {
+            "_id" : self.id,
+            "name" : self.name,
+            "prefix" : self.prefix,
+            "welcome" : self.welcome.to_document(),
+            "leave" : self.leave.to_document(),
+            "automod" : self.automod.to_document(),
+            "item_shop" : dict(self.item_shop)
+        }
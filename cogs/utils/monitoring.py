@@ -0,0 +1,211 @@
+from bisect import bisect_left
+from contextvars import ContextVar, copy_context, Context
+from pymongo import monitoring
+import bson
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of latency histogram buckets, last bucket catches everything slower.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Cog a database lookup was started for, read when the query runs in its own task (see SingleFlight)
+# and the call stack no longer reaches the cog.
+current_cog = ContextVar("current_cog", default=None)
+
+
+class CommandStats:
+    """
+    Latency histogram and counters of one (command, collection, cog) combination.
+
+    Attributes:
+        count (int): Finished commands (succeeded + failed).
+        failures (int): Failed commands.
+        total_ms (float): Summed latency.
+        max_ms (float): Slowest command.
+        buckets (list): Command counts per latency bucket (see LATENCY_BUCKETS_MS).
+        bytes_sent (int): Size of sent commands in BSON.
+        bytes_received (int): Size of received replies in BSON.
+    """
+    __slots__ = ("count", "failures", "total_ms", "max_ms", "buckets", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def record(self, duration_ms : float, bytes_sent : int, bytes_received : int, failed : bool) -> None:
+        """
+        Adds one finished command.
+
+        Arguments:
+            duration_ms (float): Command latency.
+            bytes_sent (int): Size of the command.
+            bytes_received (int): Size of the reply.
+            failed (bool): If the command failed.
+        """
+        self.count += 1
+        self.failures += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+    def percentile(self, q : float) -> float:
+        """
+        Approximates latency percentile from histogram (upper bound of the bucket).
+
+        Arguments:
+            q (float): Percentile between 0 and 1.
+
+        Returns:
+            float: Latency in ms, max_ms if percentile falls into the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        threshold = q * self.count
+        seen = 0
+        for bound, amount in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += amount
+            if seen >= threshold:
+                return float(bound)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        """
+        Returns counters as plain dict.
+        """
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count" : self.count,
+            "failures" : self.failures,
+            "avg_ms" : self.total_ms / self.count if self.count else 0.0,
+            "p50_ms" : self.percentile(0.5),
+            "p95_ms" : self.percentile(0.95),
+            "max_ms" : self.max_ms,
+            "histogram" : dict(zip(labels, self.buckets)),
+            "bytes_sent" : self.bytes_sent,
+            "bytes_received" : self.bytes_received
+        }
+
+
+def calling_cog() -> str:
+    """
+    Finds which cog issued the current database command by walking the call stack
+    (awaiting coroutines are linked frames while the command is being sent).
+    Database cog and helper modules are skipped, so the cog that called them is reported.
+    If no other cog is on the stack, cog recorded in current_cog is used.
+
+    Returns:
+        str: Cog module name (e.g. "economy"), "database" if only Database cog was found or "unknown".
+    """
+    frame = sys._getframe(1)
+    fallback = "unknown"
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("cogs.") and not module.startswith("cogs.utils"):
+            if module != "cogs.database":
+                return module[5:]
+            fallback = "database"
+        frame = frame.f_back
+    return current_cog.get() or fallback
+
+
+def caller_context() -> Context:
+    """
+    Returns copy of current context with current_cog set to the calling cog,
+    for tasks started on behalf of that cog.
+
+    Returns:
+        Context: Context to run the task in.
+    """
+    context = copy_context()
+    context.run(current_cog.set, calling_cog())
+    return context
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener collecting latency histograms, failures and bytes
+    per command, collection and calling cog. Registered on AsyncMongoClient in main.py.
+    """
+    def __init__(self):
+        """
+        Initializes empty metrics.
+        """
+        self.stats = {}
+        self._in_flight = {}
+
+    def started(self, event : monitoring.CommandStartedEvent) -> None:
+        """
+        Remembers collection, calling cog and size of a command that was just sent.
+        """
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        try:
+            size = len(bson.encode(event.command))
+        except Exception:
+            size = 0
+        self._in_flight[(event.connection_id, event.request_id)] = ((event.command_name, collection, calling_cog()), size)
+
+    def succeeded(self, event : monitoring.CommandSucceededEvent) -> None:
+        """
+        Records latency and reply size of a succeeded command.
+        """
+        try:
+            size = len(bson.encode(event.reply))
+        except Exception:
+            size = 0
+        self._finish(event, size, False)
+
+    def failed(self, event : monitoring.CommandFailedEvent) -> None:
+        """
+        Records latency of a failed command.
+        """
+        self._finish(event, 0, True)
+
+    def _finish(self, event, bytes_received : int, failed : bool) -> None:
+        """
+        Records finished command under key saved when it started.
+        """
+        started = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        key, bytes_sent = started
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = CommandStats()
+        stats.record(event.duration_micros / 1000, bytes_sent, bytes_received, failed)
+
+    def snapshot(self) -> dict:
+        """
+        Returns collected metrics.
+
+        Returns:
+            dict: {(command, collection, cog) : stats dict}.
+        """
+        return {key : stats.to_dict() for key, stats in self.stats.items()}
+
+    def log_summary(self, limit : int = 15) -> None:
+        """
+        Logs metrics of commands with the highest total latency.
+
+        Arguments:
+            limit (int): How many lines to log.
+        """
+        if not self.stats:
+            return
+        slowest = sorted(self.stats.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
+        for (command, collection, cog), stats in slowest:
+            logger.info(
+                f"mongo {command} {collection} [{cog}]: n={stats.count} failed={stats.failures} "
+                f"avg={stats.total_ms / stats.count:.2f}ms p95={stats.percentile(0.95):.0f}ms max={stats.max_ms:.2f}ms "
+                f"sent={stats.bytes_sent}B received={stats.bytes_received}B"
+            )
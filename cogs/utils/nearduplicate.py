@@ -0,0 +1,170 @@
+from bisect import bisect_right
+from collections import deque
+from itertools import count
+from math import ceil
+from time import monotonic
+from .normalize import normalize
+
+# Messages are compared by character 4-grams (shingles) of normalized text.
+SHINGLE = 4
+
+# Smallest shingle hashes kept as fingerprint of a message (bottom-k MinHash sketch),
+# shorter messages have too few shingles to tell copy-paste from common phrases.
+SKETCH = 16
+
+# Only start of a message is fingerprinted, so long messages cost the same as short ones.
+MAX_CHARS = 256
+
+# Default settings of guild detection, limit counts the checked message too.
+LIMIT = 3
+MAX_LIMIT = 10
+
+# Fingerprints kept per hash value, a lookup scans at most SKETCH * BUCKET_SIZE entries whatever the window.
+# Every copy of a message shares all its hashes, so buckets must fit MAX_LIMIT - 1 copies for count to reach the limit.
+BUCKET_SIZE = MAX_LIMIT
+SIMILARITY = 60
+WINDOW = 60
+
+
+def fingerprint(text : str) -> tuple:
+    """
+    Computes bottom-k MinHash sketch of text: SKETCH smallest hashes of shingles of its first MAX_CHARS characters.
+    Shares of equal values in sketches of two texts estimate their Jaccard similarity,
+    one changed word in a sentence keeps most of them.
+    Hashes come from built-in hash, so fingerprints are comparable only within one process.
+
+    Arguments:
+        text (str): Message content.
+
+    Returns:
+        tuple: Sorted hashes or None if text is too short.
+    """
+    if len(text) < SKETCH + SHINGLE - 1:
+        return None
+    text = " ".join(normalize(text[:MAX_CHARS]).split())
+    hashes = set(map(hash, zip(*(text[offset:] for offset in range(SHINGLE)))))
+    if len(hashes) < SKETCH:
+        return None
+    return tuple(sorted(hashes)[:SKETCH])
+
+
+def similarity(first : tuple, second : tuple) -> float:
+    """
+    Estimates Jaccard similarity of two texts from their fingerprints.
+
+    Arguments:
+        first (tuple): Fingerprint of first text.
+        second (tuple): Fingerprint of second text.
+
+    Returns:
+        float: Similarity between 0 and 1.
+    """
+    first, second = set(first), set(second)
+    shared = first & second
+    return sum(1 for value in sorted(first | second)[:SKETCH] if value in shared) / SKETCH
+
+
+class NearDuplicateIndex:
+    """
+    Time windowed index of recent message fingerprints of one guild.
+    Every hash of a fingerprint points to a bucket of fixed size, so a lookup scans at most
+    SKETCH * bucket_size entries no matter how many messages are in the window (a bigger window
+    only makes the dicts larger). Expired entries are dropped in insertion order.
+
+    Attributes:
+        window (float): Seconds a fingerprint is kept.
+        max_entries (int): Maximum kept fingerprints.
+        bucket_size (int): Maximum fingerprints per hash value.
+        entries (deque): (timestamp, fingerprint, sequence number) in insertion order.
+        buckets (dict): Deque of entries by hash value.
+        sequence (count): Numbers entries in insertion order.
+    """
+    def __init__(self, window : float = WINDOW, max_entries : int = 20000, bucket_size : int = BUCKET_SIZE):
+        """
+        Initializes empty index.
+
+        Arguments:
+            window (float): Seconds a fingerprint is kept.
+            max_entries (int): Maximum kept fingerprints.
+            bucket_size (int): Maximum fingerprints per hash value.
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.bucket_size = bucket_size
+        self.entries = deque()
+        self.buckets = {}
+        self.sequence = count()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _expire(self, now : float) -> None:
+        """
+        Drops entries older than window or over the limit, together with their bucket references.
+        """
+        entries = self.entries
+        while entries and (entries[0][0] < now - self.window or len(entries) > self.max_entries):
+            entry = entries.popleft()
+            for value in entry[1]:
+                bucket = self.buckets.get(value)
+                if bucket and bucket[0] is entry:
+                    bucket.popleft()
+                if not bucket:
+                    self.buckets.pop(value, None)
+
+    def count(self, sketch : tuple, threshold : float, now : float = None) -> int:
+        """
+        Counts fingerprints in the window similar to given one. Shared hashes found in buckets bound
+        the estimated similarity from above, so only entries sharing enough of them are compared.
+        Buckets drop their oldest entries when full, so every full bucket whose oldest entry is newer than a candidate
+        counts as shared for it and such candidates are checked against the whole fingerprint before the estimate.
+
+        Arguments:
+            sketch (tuple): Fingerprint of the message.
+            threshold (float): Minimum similarity between 0 and 1.
+            now (float): Current time, monotonic clock by default.
+
+        Returns:
+            int: Number of near duplicates.
+        """
+        self._expire(monotonic() if now is None else now)
+        hits = {}
+        full = []
+        for value in sketch:
+            bucket = self.buckets.get(value, ())
+            if len(bucket) == self.bucket_size:
+                full.append(bucket[0][2])
+            for entry in bucket:
+                hit = hits.get(id(entry))
+                if hit is None:
+                    hits[id(entry)] = [1, entry]
+                else:
+                    hit[0] += 1
+        needed = max(1, ceil(threshold * SKETCH))
+        full.sort()
+        values = set(sketch)
+        duplicates = 0
+        for shared, entry in hits.values():
+            dropped = len(full) - bisect_right(full, entry[2])
+            if shared + dropped < needed or dropped and len(values.intersection(entry[1])) < needed:
+                continue
+            duplicates += similarity(sketch, entry[1]) >= threshold
+        return duplicates
+
+    def add(self, sketch : tuple, now : float = None) -> None:
+        """
+        Adds fingerprint to the window.
+
+        Arguments:
+            sketch (tuple): Fingerprint of the message.
+            now (float): Current time, monotonic clock by default.
+        """
+        now = monotonic() if now is None else now
+        entry = (now, sketch, next(self.sequence))
+        self.entries.append(entry)
+        for value in sketch:
+            bucket = self.buckets.get(value)
+            if bucket is None:
+                bucket = self.buckets[value] = deque(maxlen=self.bucket_size)
+            bucket.append(entry)
+        self._expire(now)
@@ -0,0 +1,125 @@
+import re
+import unicodedata
+
+# Characters users put inside words to dodge filters, removed completely.
+ZERO_WIDTH = "\u00ad\u180e\u200b\u200c\u200d\u2060\ufeff"
+
+# Leetspeak digits and symbols read as letters.
+LEET = {"0" : "o", "1" : "i", "3" : "e", "4" : "a", "5" : "s", "7" : "t", "8" : "b", "@" : "a", "$" : "s", "€" : "e"}
+
+# Numbers (digits not touching letters, leetspeak symbols or zero-width characters) are kept as they are,
+# so prices and years like "455" aren't read as words.
+WORD_CHARS = r"\w" + re.escape("".join(char for char in LEET if not char.isdigit()) + ZERO_WIDTH)
+# Lookbehind checks the character before the first digit only after a digit is found, it's slow at every position.
+NUMBERS = re.compile(rf"[0-9０-９](?<![{WORD_CHARS}].)[0-9０-９]*(?![{WORD_CHARS}])")
+
+# Cyrillic and Greek letters that look like latin ones.
+CONFUSABLES = {
+    "а" : "a", "в" : "b", "е" : "e", "ё" : "e", "і" : "i", "ї" : "i", "ј" : "j", "к" : "k", "м" : "m", "н" : "h",
+    "о" : "o", "р" : "p", "с" : "c", "ѕ" : "s", "т" : "t", "у" : "y", "х" : "x", "ԁ" : "d", "ԛ" : "q", "ԝ" : "w",
+    "А" : "a", "В" : "b", "Е" : "e", "К" : "k", "М" : "m", "Н" : "h", "О" : "o", "Р" : "p", "С" : "c", "Т" : "t",
+    "У" : "y", "Х" : "x", "І" : "i", "Ј" : "j", "Ѕ" : "s",
+    "α" : "a", "β" : "b", "ε" : "e", "ι" : "i", "κ" : "k", "ν" : "v", "ο" : "o", "ρ" : "p", "τ" : "t", "υ" : "u",
+    "χ" : "x", "Α" : "a", "Β" : "b", "Ε" : "e", "Ζ" : "z", "Η" : "h", "Ι" : "i", "Κ" : "k", "Μ" : "m", "Ν" : "n",
+    "Ο" : "o", "Ρ" : "p", "Τ" : "t", "Υ" : "y", "Χ" : "x"
+}
+
+# Same character repeated 3+ times ("fuuuuck"), shortened to two.
+LONG_RUNS = re.compile(r"(?s)(.)\1\1+")
+
+# Same character repeated 2+ times, shortened to one.
+RUNS = re.compile(r"(?s)(.)\1+")
+
+
+def build_table() -> tuple:
+    """
+    Builds translation table used by normalize: lowercase ASCII, latin letters with accents
+    and fullwidth forms to plain ASCII, confusables and leetspeak to letters, zero-width
+    characters and combining marks removed.
+    Table covers whole Basic Multilingual Plane, unchanged characters map to themselves,
+    because every character missing in a dict table costs str.translate a raised LookupError.
+
+    Returns:
+        tuple: Table for str.translate indexed by code point.
+    """
+    table = {code : chr(code).lower() for code in range(ord("A"), ord("Z") + 1)}
+
+    for code in range(0x00C0, 0x0250):
+        base = unicodedata.normalize("NFKD", chr(code))[0]
+        if base.isascii() and base.isalpha():
+            table[code] = base.lower()
+
+    for code in range(0xFF01, 0xFF5F):
+        table[code] = chr(code - 0xFEE0).lower()
+
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    for char in ZERO_WIDTH:
+        table[ord(char)] = None
+
+    table.update({ord(char) : letter for char, letter in CONFUSABLES.items()})
+    table.update({ord(char) : letter for char, letter in LEET.items()})
+    for code, value in table.items():
+        if value in LEET:
+            table[code] = LEET[value]
+    return tuple(table.get(code, code) for code in range(0x10000))
+
+
+TABLE = build_table()
+
+
+def translate(text : str) -> str:
+    """
+    Translates text with TABLE, numbers are copied unchanged.
+
+    Arguments:
+        text (str): Message content.
+
+    Returns:
+        str: Translated text.
+    """
+    match = NUMBERS.search(text)
+    if match is None:
+        return text.translate(TABLE)
+
+    pieces = []
+    start = 0
+    while match is not None:
+        pieces.append(text[start:match.start()].translate(TABLE))
+        pieces.append(match.group())
+        start = match.end()
+        match = NUMBERS.search(text, start)
+    pieces.append(text[start:].translate(TABLE))
+    return "".join(pieces)
+
+
+def normalize(text : str) -> str:
+    """
+    Normalizes text before banned words matching in one str.translate pass (numbers are kept), then shortens
+    runs of 3+ same characters to two. E.g. "ＦU\\u200bυυυck 4$$ 455" -> "fuuck ass 455".
+
+    Arguments:
+        text (str): Message content.
+
+    Returns:
+        str: Normalized text.
+    """
+    return LONG_RUNS.sub(r"\1\1", translate(text))
+
+
+def variants(text : str) -> tuple:
+    """
+    Returns normalized text to check for banned words. If text had stretched letters,
+    squeezed variant (every run shortened to one) is added, so both "asssss" -> "ass"
+    and "fuuuuck" -> "fuck" are caught.
+
+    Arguments:
+        text (str): Message content.
+
+    Returns:
+        tuple: Normalized text and optionally its squeezed variant.
+    """
+    normalized, stretched = LONG_RUNS.subn(r"\1\1", translate(text))
+    if not stretched:
+        return (normalized,)
+    return normalized, RUNS.sub(r"\1", normalized)
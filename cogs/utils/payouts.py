@@ -0,0 +1,163 @@
+from random import randint, choice
+
+# Payout tables of gambling games and crimes, shared by Gambling cog and tools/simulate_payouts.py
+# so simulated house edge can't drift from the real games. Kept free of discord imports.
+
+# Pet bonuses: rat multiplies gambling wins, squid multiplies crime and steal gains.
+RAT_MULTIPLIER = 1.25
+SQUID_MULTIPLIER = 1.3
+
+# Lowest and highest bet of slots and roulette.
+MIN_BET = 1
+MAX_BET = 999999
+
+# Slots: three random symbols, all matching pays SLOTS_MULTIPLIER times the bet.
+SLOTS_SYMBOLS = ("🟩", "🟦", "🟪", "🟨", "🟥", "⬜")
+SLOTS_MULTIPLIER = 7
+
+# Scratches: ticket price, roll 1-100 and (highest roll, lowest win, highest win) of winning tiers.
+SCRATCH_PRICE = 12
+SCRATCH_ROLL = 100
+SCRATCH_TIERS = ((5, 150, 250), (15, 60, 120), (30, 20, 50))
+
+# Roulette: pockets 0-36, 0 is green, even black, odd red.
+ROULETTE_POCKETS = 37
+ROULETTE_COLORS = ("red", "black", "green")
+ROULETTE_COLOR_AND_NUMBER = 70
+ROULETTE_NUMBER = 35
+ROULETTE_COLOR = 2
+
+# Crime and steal roll 1-CHANCE_ROLL.
+CHANCE_ROLL = 10
+
+# Crime: success when roll is at most CRIME_SUCCESS, cooldown in hours.
+CRIME_SUCCESS = 6
+CRIME_REWARD = (50, 150)
+CRIME_COOLDOWN = 3
+
+# Steal: success when roll is at least STEAL_SUCCESS, stolen part of victim coins in tenths.
+STEAL_SUCCESS = 8
+STEAL_TENTHS = (1, 5)
+STEAL_COOLDOWN = 6
+
+# Bail paid when crime or steal fails.
+BAIL = (75, 125)
+
+
+def rat_bonus(pet : str, win : int) -> float:
+    """
+    Applies rat bonus to gambling win.
+
+    Arguments:
+        pet (str): Active pet of the member.
+        win (int): Win before bonus.
+
+    Returns:
+        float: Win multiplied by RAT_MULTIPLIER if rat is active.
+    """
+    return win * RAT_MULTIPLIER if pet == "rat" else win
+
+
+def squid_bonus(pet : str, gain : int) -> float:
+    """
+    Applies squid bonus to crime or steal gain.
+
+    Arguments:
+        pet (str): Active pet of the member.
+        gain (int): Gain before bonus.
+
+    Returns:
+        float: Gain multiplied by SQUID_MULTIPLIER if squid is active.
+    """
+    return gain * SQUID_MULTIPLIER if pet == "squid" else gain
+
+
+def spin_slots() -> tuple:
+    """
+    Returns three random slots symbols.
+    """
+    return choice(SLOTS_SYMBOLS), choice(SLOTS_SYMBOLS), choice(SLOTS_SYMBOLS)
+
+
+def slots_win(slots : tuple, amount : int) -> int:
+    """
+    Returns win of slots spin before pet bonus, 0 if symbols don't match.
+    """
+    return amount * SLOTS_MULTIPLIER if slots[0] == slots[1] == slots[2] else 0
+
+
+def scratch_tier(roll : int) -> tuple:
+    """
+    Returns (lowest, highest) win of scratch ticket roll, (0, 0) if it doesn't win.
+
+    Arguments:
+        roll (int): Roll 1-SCRATCH_ROLL.
+    """
+    for highest, low, high in SCRATCH_TIERS:
+        if roll <= highest:
+            return low, high
+    return 0, 0
+
+
+def scratch_win(roll : int) -> int:
+    """
+    Returns win of scratch ticket before pet bonus.
+
+    Arguments:
+        roll (int): Roll 1-SCRATCH_ROLL.
+    """
+    return randint(*scratch_tier(roll))
+
+
+def crime_succeeded(roll : int) -> bool:
+    """
+    Returns True if crime with roll 1-CHANCE_ROLL succeeded.
+    """
+    return roll <= CRIME_SUCCESS
+
+
+def steal_succeeded(roll : int) -> bool:
+    """
+    Returns True if steal with roll 1-CHANCE_ROLL succeeded.
+    """
+    return roll >= STEAL_SUCCESS
+
+
+def stolen_coins(balance : int, tenths : int) -> int:
+    """
+    Returns coins stolen from victim before pet bonus.
+
+    Arguments:
+        balance (int): Coins of the victim.
+        tenths (int): Stolen part of the balance in tenths.
+    """
+    return balance * tenths // 10
+
+
+def roulette_color(result : int) -> str:
+    """
+    Returns color of roulette pocket.
+    """
+    if result == 0:
+        return "green"
+    return "black" if result % 2 == 0 else "red"
+
+
+def roulette_win(amount : int, result : int, color : str, number : int = None) -> int:
+    """
+    Returns win of roulette bet before pet bonus.
+
+    Arguments:
+        amount (int): Bet.
+        result (int): Pocket the ball landed on.
+        color (str): Chosen color.
+        number (int): Chosen number or None.
+    """
+    result_color = roulette_color(result)
+    if result_color == color and result == number:
+        return amount * ROULETTE_COLOR_AND_NUMBER
+    if result == number:
+        return amount * ROULETTE_NUMBER
+    if result_color == color:
+        return amount * ROULETTE_COLOR
+    return 0
@@ -0,0 +1,79 @@
+import discord
+from .models import UserDoc, GuildDoc
+
+
+class MessageContext:
+    """
+    State of one message going through the message pipeline (see cogs/message_pipeline.py).
+    Stages read member and guild data from here instead of database and put their
+    member changes into one merged update, which is written once after all stages ran.
+
+    Attributes:
+        message (discord.Message): Processed message.
+        member (UserDoc): Author document loaded before the first stage.
+        guild (GuildDoc): Guild config loaded before the first stage.
+        update (dict): Merged update of the author document in MongoDB syntax.
+        announcements (list): Embeds sent to the channel after the update is written.
+        stopped (bool): If True, remaining stages are skipped (e.g. message was deleted by automod).
+    """
+    __slots__ = ("message", "member", "guild", "update", "announcements", "stopped")
+
+    def __init__(self, message : discord.Message, member : UserDoc, guild : GuildDoc):
+        """
+        Initializes context of a message.
+
+        Arguments:
+            message (discord.Message): Processed message.
+            member (UserDoc): Author document.
+            guild (GuildDoc): Guild config.
+        """
+        self.message = message
+        self.member = member
+        self.guild = guild
+        self.update = {}
+        self.announcements = []
+        self.stopped = False
+
+    def inc(self, path : str, amount : int) -> None:
+        """
+        Adds increment of a field to the merged update. If the field is already $set, the set value is increased instead.
+
+        Arguments:
+            path (str): Dotted path of the field.
+            amount (int): Value to add.
+        """
+        values = self.update.get("$set", {})
+        if path in values:
+            values[path] += amount
+            return
+        increments = self.update.setdefault("$inc", {})
+        increments[path] = increments.get(path, 0) + amount
+
+    def set(self, path : str, value) -> None:
+        """
+        Adds set of a field to the merged update, replacing earlier increments of the same field
+        (MongoDB rejects one path in two operators).
+
+        Arguments:
+            path (str): Dotted path of the field.
+            value: New value.
+        """
+        self.update.get("$inc", {}).pop(path, None)
+        if "$inc" in self.update and not self.update["$inc"]:
+            del self.update["$inc"]
+        self.update.setdefault("$set", {})[path] = value
+
+    def announce(self, embed : discord.Embed) -> None:
+        """
+        Queues embed to send to message channel after the update is written.
+
+        Arguments:
+            embed (discord.Embed): Embed to send.
+        """
+        self.announcements.append(embed)
+
+    def stop(self) -> None:
+        """
+        Skips remaining stages. Already merged update is still written.
+        """
+        self.stopped = True
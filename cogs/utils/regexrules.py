@@ -0,0 +1,315 @@
+from time import perf_counter
+import re
+import logging
+
+try:
+    import re2    # google-re2, matches in linear time
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+# Limits of custom rules checked when admin adds a rule.
+MAX_RULES = 25
+MAX_PATTERN_LENGTH = 200
+
+# Longest scanned part of a message (Discord limit with Nitro).
+MAX_TEXT_LENGTH = 4000
+
+# Slowest allowed scan of one message and of validation input (ms).
+SCAN_BUDGET_MS = 5.0
+
+# Most unbounded quantifiers (+, *, {n,}) in one rule, each one can multiply backtracking by length of text.
+MAX_UNBOUNDED = 4
+
+# Rule set that overran the budget this many times is switched off.
+MAX_OVERRUNS = 3
+
+# Every n-th scanned message is also matched rule by rule to measure per-rule timings.
+TIMING_SAMPLE = 50
+
+_parser = getattr(re, "_parser", None)
+if _parser is None:
+    import sre_parse as _parser
+
+UNBOUNDED = _parser.MAXREPEAT
+REPEATS = (_parser.MAX_REPEAT, _parser.MIN_REPEAT)
+LOOKAROUNDS = (_parser.ASSERT, _parser.ASSERT_NOT)
+
+
+def check_backtracking(items, in_repeat : bool = False) -> int:
+    """
+    Walks parsed pattern and rejects constructs which can make backtracking engine exponential:
+    backreferences, lookarounds, nested quantifiers like (a+)+ or (.*a){12} and
+    alternation inside repeated group like (a|aa)*.
+
+    Arguments:
+        items: Parsed (sub)pattern from re parser.
+        in_repeat (bool): If items are inside repeated group.
+
+    Returns:
+        int: Number of unbounded quantifiers.
+
+    Raises:
+        ValueError: With reason if pattern is unsafe.
+    """
+    unbounded = 0
+    for op, value in items:
+        if op in (_parser.GROUPREF, _parser.GROUPREF_EXISTS):
+            raise ValueError("backreferences are not allowed")
+        if op in LOOKAROUNDS:
+            raise ValueError("lookarounds are not allowed")
+        if op in REPEATS:
+            low, high, sub = value
+            if high <= 1:
+                unbounded += check_backtracking(sub, in_repeat)
+                continue
+            if in_repeat:
+                raise ValueError("nested quantifiers like (a+)+ are not allowed")
+            unbounded += (high == UNBOUNDED) + check_backtracking(sub, True)
+        elif op == _parser.BRANCH:
+            if in_repeat:
+                raise ValueError("alternation inside repeated group like (a|b)+ is not allowed")
+            unbounded += sum(check_backtracking(branch, in_repeat) for branch in value[1])
+        elif op == _parser.SUBPATTERN:
+            unbounded += check_backtracking(value[-1], in_repeat)
+        elif op == getattr(_parser, "ATOMIC_GROUP", None):
+            unbounded += check_backtracking(value, in_repeat)
+    return unbounded
+
+
+def adversarial_inputs(pattern : str):
+    """
+    Yields inputs which trigger worst case of typical slow patterns: characters used by the pattern
+    repeated and followed by a character that breaks the match. Length doubles up to MAX_TEXT_LENGTH,
+    so polynomial blowup shows up on short input before a long one could block for seconds.
+    """
+    characters = sorted({char for char in pattern if char.isalnum() or char == " "} | {"a", " ", "1"})[:20]
+    length = 64
+    while True:
+        length = min(length, MAX_TEXT_LENGTH)
+        for char in characters:
+            yield char * length
+            yield char * (length - 1) + "\x00"
+        yield "ab " * (length // 3)
+        if length == MAX_TEXT_LENGTH:
+            return
+        length *= 2
+
+
+def compile_pattern(pattern : str):
+    """
+    Compiles pattern case insensitive with linear time engine if it's installed.
+    """
+    if re2 is not None:
+        return re2.compile(f"(?i){pattern}")
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def combine(patterns) -> object:
+    """
+    Compiles rules into one alternation, so a message is scanned once.
+
+    Arguments:
+        patterns: Iterable of regular expressions.
+
+    Returns:
+        Compiled combined pattern.
+
+    Raises:
+        Exception: If rules can't be combined, e.g. two rules define the same named group.
+    """
+    return compile_pattern("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def validate_rule(pattern : str, existing : tuple = ()) -> None:
+    """
+    Checks custom rule before it's saved: limits, syntax, combining with existing rules,
+    backtracking safety (only without re2) and time of scanning adversarial inputs.
+
+    Arguments:
+        pattern (str): Regular expression from guild admin.
+        existing (tuple): Rules the guild already has.
+
+    Raises:
+        ValueError: With reason why the rule was rejected.
+    """
+    if len(existing) >= MAX_RULES:
+        raise ValueError(f"guild can have at most {MAX_RULES} rules")
+    if not pattern or len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"rule must have 1-{MAX_PATTERN_LENGTH} characters")
+
+    try:
+        parsed = _parser.parse(f"(?:{pattern})", re.IGNORECASE)
+        compiled = compile_pattern(f"(?:{pattern})")
+    except Exception as e:
+        raise ValueError(f"invalid pattern: {e}")
+
+    try:
+        combine((*RegexRules(existing).patterns, pattern))
+    except Exception as e:
+        raise ValueError(f"rule can't be combined with existing rules: {e}")
+
+    if compiled.search("") is not None:
+        raise ValueError("rule matches empty text, so it would match every message")
+
+    if re2 is None and check_backtracking(list(parsed)) > MAX_UNBOUNDED:
+        raise ValueError(f"rule can have at most {MAX_UNBOUNDED} unbounded quantifiers (+, *)")
+
+    for text in adversarial_inputs(pattern):
+        started = perf_counter()
+        compiled.search(text)
+        elapsed = (perf_counter() - started) * 1000
+        if elapsed > SCAN_BUDGET_MS:
+            raise ValueError(f"rule is too slow ({elapsed:.1f}ms on {len(text)} characters)")
+
+
+class RuleStats:
+    """
+    Timings of one custom rule.
+
+    Attributes:
+        samples (int): Sampled scans.
+        total_ms (float): Summed time of sampled scans.
+        max_ms (float): Slowest sampled scan.
+        hits (int): Messages removed because of this rule.
+    """
+    __slots__ = ("samples", "total_ms", "max_ms", "hits")
+
+    def __init__(self):
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.hits = 0
+
+    def to_dict(self) -> dict:
+        """
+        Returns counters as plain dict.
+        """
+        return {
+            "samples" : self.samples,
+            "avg_us" : self.total_ms * 1000 / self.samples if self.samples else 0.0,
+            "max_us" : self.max_ms * 1000,
+            "hits" : self.hits
+        }
+
+
+class RegexRules:
+    """
+    Custom regex rules of one guild compiled into one combined pattern, so a message is scanned once.
+    Uses re2 (linear time) if installed, otherwise rules are restricted by validate_rule.
+    On top of that every scan is timed and rule set that overruns SCAN_BUDGET_MS repeatedly is switched off.
+
+    Attributes:
+        patterns (tuple): Rules in order they were added.
+        stats (dict): RuleStats by pattern.
+        scans (int): Scanned messages.
+        scan_ms (float): Summed time of combined scans.
+        overruns (int): Scans slower than budget.
+        disabled (bool): If rule set was switched off for being slow.
+    """
+    __slots__ = ("patterns", "stats", "scans", "scan_ms", "overruns", "disabled", "_combined", "_compiled")
+
+    def __init__(self, patterns = ()):
+        """
+        Compiles rules. Rules that don't compile or can't be combined with earlier ones
+        (e.g. saved before validation existed) are skipped.
+
+        Arguments:
+            patterns: Iterable of regular expressions.
+        """
+        self.patterns = ()
+        self.stats = {}
+        self.scans = 0
+        self.scan_ms = 0.0
+        self.overruns = 0
+        self.disabled = False
+        self._compiled = {}
+        for pattern in patterns:
+            try:
+                compiled = compile_pattern(pattern)
+                combine((*self._compiled, pattern))
+            except Exception as e:
+                logger.warning(f"Skipping invalid automod rule {pattern!r}: {e}")
+                continue
+            self._compiled[pattern] = compiled
+            self.stats[pattern] = RuleStats()
+        self.patterns = tuple(self._compiled)
+        self._combined = combine(self.patterns) if self.patterns else None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match(self, text : str) -> str:
+        """
+        Scans text with combined pattern.
+
+        Arguments:
+            text (str): Message content.
+
+        Returns:
+            str: First rule that matches or None.
+        """
+        if self._combined is None or self.disabled:
+            return None
+
+        text = text[:MAX_TEXT_LENGTH]
+        self.scans += 1
+        started = perf_counter()
+        found = self._combined.search(text)
+        elapsed = (perf_counter() - started) * 1000
+        self.scan_ms += elapsed
+
+        if elapsed > SCAN_BUDGET_MS:
+            self.overruns += 1
+            logger.warning(f"Automod rules scan took {elapsed:.1f}ms ({self.overruns}/{MAX_OVERRUNS} overruns)")
+            if self.overruns >= MAX_OVERRUNS:
+                self.disabled = True
+                logger.error(f"Automod rules {self.patterns} disabled for being too slow")
+
+        if found is None and self.scans % TIMING_SAMPLE:
+            return None
+        return self.match_each(text, found is not None)
+
+    def match_each(self, text : str, record_hit : bool) -> str:
+        """
+        Matches rules one by one, recording their timings. Runs for sampled messages and
+        to find out which rule matched.
+
+        Arguments:
+            text (str): Message content.
+            record_hit (bool): If matched rule should be counted as hit.
+
+        Returns:
+            str: First rule that matches or None.
+        """
+        matched = None
+        for pattern, compiled in self._compiled.items():
+            started = perf_counter()
+            found = compiled.search(text)
+            elapsed = (perf_counter() - started) * 1000
+
+            stats = self.stats[pattern]
+            stats.samples += 1
+            stats.total_ms += elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+            if found is not None and matched is None:
+                matched = pattern
+        if matched is not None and record_hit:
+            self.stats[matched].hits += 1
+        return matched
+
+    def timings(self) -> dict:
+        """
+        Returns per-rule timings and totals of combined scans.
+
+        Returns:
+            dict: {"rules" : {pattern : stats dict}, "scans" : int, "avg_scan_us" : float, "overruns" : int, "disabled" : bool}.
+        """
+        return {
+            "rules" : {pattern : stats.to_dict() for pattern, stats in self.stats.items()},
+            "scans" : self.scans,
+            "avg_scan_us" : self.scan_ms * 1000 / self.scans if self.scans else 0.0,
+            "overruns" : self.overruns,
+            "disabled" : self.disabled
+        }
@@ -0,0 +1,163 @@
+from collections import OrderedDict, deque
+from time import monotonic
+
+# Per-user limits: messages in window, same message repeated, mentions in window.
+MAX_MESSAGES = 6
+MESSAGE_WINDOW = 5.0
+MAX_DUPLICATES = 3
+DUPLICATE_WINDOW = 30.0
+MAX_MENTIONS = 8
+MENTION_WINDOW = 30.0
+
+# Per-channel limit (raid): messages from anyone in window.
+MAX_CHANNEL_MESSAGES = 25
+CHANNEL_WINDOW = 5.0
+
+# Entries idle longer than this are evicted, MAX_ENTRIES bounds memory during raids.
+IDLE_TIMEOUT = 120.0
+MAX_ENTRIES = 50000
+
+# Violations reported by SpamDetector.record.
+FLOOD = "flood"
+DUPLICATES = "duplicates"
+MENTIONS = "mentions"
+CHANNEL_FLOOD = "channel_flood"
+
+
+class UserWindow:
+    """
+    Last messages of one user in one guild, kept in a fixed-size ring buffer.
+
+    Attributes:
+        entries (deque): (timestamp, content hash, mentions) of last messages, oldest first.
+        last_seen (float): Timestamp of the last message.
+    """
+    __slots__ = ("entries", "last_seen")
+
+    def __init__(self):
+        self.entries = deque(maxlen=max(MAX_MESSAGES, MAX_DUPLICATES, MAX_MENTIONS))
+        self.last_seen = 0.0
+
+
+class SpamDetector:
+    """
+    Sliding window spam and flood detection. Users and channels get fixed-size ring buffers,
+    so every message costs O(1) work and each active user takes bounded memory.
+    Entries are kept in LRU order and idle ones are evicted while recording new messages.
+
+    Attributes:
+        users (OrderedDict): UserWindow by (guild id, user id).
+        channels (OrderedDict): Ring buffer of message timestamps by channel id.
+        violations (dict): Number of detected violations by kind.
+    """
+    def __init__(self, max_entries : int = MAX_ENTRIES, idle_timeout : float = IDLE_TIMEOUT):
+        """
+        Initializes detector without any entries.
+
+        Arguments:
+            max_entries (int): Maximum tracked users and channels (each).
+            idle_timeout (float): Seconds after which entry of silent user or channel is dropped.
+        """
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+        self.users = OrderedDict()
+        self.channels = OrderedDict()
+        self.violations = {FLOOD : 0, DUPLICATES : 0, MENTIONS : 0, CHANNEL_FLOOD : 0}
+
+    def _evict(self, entries : OrderedDict, now : float, last_seen) -> None:
+        """
+        Drops least recently active entries which are idle or over the limit.
+        """
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if len(entries) <= self.max_entries and now - last_seen(entry) <= self.idle_timeout:
+                return
+            del entries[key]
+
+    def record(self, guild_id : int, channel_id : int, user_id : int, content : str, mentions : int, now : float = None) -> str:
+        """
+        Records a message and checks limits of its author and channel.
+
+        Arguments:
+            guild_id (int): Id of the guild.
+            channel_id (int): Id of the channel.
+            user_id (int): Id of the author.
+            content (str): Message content, compared by hash.
+            mentions (int): Users and roles mentioned in the message.
+            now (float): Time of the message, monotonic clock by default.
+
+        Returns:
+            str: Detected violation (FLOOD, DUPLICATES, MENTIONS, CHANNEL_FLOOD) or None.
+        """
+        now = monotonic() if now is None else now
+
+        key = (guild_id, user_id)
+        window = self.users.get(key)
+        if window is None:
+            window = self.users[key] = UserWindow()
+        else:
+            self.users.move_to_end(key)
+        window.last_seen = now
+        content_hash = hash(content.strip().lower()) if content else None
+        window.entries.append((now, content_hash, mentions))
+        self._evict(self.users, now, lambda entry: entry.last_seen)
+
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = deque(maxlen=MAX_CHANNEL_MESSAGES)
+        else:
+            self.channels.move_to_end(channel_id)
+        channel.append(now)
+        self._evict(self.channels, now, lambda entry: entry[-1])
+
+        violation = self.check_user(window, content_hash, now)
+        if violation is None and len(channel) == MAX_CHANNEL_MESSAGES and now - channel[0] <= CHANNEL_WINDOW:
+            violation = CHANNEL_FLOOD
+            channel.clear()
+        if violation is not None:
+            self.violations[violation] += 1
+        return violation
+
+    def check_user(self, window : UserWindow, content_hash : int, now : float) -> str:
+        """
+        Checks ring buffer of one user, newest message is already in it.
+
+        Arguments:
+            window (UserWindow): Users last messages.
+            content_hash (int): Hash of the newest message content.
+            now (float): Time of the newest message.
+
+        Returns:
+            str: Detected violation or None.
+        """
+        entries = window.entries
+        if len(entries) >= MAX_MESSAGES and now - entries[-MAX_MESSAGES][0] <= MESSAGE_WINDOW:
+            return FLOOD
+
+        if content_hash is not None:
+            duplicates = sum(1 for sent, other, _ in entries if other == content_hash and now - sent <= DUPLICATE_WINDOW)
+            if duplicates >= MAX_DUPLICATES:
+                return DUPLICATES
+
+        if sum(mentions for sent, _, mentions in entries if now - sent <= MENTION_WINDOW) >= MAX_MENTIONS:
+            return MENTIONS
+        return None
+
+    def forget(self, guild_id : int, user_id : int) -> None:
+        """
+        Drops window of a user after action was taken, so messages already on their way don't trigger it again.
+
+        Arguments:
+            guild_id (int): Id of the guild.
+            user_id (int): Id of the user.
+        """
+        self.users.pop((guild_id, user_id), None)
+
+    def stats(self) -> dict:
+        """
+        Returns tracked entries and detected violations.
+
+        Returns:
+            dict: Tracked users, channels and violations by kind.
+        """
+        return {"users" : len(self.users), "channels" : len(self.channels), "violations" : dict(self.violations)}
@@ -0,0 +1,339 @@
+from copy import deepcopy
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.operations import InsertOne, UpdateOne
+from pymongo.results import BulkWriteResult, InsertManyResult, UpdateResult
+
+
+def apply_update(document : dict, update : dict) -> None:
+    """
+    Applies MongoDB update operators to a local copy of a document, so cached documents
+    stay the same as the ones in database. Supports $set, $unset, $inc, $addToSet, $pull, $pullAll and dotted paths.
+    $setOnInsert is skipped, it only matters when document is created.
+
+    Arguments:
+        document (dict): Document to update in place.
+        update (dict): Update in MongoDB syntax, e.g. {"$inc" : {"xp" : 3}}.
+    """
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            *parents, key = path.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+
+            if operator == "$set":
+                target[key] = deepcopy(value)
+            elif operator == "$unset":
+                target.pop(key, None)
+            elif operator == "$inc":
+                target[key] = target.get(key, 0) + value
+            elif operator == "$addToSet":
+                values = target.setdefault(key, [])
+                if value not in values:
+                    values.append(deepcopy(value))
+            elif operator == "$pull":
+                target[key] = [item for item in target.get(key, []) if item != value]
+            elif operator == "$pullAll":
+                target[key] = [item for item in target.get(key, []) if item not in value]
+
+
+def get_path(document : dict, path : str):
+    """
+    Reads value under dotted path.
+
+    Arguments:
+        document (dict): Document to read from.
+        path (str): Dotted path, e.g. "cooldowns.last_crime".
+
+    Returns:
+        Value under path or None if path doesn't exist.
+    """
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def matches(document : dict, filter : dict) -> bool:
+    """
+    Checks if document matches a MongoDB filter. Supports equality and
+    $in, $nin, $gt, $gte, $lt, $lte, $ne, $exists on (dotted) fields.
+
+    Arguments:
+        document (dict): Document to check.
+        filter (dict): Filter in MongoDB syntax.
+
+    Returns:
+        bool: True if document matches.
+    """
+    for path, condition in filter.items():
+        value = get_path(document, path)
+        if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+            if value != condition:
+                return False
+            continue
+
+        for operator, operand in condition.items():
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$exists" and (value is not None) != operand:
+                return False
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+                if operator == "$gte" and not value >= operand:
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+                if operator == "$lte" and not value <= operand:
+                    return False
+    return True
+
+
+def project(document : dict, projection) -> dict:
+    """
+    Returns copy of document with only projected top-level or dotted fields (and _id).
+
+    Arguments:
+        document (dict): Full document.
+        projection: Iterable of field names, {field : 1} dict or None for whole document.
+
+    Returns:
+        dict: Projected copy.
+    """
+    if projection is None:
+        return deepcopy(document)
+
+    projected = {"_id" : document.get("_id")}
+    for field in projection:
+        *parents, key = field.split(".")
+        source, target = document, projected
+        for part in parents:
+            source = source.get(part)
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(part, {})
+        else:
+            if key in source:
+                target[key] = deepcopy(source[key])
+    return projected
+
+
+class MongoStorage:
+    """
+    Storage engine backed by MongoDB. Collections are real pymongo AsyncCollections.
+
+    Attributes:
+        database: pymongo AsyncDatabase.
+        name (str): Name of the engine.
+    """
+    name = "mongo"
+
+    def __init__(self, database):
+        """
+        Initializes the engine.
+
+        Arguments:
+            database: pymongo AsyncDatabase.
+        """
+        self.database = database
+        self.supports_transactions = None
+
+    def __getitem__(self, collection : str):
+        return self.database[collection]
+
+    async def transactions(self) -> bool:
+        """
+        Checks once if deployment supports multi-document transactions (replica set or sharded cluster).
+        """
+        if self.supports_transactions is None:
+            hello = await self.database.command("hello")
+            self.supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        return self.supports_transactions
+
+    def start_session(self):
+        return self.database.client.start_session()
+
+
+class MemoryStorage:
+    """
+    Pure in-memory async storage engine with the subset of pymongo collection API
+    the bot uses. Used for local runs, load tests and benchmarks without mongod.
+    Data is lost when process exits.
+
+    Attributes:
+        name (str): Name of the engine.
+        collections (dict): MemoryCollection by name.
+    """
+    name = "memory"
+
+    def __init__(self):
+        """
+        Initializes engine without any collections.
+        """
+        self.collections = {}
+
+    def __getitem__(self, collection : str) -> "MemoryCollection":
+        if collection not in self.collections:
+            self.collections[collection] = MemoryCollection(collection)
+        return self.collections[collection]
+
+    async def transactions(self) -> bool:
+        """
+        Memory engine has no sessions, so callers take their non-transactional path.
+        """
+        return False
+
+
+class MemoryCursor:
+    """
+    Result of MemoryCollection.find, supports async iteration and to_list like AsyncCursor.
+    """
+    def __init__(self, documents : list):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def to_list(self, length : int = None) -> list:
+        return self.documents if length is None else self.documents[:length]
+
+
+class MemoryCollection:
+    """
+    In-memory collection. Documents are stored by _id, every read and write copies
+    data, so callers can't change stored documents by accident.
+    Each method runs without awaiting anything, which makes it atomic for asyncio.
+    """
+    def __init__(self, name : str):
+        """
+        Initializes empty collection.
+
+        Arguments:
+            name (str): Name of the collection.
+        """
+        self.name = name
+        self.documents = {}
+        self.indexes = {"_id_" : {"key" : [("_id", 1)], "v" : 2}}
+
+    def _find_one(self, filter : dict) -> dict:
+        """
+        Returns stored (not copied) document matching filter, looking up by _id when possible.
+        """
+        document_id = filter.get("_id")
+        if document_id is not None and not isinstance(document_id, dict):
+            document = self.documents.get(document_id)
+            return document if document is not None and matches(document, filter) else None
+        return next((document for document in self.documents.values() if matches(document, filter)), None)
+
+    def _insert_for_upsert(self, filter : dict, update : dict) -> dict:
+        """
+        Creates document for upsert from equality fields of filter and $setOnInsert/$set/$inc.
+        """
+        document = {path : value for path, value in filter.items() if not isinstance(value, dict)}
+        if self.documents.get(document.get("_id")) is not None:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}")
+        apply_update(document, {"$set" : update.get("$setOnInsert", {})})
+        apply_update(document, {key : value for key, value in update.items() if key != "$setOnInsert"})
+        self.documents[document["_id"]] = document
+        return document
+
+    def _update_one(self, filter : dict, update : dict, upsert : bool) -> tuple:
+        """
+        Updates one document.
+
+        Returns:
+            tuple: (document before update or None, document after update or None, upserted id or None).
+        """
+        document = self._find_one(filter)
+        if document is None:
+            if not upsert:
+                return None, None, None
+            document = self._insert_for_upsert(filter, update)
+            return None, document, document["_id"]
+
+        before = deepcopy(document)
+        apply_update(document, update)
+        return before, document, None
+
+    async def find_one(self, filter : dict = None, projection = None) -> dict:
+        document = self._find_one(filter or {})
+        return None if document is None else project(document, projection)
+
+    def find(self, filter : dict = None, projection = None) -> MemoryCursor:
+        found = [project(document, projection) for document in self.documents.values() if matches(document, filter or {})]
+        return MemoryCursor(found)
+
+    async def find_one_and_update(self, filter : dict, update : dict, projection = None, upsert : bool = False, return_document : bool = ReturnDocument.BEFORE, **kwargs) -> dict:
+        before, after, _ = self._update_one(filter, update, upsert)
+        result = after if return_document == ReturnDocument.AFTER else before
+        return None if result is None else project(result, projection)
+
+    async def update_one(self, filter : dict, update : dict, upsert : bool = False, **kwargs) -> UpdateResult:
+        before, after, upserted_id = self._update_one(filter, update, upsert)
+        raw = {"n" : int(after is not None), "nModified" : int(before is not None and before != after), "ok" : 1.0}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def insert_one(self, document : dict, **kwargs) -> None:
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}")
+        self.documents[document["_id"]] = deepcopy(document)
+
+    async def insert_many(self, documents : list, ordered : bool = True, **kwargs) -> InsertManyResult:
+        await self.bulk_write([InsertOne(document) for document in documents], ordered=ordered)
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def bulk_write(self, requests : list, ordered : bool = True, **kwargs) -> BulkWriteResult:
+        """
+        Executes InsertOne and UpdateOne requests. Like MongoDB, unordered writes continue
+        after a duplicate key error and all errors are raised together as BulkWriteError.
+        """
+        result = {"nInserted" : 0, "nUpserted" : 0, "nMatched" : 0, "nModified" : 0, "nRemoved" : 0, "upserted" : [], "writeErrors" : [], "writeConcernErrors" : []}
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    await self.insert_one(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, UpdateOne):
+                    before, after, upserted_id = self._update_one(request._filter, request._doc, request._upsert)
+                    if upserted_id is not None:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index" : index, "_id" : upserted_id})
+                    elif after is not None:
+                        result["nMatched"] += 1
+                        result["nModified"] += int(before != after)
+                else:
+                    raise TypeError(f"{type(request).__name__} is not supported by MemoryStorage")
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index" : index, "code" : 11000, "errmsg" : str(e), "op" : request})
+                if ordered:
+                    break
+
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    async def index_information(self) -> dict:
+        return deepcopy(self.indexes)
+
+    async def create_indexes(self, indexes : list, **kwargs) -> list:
+        for index in indexes:
+            spec = dict(index.document)
+            spec["key"] = list(spec["key"].items())
+            self.indexes[spec.pop("name")] = spec
+        return [index.document["name"] for index in indexes]
@@ -0,0 +1,201 @@
+from collections import deque
+import re
+
+# Words and single punctuation characters, whitespace separates tokens.
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize(text : str) -> list:
+    """
+    Splits lowercased text into word and punctuation tokens, e.g. "F*ck it!" -> ["f", "*", "ck", "it", "!"].
+
+    Arguments:
+        text (str): Text to split.
+
+    Returns:
+        list: Tokens.
+    """
+    return TOKEN.findall(text.lower())
+
+
+class WordMatcher:
+    """
+    Banned words and phrases of one guild matched on tokens instead of characters. Message is tokenized
+    once and scanned in one pass no matter how many words are banned. Working on tokens gives word boundary
+    semantics for free: "ass" doesn't match "class", "bad word" matches as a phrase (with any whitespace
+    between words) and "f*ck" matches even though it contains punctuation.
+    Single token words are looked up in a set, only phrases go into an Aho-Corasick automaton, which is
+    skipped completely when the guild bans no phrases (a set lookup per token is faster in pure Python).
+
+    Words can be added and removed in place. Removing a phrase only unmarks it, adding inserts it into
+    the trie and failure links are recomputed lazily before the next scan.
+
+    Attributes:
+        words (set): Banned words (lowercase, tokens joined by single space).
+    """
+    __slots__ = ("words", "_single", "_phrases", "_goto", "_fail", "_output", "_word", "_dirty")
+
+    def __init__(self, words = ()):
+        """
+        Builds automaton from words.
+
+        Arguments:
+            words: Iterable of banned words or phrases.
+        """
+        self.words = set()
+        self._single = set()
+        self._phrases = 0
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]
+        self._word = [None]
+        self._dirty = False
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word : str) -> bool:
+        return " ".join(tokenize(word)) in self.words
+
+    def add(self, word : str) -> None:
+        """
+        Adds word or phrase.
+
+        Arguments:
+            word (str): Word to ban, matched case insensitive.
+        """
+        tokens = tokenize(word)
+        key = " ".join(tokens)
+        if not tokens or key in self.words:
+            return
+        self.words.add(key)
+        if len(tokens) == 1:
+            self._single.add(key)
+            return
+
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+                self._word.append(None)
+                self._goto[node][token] = next_node
+            node = next_node
+
+        self._word[node] = key
+        self._phrases += 1
+        self._dirty = True
+
+    def remove(self, word : str) -> None:
+        """
+        Removes word or phrase. Its trie nodes stay, but they don't report a match anymore.
+
+        Arguments:
+            word (str): Banned word.
+        """
+        tokens = tokenize(word)
+        key = " ".join(tokens)
+        if key not in self.words:
+            return
+        self.words.discard(key)
+        if len(tokens) == 1:
+            self._single.discard(key)
+            return
+
+        node = 0
+        for token in tokens:
+            node = self._goto[node][token]
+        self._word[node] = None
+        self._phrases -= 1
+
+    def _build(self) -> None:
+        """
+        Computes failure links and output links (nearest word ending in the failure chain) with BFS.
+        """
+        goto, fail, output, word = self._goto, self._fail, self._output, self._word
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            output[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                state = fail[node]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(token, 0)
+                fail[child] = target
+                output[child] = target if word[target] is not None else output[target]
+                queue.append(child)
+
+        self._dirty = False
+
+    def find(self, text : str) -> str:
+        """
+        Finds first banned word in text.
+
+        Arguments:
+            text (str): Message content.
+
+        Returns:
+            str: Matched banned word or None.
+        """
+        for word in self.iter_matches(text):
+            return word
+        return None
+
+    def find_all(self, text : str) -> list:
+        """
+        Finds all banned words in text.
+
+        Arguments:
+            text (str): Message content.
+
+        Returns:
+            list: Matched banned words in order of their ends.
+        """
+        return list(self.iter_matches(text))
+
+    def iter_matches(self, text : str):
+        """
+        Yields banned words found in text, in one linear pass over its tokens.
+
+        Arguments:
+            text (str): Message content.
+        """
+        if not self.words:
+            return
+        single = self._single
+        if not self._phrases:
+            for token in tokenize(text):
+                if token in single:
+                    yield token
+            return
+        if self._dirty:
+            self._build()
+
+        goto, fail, output, word = self._goto, self._fail, self._output, self._word
+        root = goto[0]
+        state = 0
+        for token in tokenize(text):
+            if state:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            else:
+                state = root.get(token, 0)
+
+            node = state if word[state] is not None else output[state]
+            while node:
+                if word[node] is not None:
+                    yield word[node]
+                node = output[node]
+            if token in single:
+                yield token
@@ -7,6 +7,7 @@ from discord.ui import DynamicItem, TextInput, Modal
 import wavelink
 from math import ceil
 from random import randint
+from .utils.models import PetState, UserDoc
 import logging
 
 logger = logging.getLogger(__name__)
@@ -470,15 +471,15 @@ class AcceptView(discord.ui.View):
         '''
         return self.bot.get_cog("Database")
 
-    async def get_member(self, discord_Obj) -> dict:
+    async def get_member(self, discord_Obj) -> UserDoc:
         '''
-        Retrieves guild data from database.
+        Retrieves member data from database.
 
         Arguments:
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
 
         Returns:
-            dict: Guild member_data dict or None is something went wrong.
+            UserDoc: Member data or None is something went wrong.
         '''
         database_cog = await self.get_database_cog()
         member_data = await database_cog.find_or_create__member(discord_Obj)
@@ -634,20 +635,21 @@ class BattleView(discord.ui.View):
 
 
 class BattlePlayer:
-    def __init__(self, member : discord.Member, data_from_db : dict):
+    def __init__(self, member : discord.Member, data_from_db : UserDoc):
         '''
         Initializes the BattlePlayer instance.
 
         Arguments:
             member (discord.Member): Member data from discord.
-            data_from_db (dict): Member data from database.
+            data_from_db (UserDoc): Member data from database.
         '''
         self.member_id = member.id
         self.member_name = member.name
-        self.pet_name = data_from_db.get("active_pet", 0)
+        pet = data_from_db.pet or PetState()
+        self.pet_name = data_from_db.active_pet
         self.pet_hp = 100
-        self.pet_atk = data_from_db.get("inventory", {}).get(self.pet_name, {}).get("atk", 0)
-        self.pet_def = data_from_db.get("inventory", {}).get(self.pet_name, {}).get("def", 0)
+        self.pet_atk = pet.atk
+        self.pet_def = pet.defence
 
     def id(self) -> int:
         '''
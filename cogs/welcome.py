@@ -1,6 +1,7 @@
 from discord.ext import commands
 from discord import app_commands, Embed
 import discord
+from .utils.models import GuildDoc
 
 class Welcome(commands.Cog):
 
@@ -18,7 +19,7 @@ class Welcome(commands.Cog):
         """
         return self.bot.get_cog("Database")
 
-    async def get_guild(self, discord_Obj) -> dict:
+    async def get_guild(self, discord_Obj) -> GuildDoc:
         """
         Retrives guild data from database.
 
@@ -26,7 +27,7 @@ class Welcome(commands.Cog):
             discord_Obj: Discord Object (Interaction, Member, Role or Channel).
 
         Returns:
-            dict: Guild data dict or None is something went wrong.
+            GuildDoc: Guild data or None is something went wrong.
         """
         database_cog = await self.get_database_cog()
         if not database_cog:
@@ -37,6 +38,17 @@ class Welcome(commands.Cog):
             return None
         return guild_data
 
+    async def update_guild(self, guild_id : int, update : dict) -> None:
+        """
+        Updates guild document through Database cog, so cached guild config stays in sync.
+
+        Arguments:
+            guild_id (int): Id of the discord guild.
+            update (dict): Update in MongoDB syntax.
+        """
+        database_cog = await self.get_database_cog()
+        await database_cog.update_guild(guild_id, update)
+
     @commands.Cog.listener()
     async def on_member_join(self, member : discord.Member) -> None:
         '''
@@ -51,23 +63,23 @@ class Welcome(commands.Cog):
         if not guild_data:
             return
 
-        welcome_settings = guild_data.get("welcome", {})
+        welcome_settings = guild_data.welcome
 
-        if(not welcome_settings.get("enabled", False)):
+        if(not welcome_settings.enabled):
             return
         
         if(member.id == self.bot.user.id):
             return
         
-        if(not welcome_settings.get("message")):
+        if(not welcome_settings.message):
             title = self.title
         else:
-            title = welcome_settings.get("message")
+            title = welcome_settings.message
 
-        if(not welcome_settings.get("description")):
+        if(not welcome_settings.description):
             embed_desc = self.description
         else:
-            embed_desc = welcome_settings.get("description")
+            embed_desc = welcome_settings.description
 
         embed_desc = embed_desc.replace("{mention}", member.mention)
 
@@ -75,7 +87,7 @@ class Welcome(commands.Cog):
 
         embed.set_image(url=member.display_avatar.url)
 
-        channel_id = welcome_settings.get("channel_id")
+        channel_id = welcome_settings.channel_id
 
         if not channel_id:
             return
@@ -105,9 +117,9 @@ class Welcome(commands.Cog):
         if not guild_data:
             return
 
-        welcome_state = guild_data.get("welcome", {}).get("enabled")
+        welcome_state = guild_data.welcome.enabled
 
-        await self.bot.database["guilds"].update_one({"_id" : str(interaction.guild_id)}, {"$set" : {"welcome.enabled" : not welcome_state}})
+        await self.update_guild(interaction.guild_id, {"$set" : {"welcome.enabled" : not welcome_state}})
 
         await interaction.response.send_message(f"Welcome messages are now {'enabled' if not welcome_state else 'disabled'}!", ephemeral=True)
 
@@ -136,7 +148,7 @@ class Welcome(commands.Cog):
         if(desc):
             update["welcome.description"] = desc
 
-        await self.bot.database["guilds"].update_one({"_id" : str(interaction.guild_id)}, {"$set" : update})
+        await self.update_guild(interaction.guild_id, {"$set" : update})
 
         await interaction.response.send_message("Welcome messages are ready to welcome!", ephemeral=True)
     
@@ -6,6 +6,9 @@ from discord.ext import commands
 from pymongo import AsyncMongoClient
 from pymongo.errors import PyMongoError
 from cogs.views import TicketView, InTicketView, AfterTicketView, DynamicRoleButton
+from cogs.utils.monitoring import CommandMetrics
+from cogs.utils.storage import MongoStorage, MemoryStorage
+from cogs.utils.animation import AnimationScheduler
 from aiohttp import ClientConnectionError
 import logging
 import datetime
@@ -17,6 +20,7 @@ logger = logging.getLogger(__name__)
 TOKEN = os.getenv("DISCORD_TOKEN")
 MONGO = os.getenv("MONGO_URL")      # loads variables from .env
 DEV_ID = os.getenv("DEV_ID")
+STORAGE_ENGINE = os.getenv("STORAGE_ENGINE", "mongo").lower()     # "mongo" or "memory" (no mongod needed, data is lost on exit)
 GUILD_ID = 1415448304157987008
 
 
@@ -26,21 +30,31 @@ intents.members = True          # turns needed intents on
 intents.presences = True
 intents.voice_states = True
 
-client = AsyncMongoClient(MONGO)
-database = client["discordbot"] # connects to the database
-print(f"Connected to {database.name} database")
+if STORAGE_ENGINE == "memory":
+    command_metrics = None
+    database = MemoryStorage()
+    print("Using in-memory database, nothing will be saved!")
+else:
+    command_metrics = CommandMetrics()    # latency histograms of every database command
+    client = AsyncMongoClient(MONGO, event_listeners=[command_metrics])
+    database = MongoStorage(client["discordbot"]) # connects to the database
+    print(f"Connected to {database.database.name} database")
 
 class MyBot(commands.Bot):
     '''
     The main "brain" of the bot, connects to the database and starts everything up.
 
     Attributes:
-        database: The MongoDB database.
+        database: Storage engine (MongoStorage or MemoryStorage), indexing it returns a collection.
+        command_metrics: Per command/collection/cog latency metrics of the database.
+        animations (AnimationScheduler): Paces message edits of animations of all cogs.
         synced: Used to block many reloads on bot startup.
     '''
-    def __init__(self, command_prefix, database, tree_cls = app_commands.CommandTree, description = "My discord bot", intents=intents):
+    def __init__(self, command_prefix, database, command_metrics = None, tree_cls = app_commands.CommandTree, description = "My discord bot", intents=intents):
         super().__init__(command_prefix=command_prefix, tree_cls=tree_cls, description=description, intents=intents)    
         self.database = database    # Make database accessible across all cogs
+        self.command_metrics = command_metrics
+        self.animations = AnimationScheduler()
         self.synced = False
 
     async def setup_hook(self):
@@ -54,6 +68,14 @@ class MyBot(commands.Bot):
                 await self.load_extension(f"cogs.{file[:-3]}")
         print(f"Loaded {len(os.listdir('cogs'))} cogs")
 
+        database_cog = self.get_cog("Database")
+        if database_cog:
+            try:
+                await database_cog.ensure_indexes()
+                print("Database indexes are ready!")
+            except PyMongoError as e:
+                logger.error(f"Failed to bootstrap database indexes, starting without them: {e}")
+
         self.add_view(TicketView())
         self.add_view(InTicketView())
         self.add_view(AfterTicketView())
@@ -156,7 +178,7 @@ class MyBot(commands.Bot):
             except Exception as e:
                 print(f"Error while sending DM: {e}")
 
-bot = MyBot(command_prefix="?", database = database)
+bot = MyBot(command_prefix="?", database = database, command_metrics = command_metrics)
 
 @bot.tree.command(name="sync", description="ADMIN COMMAND ONLY")
 @app_commands.describe(option="GLOBAL | LOCAL")
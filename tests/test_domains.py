@@ -0,0 +1,23 @@
+from cogs.utils.domains import DomainTrie, extract_hosts, ALLOW, BLOCK
+
+
+def test_uppercase_links_are_checked():
+    trie = DomainTrie(blocked=["discord.gg", "evil.com"])
+    assert trie.blocked("join Discord.GG/abc") == "discord.gg"
+    assert trie.blocked("HTTPS://EVIL.com/login") == "evil.com"
+    assert extract_hosts("no links here") == []
+
+
+def test_most_specific_rule_wins():
+    trie = DomainTrie(blocked=["evil.com"], allowed=["safe.evil.com"])
+    assert trie.lookup("a.evil.com") is BLOCK
+    assert trie.lookup("x.safe.evil.com") is ALLOW
+    assert trie.lookup("other.com") is None
+
+
+def test_remove_prunes_only_that_rule():
+    trie = DomainTrie(blocked=["evil.com", "a.b.evil.com"])
+    trie.remove("a.b.evil.com")
+    assert trie.lookup("a.b.evil.com") is BLOCK
+    trie.remove("evil.com")
+    assert not trie
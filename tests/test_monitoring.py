@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+import asyncio
+
+from cogs.database import Database
+from cogs.utils.monitoring import calling_cog
+from cogs.utils.storage import MemoryStorage
+
+
+class TaggingStorage(MemoryStorage):
+    """
+    MemoryStorage recording the cog calling_cog() reports for every member upsert,
+    like CommandMetrics does when a command is sent.
+    """
+    def __init__(self):
+        super().__init__()
+        self.tags = []
+        users = self["users"]
+        find_one_and_update = users.find_one_and_update
+
+        async def tagged(*args, **kwargs):
+            self.tags.append(calling_cog())
+            await asyncio.sleep(0)
+            return await find_one_and_update(*args, **kwargs)
+        users.find_one_and_update = tagged
+
+
+def cog_function(module : str, source : str):
+    """
+    Compiles coroutine function as if it was defined in cog module, e.g. "cogs.economy".
+    """
+    namespace = {"__name__" : module}
+    exec(source, namespace)
+    return namespace["lookup"]
+
+
+LOOKUP = """
+async def lookup(cog, member_id):
+    return await cog.load_member(member_id)
+"""
+
+
+def test_coalesced_lookup_keeps_caller_cog():
+    async def scenario():
+        storage = TaggingStorage()
+        cog = Database(SimpleNamespace(database=storage, command_metrics=None))
+        economy = cog_function("cogs.economy", LOOKUP)
+        gambling = cog_function("cogs.gambling", LOOKUP)
+        results = await asyncio.gather(economy(cog, "1"), gambling(cog, "1"), gambling(cog, "1"))
+        return storage.tags, results, cog.lookups.stats()
+
+    tags, results, stats = asyncio.run(scenario())
+    assert tags == ["economy"]
+    assert stats["queries"] == 1 and stats["shared"] == 2
+    assert all(result is results[0] for result in results)
+
+
+def test_lookup_without_cog_is_database():
+    async def scenario():
+        storage = TaggingStorage()
+        cog = Database(SimpleNamespace(database=storage, command_metrics=None))
+        await cog.load_member("1")
+        return storage.tags
+
+    assert asyncio.run(scenario()) == ["database"]
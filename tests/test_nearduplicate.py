@@ -0,0 +1,31 @@
+from cogs.utils.nearduplicate import NearDuplicateIndex, fingerprint, MAX_LIMIT, SIMILARITY
+
+
+def fires(index : NearDuplicateIndex, text : str, limit : int, now : float) -> bool:
+    """
+    Checks message like Automod.check_near_duplicates does.
+    """
+    sketch = fingerprint(text)
+    duplicates = index.count(sketch, SIMILARITY / 100, now)
+    index.add(sketch, now)
+    return duplicates + 1 >= limit
+
+
+def test_limit_identical_messages_fire():
+    spam = "free nitro for everyone who clicks this link right now"
+    for limit in range(2, MAX_LIMIT + 1):
+        index = NearDuplicateIndex()
+        results = [fires(index, spam, limit, now) for now in range(limit)]
+        assert results == [False] * (limit - 1) + [True], limit
+
+
+def test_shared_hashes_do_not_evict_spam():
+    spam = "free nitro for everyone who clicks this link right now"
+    index = NearDuplicateIndex()
+    results = []
+    for now in range(MAX_LIMIT):
+        # Other messages sharing the spam's common shingles fill its buckets between copies.
+        for other in range(3):
+            fires(index, f"free nitro for everyone who asks {now} {other}", MAX_LIMIT, now)
+        results.append(fires(index, spam, MAX_LIMIT, now))
+    assert results[-1]
@@ -0,0 +1,14 @@
+from cogs.utils.normalize import normalize, variants
+
+
+def test_numbers_are_kept():
+    assert normalize("455") == "455"
+    assert normalize("I paid 455.") == "i paid 455."
+    assert normalize("year 2024, (455)") == "year 2024, (455)"
+
+
+def test_leetspeak_in_words_is_read():
+    assert normalize("4$$") == "ass"
+    assert normalize("a55 h3ll0") == "ass hello"
+    assert normalize("4\u200bss") == "ass"
+    assert variants("ＦU\u200bυυυck 455") == ("fuuck 455", "fuck 45")
@@ -0,0 +1,57 @@
+from itertools import product
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from cogs.utils import payouts
+from tools import simulate_payouts
+
+ROUNDS = 200000
+BET = 100
+VICTIM_BALANCE = 1234
+
+
+def mean(values) -> float:
+    values = list(values)
+    return sum(values) / len(values)
+
+
+def average(low : int, high : int, gain) -> float:
+    return mean(gain(value) for value in range(low, high + 1))
+
+
+def bail() -> float:
+    return average(*payouts.BAIL, lambda fine : fine)
+
+
+def exact_slots(pet : str) -> float:
+    return mean(int(payouts.rat_bonus(pet, payouts.slots_win(slots, BET))) - BET for slots in product(payouts.SLOTS_SYMBOLS, repeat=3))
+
+
+def exact_scratches(pet : str) -> float:
+    return mean(average(*payouts.scratch_tier(roll), lambda win : int(payouts.rat_bonus(pet, win)))
+                for roll in range(1, payouts.SCRATCH_ROLL + 1)) - payouts.SCRATCH_PRICE
+
+
+def exact_crime(pet : str) -> float:
+    return mean(average(*payouts.CRIME_REWARD, lambda reward : int(payouts.squid_bonus(pet, reward))) if payouts.crime_succeeded(roll) else -bail()
+                for roll in range(1, payouts.CHANCE_ROLL + 1))
+
+
+def exact_steal(pet : str) -> float:
+    gain = lambda tenths : int(payouts.squid_bonus(pet, payouts.stolen_coins(VICTIM_BALANCE, tenths)))
+    return mean(average(*payouts.STEAL_TENTHS, gain) if payouts.steal_succeeded(roll) else -bail()
+                for roll in range(1, payouts.CHANCE_ROLL + 1))
+
+
+@pytest.mark.parametrize("simulate, exact", [
+    (simulate_payouts.slots, exact_slots),
+    (simulate_payouts.scratches, exact_scratches),
+    (simulate_payouts.crime, exact_crime),
+    (simulate_payouts.steal(VICTIM_BALANCE), exact_steal)
+])
+@pytest.mark.parametrize("pet", simulate_payouts.PETS)
+def test_simulation_matches_payout_helpers(simulate, exact, pet):
+    result = simulate_payouts.run(simulate, ROUNDS, pet, BET, seed=0)
+    assert abs(result["ev"] - exact(pet)) <= 5 * result["std"] / ROUNDS ** 0.5
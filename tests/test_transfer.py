@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+import asyncio
+
+from cogs.database import Database
+from cogs.utils.storage import MemoryStorage
+
+
+def make_cog() -> Database:
+    return Database(SimpleNamespace(database=MemoryStorage(), command_metrics=None))
+
+
+def test_transfer_moves_coins_and_update():
+    async def scenario():
+        cog = make_cog()
+        await cog.load_member("1")
+        await cog.load_member("2", ("coins",))
+        await cog.bot.database["users"].update_one({"_id" : "1"}, {"$set" : {"coins" : 100}})
+        cog.member_cache.invalidate("1")
+        moved = await cog.transfer(1, 2, 60, {"$set" : {"cooldowns.last_steal" : "now"}})
+        users = cog.bot.database["users"]
+        return moved, await users.find_one({"_id" : "1"}), await users.find_one({"_id" : "2"})
+
+    moved, sender, receiver = asyncio.run(scenario())
+    assert moved
+    assert sender["coins"] == 40
+    assert receiver["coins"] == 60 and receiver["cooldowns"]["last_steal"] == "now"
+
+
+def test_transfer_without_coins_changes_nothing():
+    async def scenario():
+        cog = make_cog()
+        await cog.load_member("1", ("coins",))
+        await cog.load_member("2", ("coins",))
+        users = cog.bot.database["users"]
+        before = await users.find_one({"_id" : "2"})
+        moved = await cog.transfer(1, 2, 60)
+        return moved, before, await users.find_one({"_id" : "2"})
+
+    moved, before, after = asyncio.run(scenario())
+    assert not moved
+    assert before == after
+
+
+def test_cached_sender_is_checked_without_lookup():
+    async def scenario():
+        cog = make_cog()
+        await cog.load_member("1")
+        stats = cog.member_cache.stats()
+        return await cog.transfer(1, 2, 60), stats, cog.member_cache.stats()
+
+    moved, before, after = asyncio.run(scenario())
+    assert not moved
+    assert before == after
+
+
+def test_transfer_to_missing_member_is_refunded():
+    async def scenario():
+        cog = make_cog()
+        await cog.load_member("1")
+        await cog.bot.database["users"].update_one({"_id" : "1"}, {"$set" : {"coins" : 100}})
+        cog.member_cache.invalidate("1")
+        moved = await cog.transfer(1, 2, 60)
+        users = cog.bot.database["users"]
+        return moved, await users.find_one({"_id" : "1"}), await users.find_one({"_id" : "2"})
+
+    moved, sender, receiver = asyncio.run(scenario())
+    assert not moved
+    assert sender["coins"] == 100 and receiver is None
@@ -0,0 +1,89 @@
+"""
+Benchmark of the message hot path (read member, add xp, level up) through the Database cog.
+
+Runs the same simulated traffic against the in-memory engine and, if MONGO_URL is set,
+against MongoDB, so time spent in the bot itself can be compared with time spent in database.
+
+Usage:
+    python -m tools.bench_database [--messages 20000] [--members 2000] [--write-behind]
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+from os import getenv
+import asyncio
+
+from cogs.database import Database
+from cogs.economy import XP_PER_LEVEL
+from cogs.utils.storage import MemoryStorage, MongoStorage
+
+
+async def simulate(database, messages : int, members : int, write_behind : bool, seed : int = 0) -> dict:
+    """
+    Sends simulated messages through Database cog the same way Economy.award_message_xp and
+    MessagePipeline.commit do: 1-5 xp per message, level up at Economy's XP_PER_LEVEL * level.
+
+    Arguments:
+        database: Storage engine.
+        messages (int): Number of messages.
+        members (int): Number of distinct authors.
+        write_behind (bool): If xp write-behind should be enabled.
+        seed (int): Seed of random author and xp picks.
+
+    Returns:
+        dict: Elapsed seconds, messages per second, level ups and cache stats.
+    """
+    cog = Database(SimpleNamespace(database=database, command_metrics=None))
+    cog.xp_write_behind = write_behind
+    rng = Random(seed)
+    level_ups = 0
+
+    started = perf_counter()
+    for _ in range(messages):
+        member_id = str(rng.randrange(members))
+        member_data = await cog.load_member(member_id)
+        added_xp = rng.randint(1, 5)
+        if member_data.xp + added_xp >= XP_PER_LEVEL * member_data.level:
+            await cog.update_member(member_id, {"$set" : {"xp" : 0}, "$inc" : {"level" : 1}})
+            level_ups += 1
+        else:
+            await cog.add_xp(member_id, added_xp)
+    await cog.flush_xp()
+    elapsed = perf_counter() - started
+
+    return {"elapsed" : elapsed, "rate" : messages / elapsed, "level_ups" : level_ups, "cache" : cog.cache_stats()}
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--write-behind", action="store_true")
+    args = parser.parse_args()
+
+    engines = [("memory", MemoryStorage())]
+    if getenv("MONGO_URL"):
+        from pymongo import AsyncMongoClient
+        client = AsyncMongoClient(getenv("MONGO_URL"))
+        await client.drop_database("discordbot_bench")
+        engines.append(("mongo", MongoStorage(client["discordbot_bench"])))
+
+    results = {}
+    for name, database in engines:
+        results[name] = await simulate(database, args.messages, args.members, args.write_behind)
+        result = results[name]
+        print(f"{name:>6}: {result['elapsed']:.3f}s, {result['rate']:.0f} msg/s, "
+              f"{result['elapsed'] / args.messages * 1e6:.1f}us/msg, level ups {result['level_ups']}, "
+              f"cache hit ratio {result['cache']['hit_ratio']:.2f}")
+
+    if "mongo" in results:
+        overhead = results["mongo"]["elapsed"] - results["memory"]["elapsed"]
+        print(f"database overhead: {overhead / args.messages * 1e6:.1f}us/msg "
+              f"({overhead / results['mongo']['elapsed']:.0%} of mongo run)")
+        await client.drop_database("discordbot_bench")
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Benchmark of near-duplicate detection: cost per message of MinHash fingerprint index
+as the window grows, compared to comparing with every fingerprint in the window.
+Scanned entries rise while buckets fill and stop at SKETCH * BUCKET_SIZE, what is left of the growth
+comes from larger dicts (Automod keeps at most 20000 fingerprints per guild).
+
+Usage:
+    python -m tools.bench_nearduplicate [--messages 5000] [--windows 1000 10000 100000 300000]
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from string import ascii_lowercase
+
+from cogs.utils.nearduplicate import NearDuplicateIndex, fingerprint, similarity, SIMILARITY, SKETCH
+
+
+def make_words(rng : Random, amount : int) -> list:
+    return ["".join(rng.choices(ascii_lowercase, k=rng.randint(2, 9))) for _ in range(amount)]
+
+
+def make_messages(rng : Random, amount : int) -> list:
+    """
+    Generates messages of 5-30 words, every tenth one an earlier message with one word changed.
+    """
+    messages = []
+    for number in range(amount):
+        if number % 10 == 9:
+            words = rng.choice(messages).split()
+            words[rng.randrange(len(words))] = make_words(rng, 1)[0]
+        else:
+            words = make_words(rng, rng.randint(5, 30))
+        messages.append(" ".join(words))
+    return messages
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[1000, 10000, 100000, 300000])
+    args = parser.parse_args()
+
+    rng = Random(0)
+    messages = make_messages(rng, args.messages)
+    threshold = SIMILARITY / 100
+
+    started = perf_counter()
+    sketches = [fingerprint(message) for message in messages]
+    print(f"fingerprint:      {(perf_counter() - started) / len(messages) * 1e6:.1f}us/msg")
+    sketches = [sketch for sketch in sketches if sketch is not None]
+    filler = [fingerprint(message) for message in make_messages(Random(1), max(args.windows))]
+    filler = [sketch for sketch in filler if sketch is not None]
+
+    for size in args.windows:
+        window = filler[:size]
+        index = NearDuplicateIndex(window=float("inf"), max_entries=len(window) + len(sketches))
+        for sketch in window:
+            index.add(sketch, now=0.0)
+
+        scanned = sum(len(index.buckets.get(value, ())) for sketch in sketches for value in sketch) / len(sketches)
+        found = 0
+        started = perf_counter()
+        for sketch in sketches:
+            found += index.count(sketch, threshold, now=0.0) > 0
+            index.add(sketch, now=0.0)
+        indexed = (perf_counter() - started) / len(sketches)
+
+        sample = sketches[:max(1, 100000 // len(window))]
+        started = perf_counter()
+        for sketch in sample:
+            sum(1 for other in window if similarity(sketch, other) >= threshold)
+        linear = (perf_counter() - started) / len(sample)
+
+        print(f"window {len(window):>7}:   index {indexed * 1e6:7.1f}us/msg ({scanned:5.1f}/{SKETCH * index.bucket_size} entries scanned)   "
+              f"linear scan {linear * 1e6:10.1f}us/msg   ({found} of {len(sketches)} messages had near duplicate)")
+
+
+if __name__ == "__main__":
+    main()
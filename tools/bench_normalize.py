@@ -0,0 +1,63 @@
+"""
+Benchmark of automod text normalization (str.translate + run collapse)
+compared to plain str.lower, with cost per message and share of one core at given chat rate.
+
+Usage:
+    python -m tools.bench_normalize [--messages 50000] [--rate 50]
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from string import ascii_lowercase
+
+from cogs.utils.normalize import normalize, variants
+
+OBFUSCATIONS = ("\u200b", "0", "4", "$", "@", "\u0430", "\u03bf", "\uff46", "\u00e9", "ooooo")
+
+
+def make_messages(rng : Random, amount : int) -> list:
+    """
+    Generates messages of 5-40 words, about 10% of words obfuscated.
+    """
+    messages = []
+    for _ in range(amount):
+        words = []
+        for _ in range(rng.randint(5, 40)):
+            word = "".join(rng.choices(ascii_lowercase, k=rng.randint(2, 9)))
+            if rng.random() < 0.1:
+                position = rng.randrange(len(word))
+                word = word[:position] + rng.choice(OBFUSCATIONS) + word[position:]
+            words.append(word)
+        messages.append(" ".join(words))
+    return messages
+
+
+def timed(function, messages : list) -> float:
+    started = perf_counter()
+    for message in messages:
+        function(message)
+    return (perf_counter() - started) / len(messages)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--rate", type=float, default=50, help="messages per second of the bot")
+    args = parser.parse_args()
+
+    messages = make_messages(Random(0), args.messages)
+    chars = sum(len(message) for message in messages) / len(messages)
+
+    baseline = timed(str.lower, messages)
+    normalized = timed(normalize, messages)
+    both = timed(variants, messages)
+
+    print(f"average message: {chars:.0f} chars")
+    print(f"str.lower:            {baseline * 1e6:.2f}us/msg")
+    print(f"normalize:            {normalized * 1e6:.2f}us/msg")
+    print(f"variants:             {both * 1e6:.2f}us/msg "
+          f"({both * args.rate * 100:.4f}% of one core at {args.rate:.0f} msg/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of banned words matching: WordMatcher against the old token-set check
+(regex tokenization + set lookup, can't match phrases) for realistic list sizes,
+with a list of single words (set path) and a list where every tenth entry is a phrase (automaton).
+
+Usage:
+    python -m tools.bench_wordmatch [--messages 20000] [--sizes 1000 5000 10000 50000]
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from string import ascii_lowercase
+import re
+
+from cogs.utils.wordmatch import WordMatcher
+
+
+def random_word(rng : Random) -> str:
+    return "".join(rng.choices(ascii_lowercase, k=rng.randint(3, 10)))
+
+
+def make_words(rng : Random, size : int, phrases : bool = True) -> list:
+    """
+    Generates banned list, if phrases is True every tenth entry is a two word phrase.
+    """
+    words = set()
+    while len(words) < size:
+        word = random_word(rng)
+        if phrases and len(words) % 10 == 0:
+            word = f"{word} {random_word(rng)}"
+        words.add(word)
+    return list(words)
+
+
+def make_messages(rng : Random, words : list, amount : int) -> list:
+    """
+    Generates messages of 5-40 words, about 2% of them contain a banned word.
+    """
+    messages = []
+    for _ in range(amount):
+        tokens = [random_word(rng) for _ in range(rng.randint(5, 40))]
+        if rng.random() < 0.02:
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(words))
+        messages.append(" ".join(tokens))
+    return messages
+
+
+def token_set(banned : set, message : str) -> bool:
+    words = re.findall(r'\b\w+\b', message.lower())
+    return any(word in banned for word in words)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = Random(0)
+    for size in args.sizes:
+        for phrases in (False, True):
+            words = make_words(rng, size, phrases)
+            messages = make_messages(rng, words, args.messages)
+
+            started = perf_counter()
+            matcher = WordMatcher(words)
+            matcher.find("")
+            build = perf_counter() - started
+
+            started = perf_counter()
+            hits = sum(matcher.find(message) is not None for message in messages)
+            scan = perf_counter() - started
+
+            banned = set(words)
+            started = perf_counter()
+            token_hits = sum(token_set(banned, message) for message in messages)
+            tokens = perf_counter() - started
+
+            print(f"{size:>6} {'words+phrases' if phrases else 'words':<13}: build {build * 1000:4.0f}ms, "
+                  f"matcher {scan / args.messages * 1e6:5.1f}us/msg ({hits} hits), "
+                  f"token set {tokens / args.messages * 1e6:5.1f}us/msg ({token_hits} hits)")
+
+
+if __name__ == "__main__":
+    main()
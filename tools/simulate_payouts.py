@@ -0,0 +1,165 @@
+"""
+Monte Carlo simulation of gambling games and crimes with every pet bonus, vectorized with NumPy.
+
+Builds lookup tables from the payout helpers and pet bonuses of cogs/utils/payouts.py (the same module Gambling cog uses)
+and reports expected value and standard deviation of one round and coins created (or destroyed)
+per user-day. Needs numpy (pip install numpy), the bot itself doesn't.
+
+Usage:
+    python -m tools.simulate_payouts [--rounds 10000000] [--bet 100] [--plays-per-day 20] [--victim-balance 1000]
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+
+from cogs.utils import payouts
+
+PETS = (None, "rat", "squid")
+CHUNK = 1000000
+
+
+def slots_table() -> np.ndarray:
+    """
+    Multiplier of every combination of three symbols built from payouts.slots_win.
+    """
+    symbols = payouts.SLOTS_SYMBOLS
+    return np.array([[[payouts.slots_win((first, second, third), 1) for third in symbols] for second in symbols] for first in symbols])
+
+
+def slots(rng, size : int, pet : str, bet : int):
+    table = slots_table()
+    symbols = rng.integers(0, len(payouts.SLOTS_SYMBOLS), (size, 3))
+    win = np.floor(payouts.rat_bonus(pet, table[symbols[:, 0], symbols[:, 1], symbols[:, 2]] * bet))
+    return win - bet, win - bet
+
+
+def scratch_table() -> np.ndarray:
+    """
+    Lowest and highest win of every roll built from payouts.scratch_tier, row 0 is unused.
+    """
+    return np.array([payouts.scratch_tier(roll) for roll in range(payouts.SCRATCH_ROLL + 1)])
+
+
+def scratches(rng, size : int, pet : str, bet : int):
+    table = scratch_table()
+    tier = table[rng.integers(1, payouts.SCRATCH_ROLL + 1, size)]
+    win = np.floor(payouts.rat_bonus(pet, rng.integers(tier[:, 0], tier[:, 1] + 1)))
+    return win - payouts.SCRATCH_PRICE, win - payouts.SCRATCH_PRICE
+
+
+def roulette_table(color : str, numbers) -> np.ndarray:
+    """
+    Multiplier of every (chosen number, result) pair built from payouts.roulette_win, so the simulation
+    can't disagree with the game. None in numbers means bet on color only.
+    """
+    return np.array([[payouts.roulette_win(1, result, color, number) for result in range(payouts.ROULETTE_POCKETS)] for number in numbers])
+
+
+def roulette(color : str, with_number : bool):
+    """
+    Returns simulation of roulette bet on color, optionally with random number of that color.
+    """
+    if with_number:
+        numbers = [number for number in range(payouts.ROULETTE_POCKETS) if payouts.roulette_color(number) == color]
+    else:
+        numbers = [None]
+    table = roulette_table(color, numbers)
+
+    def simulate(rng, size : int, pet : str, bet : int):
+        chosen = rng.integers(0, len(numbers), size)
+        result = rng.integers(0, payouts.ROULETTE_POCKETS, size)
+        win = np.floor(payouts.rat_bonus(pet, table[chosen, result] * bet))
+        return win - bet, win - bet
+    return simulate
+
+
+def bail(rng, size : int):
+    return rng.integers(payouts.BAIL[0], payouts.BAIL[1] + 1, size)
+
+
+def chance_table(succeeded) -> np.ndarray:
+    """
+    Outcome of every crime or steal roll built from payouts.crime_succeeded or payouts.steal_succeeded, row 0 is unused.
+    """
+    return np.array([roll > 0 and succeeded(roll) for roll in range(payouts.CHANCE_ROLL + 1)])
+
+
+def crime(rng, size : int, pet : str, bet : int):
+    table = chance_table(payouts.crime_succeeded)
+    success = table[rng.integers(1, payouts.CHANCE_ROLL + 1, size)]
+    reward = np.floor(payouts.squid_bonus(pet, rng.integers(payouts.CRIME_REWARD[0], payouts.CRIME_REWARD[1] + 1, size)))
+    net = np.where(success, reward, -bail(rng, size))
+    return net, net
+
+
+def steal(victim_balance : int):
+    """
+    Returns simulation of stealing from victim with given balance. Stolen coins move between members,
+    only bail leaves the economy.
+    """
+    table = chance_table(payouts.steal_succeeded)
+    stolen = np.array([payouts.stolen_coins(victim_balance, tenths) for tenths in range(payouts.STEAL_TENTHS[1] + 1)])
+
+    def simulate(rng, size : int, pet : str, bet : int):
+        success = table[rng.integers(1, payouts.CHANCE_ROLL + 1, size)]
+        tenths = rng.integers(payouts.STEAL_TENTHS[0], payouts.STEAL_TENTHS[1] + 1, size)
+        gain = np.floor(payouts.squid_bonus(pet, stolen[tenths]))
+        fine = bail(rng, size)
+        return np.where(success, gain, -fine), np.where(success, 0, -fine)
+    return simulate
+
+
+def run(simulate, rounds : int, pet : str, bet : int, seed : int) -> dict:
+    """
+    Runs rounds in chunks and sums them up.
+
+    Returns:
+        dict: Mean and standard deviation of player net per round, mean coins created per round.
+    """
+    rng = np.random.default_rng(seed)
+    total = squares = created = 0.0
+    left = rounds
+    while left:
+        size = min(left, CHUNK)
+        net, supply = simulate(rng, size, pet, bet)
+        total += net.sum()
+        squares += np.square(net, dtype=np.float64).sum()
+        created += supply.sum()
+        left -= size
+    mean = total / rounds
+    return {"ev" : mean, "std" : (squares / rounds - mean * mean) ** 0.5, "created" : created / rounds}
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10000000, help="rounds per game per pet")
+    parser.add_argument("--bet", type=int, default=100, help="bet in slots and roulette")
+    parser.add_argument("--plays-per-day", type=float, default=20, help="rounds of each gambling game per user-day")
+    parser.add_argument("--victim-balance", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    games = [
+        ("slots", slots, args.bet, args.plays_per_day),
+        ("scratches", scratches, payouts.SCRATCH_PRICE, args.plays_per_day),
+        ("roulette red", roulette("red", False), args.bet, args.plays_per_day),
+        ("roulette green", roulette("green", False), args.bet, args.plays_per_day),
+        ("roulette red+number", roulette("red", True), args.bet, args.plays_per_day),
+        ("crime", crime, None, 24 / payouts.CRIME_COOLDOWN),
+        ("steal", steal(args.victim_balance), None, 24 / payouts.STEAL_COOLDOWN)
+    ]
+
+    print(f"{'game':<20} {'pet':<6} {'EV/round':>10} {'EV/stake':>9} {'std':>10} {'coins/user-day':>15}")
+    started = perf_counter()
+    for name, simulate, stake, per_day in games:
+        for pet in PETS:
+            result = run(simulate, args.rounds, pet, args.bet, args.seed)
+            edge = f"{result['ev'] / stake:+.2%}" if stake else "-"
+            print(f"{name:<20} {pet or '-':<6} {result['ev']:>+10.2f} {edge:>9} {result['std']:>10.1f} {result['created'] * per_day:>+15.1f}")
+    elapsed = perf_counter() - started
+    print(f"{len(games) * len(PETS) * args.rounds:,} rounds in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
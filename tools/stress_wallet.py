@@ -0,0 +1,120 @@
+"""
+Concurrency stress test of the wallet: many bets of the same members run at once and no balance may go negative.
+
+Runs conditional debit (Database.debit) next to the old read-check-$inc flow, against the in-memory
+engine and, if MONGO_URL is set, against MongoDB. The old flow overdraws as soon as bets interleave.
+
+Usage:
+    python -m tools.stress_wallet [--members 20] [--bets 5000] [--balance 100] [--concurrency 200]
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+from os import getenv
+import asyncio
+
+from cogs.database import Database
+from cogs.utils.storage import MemoryStorage, MongoStorage
+
+
+async def conditional_bet(cog : Database, member_id : str, amount : int, payout : int) -> bool:
+    return await cog.debit(member_id, amount, payout) is not None
+
+
+async def unchecked_bet(cog : Database, member_id : str, amount : int, payout : int) -> bool:
+    """
+    Flow the gambling commands used before: read balance, compare, then $inc.
+    """
+    document = await cog.bot.database["users"].find_one({"_id" : member_id}, projection=("coins",))
+    await asyncio.sleep(0)
+    if document["coins"] < amount:
+        return False
+    await cog.update_member(member_id, {"$inc" : {"coins" : payout - amount}})
+    return True
+
+
+async def stress(database, bet, members : int, bets : int, balance : int, concurrency : int, seed : int = 0) -> dict:
+    """
+    Places bets of random members with random outcomes, at most concurrency at once.
+
+    Arguments:
+        database: Storage engine.
+        bet: Coroutine function placing one bet, returns if it was accepted.
+        members (int): Number of members betting.
+        bets (int): Number of bets.
+        balance (int): Starting balance of every member.
+        concurrency (int): Bets running at once.
+        seed (int): Seed of random picks.
+
+    Returns:
+        dict: Elapsed seconds, accepted bets, lowest final balance and if coins add up.
+    """
+    cog = Database(SimpleNamespace(database=database, command_metrics=None))
+    ids = [f"stress{number}" for number in range(members)]
+    for member_id in ids:
+        await cog.load_member(member_id)
+        await cog.update_member(member_id, {"$set" : {"coins" : balance}})
+
+    rng = Random(seed)
+    plan = [(rng.choice(ids), rng.randint(1, balance), 0) for _ in range(bets)]
+    plan = [(member_id, amount, amount * 2 if rng.random() < 0.45 else 0) for member_id, amount, _ in plan]
+    limit = asyncio.Semaphore(concurrency)
+    expected = {member_id : balance for member_id in ids}
+
+    async def place(member_id : str, amount : int, payout : int) -> bool:
+        async with limit:
+            accepted = await bet(cog, member_id, amount, payout)
+        if accepted:
+            expected[member_id] += payout - amount
+        return accepted
+
+    started = perf_counter()
+    accepted = sum(await asyncio.gather(*(place(*entry) for entry in plan)))
+    elapsed = perf_counter() - started
+
+    documents = await database["users"].find({"_id" : {"$in" : ids}}, projection=("coins",)).to_list(None)
+    balances = {document["_id"] : document["coins"] for document in documents}
+    return {
+        "elapsed" : elapsed,
+        "accepted" : accepted,
+        "lowest" : min(balances.values()),
+        "negative" : sum(1 for coins in balances.values() if coins < 0),
+        "consistent" : balances == expected
+    }
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--bets", type=int, default=5000)
+    parser.add_argument("--balance", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    engines = [("memory", MemoryStorage)]
+    if getenv("MONGO_URL"):
+        from pymongo import AsyncMongoClient
+        client = AsyncMongoClient(getenv("MONGO_URL"))
+        engines.append(("mongo", lambda: MongoStorage(client["discordbot_stress"])))
+
+    failed = False
+    for name, engine in engines:
+        for flow, bet in (("conditional debit", conditional_bet), ("read-check-$inc", unchecked_bet)):
+            if name == "mongo":
+                await client.drop_database("discordbot_stress")
+            result = await stress(engine(), bet, args.members, args.bets, args.balance, args.concurrency)
+            print(f"{name:>6} {flow:>17}: {result['elapsed']:.3f}s, {result['accepted']}/{args.bets} bets accepted, "
+                  f"lowest balance {result['lowest']}, {result['negative']} negative, "
+                  f"{'consistent' if result['consistent'] else 'INCONSISTENT'}")
+            if bet is conditional_bet and (result["negative"] or not result["consistent"]):
+                failed = True
+    if getenv("MONGO_URL"):
+        await client.drop_database("discordbot_stress")
+
+    if failed:
+        raise SystemExit("conditional debit overdrew a balance")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())